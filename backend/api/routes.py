@@ -1,5 +1,7 @@
+import asyncio
 import logging
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from typing import List
 from services.project import ProjectService
 from services.session import SessionService
@@ -44,9 +46,38 @@ async def list_sessions(project_id: str):
 
 
 @router.get("/sessions/{session_id}/history")
-async def get_session_history(session_id: str, limit: int = Query(100, ge=0)):
-    """세션 히스토리 조회"""
-    return session_service.get_history(session_id, limit)
+async def get_session_history(
+    response: Response,
+    session_id: str,
+    limit: int = Query(100, ge=0),
+    before: str = Query(None, description="이 커서 이전 메시지 (X-Prev-Cursor)"),
+    after: str = Query(None, description="이 커서 이후 메시지 (X-Next-Cursor)"),
+    start: int = Query(None, ge=0, description="메시지 번호 (0부터)"),
+):
+    """세션 히스토리 조회 (커서 기반 페이지네이션)"""
+    _check_single_cursor(before, after, start)
+    try:
+        page = session_service.get_history_page(session_id, limit, before, after, start)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return _history_response(response, page)
+
+
+def _check_single_cursor(before, after, start) -> None:
+    if sum(p is not None for p in (before, after, start)) > 1:
+        raise HTTPException(status_code=400, detail="Use only one of before, after or start")
+
+
+def _history_response(response: Response, page) -> list[dict]:
+    """페이지 커서/전체 개수를 응답 헤더로 설정"""
+    if page.prev_cursor:
+        response.headers["X-Prev-Cursor"] = page.prev_cursor
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
+    return page.messages
 
 
 @router.get("/sessions/{session_id}/metadata")
@@ -60,19 +91,47 @@ async def get_session_metadata(session_id: str):
 
 @router.get("/sessions/search")
 async def search_sessions(
-    q: str = Query(..., description="검색어"),
+    q: str = Query(..., description="검색어 (\"구문\", 접두사*)"),
     project_id: str = Query(None, description="프로젝트 필터"),
+    stream: bool = Query(False, description="NDJSON으로 전체 결과를 준비되는 대로 전송"),
 ):
-    """세션 검색"""
-    return session_service.search(q, project_id)
+    """세션 검색 (메시지 본문 관련도 순, 이어서 요약/첫 메시지 일치 세션)"""
+    if stream:
+        # 동기 제너레이터는 스레드풀에서 순회되므로 색인 조회가 이벤트 루프를 막지 않음
+        lines = (result.model_dump_json() + "\n" for result in session_service.iter_search(q, project_id))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+    # 첫 카탈로그 동기화를 기다릴 수 있으므로 스레드에서 실행
+    return await asyncio.to_thread(session_service.search, q, project_id)
 
 
 @router.get("/sessions/{session_id}/agents")
 async def get_session_agents(session_id: str):
-    """세션의 백그라운드 에이전트 로그 조회"""
+    """세션의 백그라운드 에이전트 요약 조회"""
     return session_service.get_agent_logs(session_id)
 
 
+@router.get("/sessions/{session_id}/agents/{agent_id}/history")
+async def get_agent_history(
+    response: Response,
+    session_id: str,
+    agent_id: str,
+    limit: int = Query(100, ge=0),
+    before: str = Query(None, description="이 커서 이전 메시지 (X-Prev-Cursor)"),
+    after: str = Query(None, description="이 커서 이후 메시지 (X-Next-Cursor)"),
+    start: int = Query(None, ge=0, description="메시지 번호 (0부터)"),
+):
+    """에이전트 히스토리 조회 (세션 히스토리와 같은 커서 기반 페이지네이션)"""
+    _check_single_cursor(before, after, start)
+    try:
+        page = session_service.get_agent_history_page(session_id, agent_id, limit, before, after, start)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page is None:
+        raise HTTPException(status_code=404, detail="Agent not found")
+
+    return _history_response(response, page)
+
+
 @router.get("/sessions/{session_id}/resume-info")
 async def get_resume_info(session_id: str):
     """세션 재개 정보 조회"""
@@ -106,6 +165,14 @@ async def get_usage_by_range(
     return usage_service.get_usage_by_date_range(start_date, end_date)
 
 
+@router.get("/usage/blocks")
+async def get_usage_blocks(
+    token_limit: int = Query(None, ge=1, description="블록당 토큰 한도 (소진 시각 예측)"),
+):
+    """현재 5시간 과금 블록 및 소진 속도 조회"""
+    return usage_service.get_usage_blocks(token_limit)
+
+
 @router.get("/sessions/by-date-range")
 async def get_sessions_by_date_range(
     date_from: str = Query(..., description="시작 날짜 (YYYY-MM-DD)"),
@@ -122,6 +189,14 @@ async def get_cache_stats():
     return cache_manager.get_all_stats_dict()
 
 
+@router.get("/ws/stats")
+async def get_websocket_stats():
+    """WebSocket 연결별 송신 큐 깊이와 drop/collapse/eviction 통계"""
+    # api.websocket이 이 모듈의 usage_service를 import하므로 순환 import를 피해 호출 시점에 import
+    from api.websocket import manager
+    return manager.get_stats()
+
+
 @router.delete("/cache")
 async def clear_all_cache():
     """모든 캐시 클리어"""
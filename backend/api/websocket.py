@@ -1,80 +1,275 @@
 import logging
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from collections import deque
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+from config import config
 from services.watcher import WatcherService
+from api.routes import usage_service
 import asyncio
 
 logger = logging.getLogger(__name__)
 
 websocket_router = APIRouter()
 
+OVERFLOW_POLICIES = ("drop_oldest", "collapse", "disconnect")
+EVICT_CLOSE_CODE = 1013  # Try Again Later
+EVICT_CLOSE_TIMEOUT = 1.0  # 느린 클라이언트에 close 프레임을 보내며 기다리는 최대 시간 (seconds)
+
+
+class ClientSender:
+    """WebSocket 하나의 송신 큐와 전용 writer 태스크
+
+    감시 태스크는 put()으로 큐에 넣기만 하므로 느린 클라이언트가 다른 클라이언트나
+    감시 루프를 막지 않는다. 큐가 가득 차면 policy에 따라 처리한다.
+
+    - drop_oldest: 가장 오래된 메시지를 버림
+    - collapse: 쌓인 메시지를 모두 버리고 resync_message 하나로 대체 (클라이언트가 다시 조회)
+    - disconnect: 연결을 끊음
+
+    batch_window가 있으면 첫 메시지 이후 batch_window초 동안(최대 batch_max개)
+    모은 메시지를 JSON 배열 프레임 하나로 보낸다.
+    """
+
+    def __init__(self, websocket: WebSocket, resync_message: dict,
+                 maxsize: int | None = None, policy: str | None = None,
+                 batch_window: float | None = None, batch_max: int = 1):
+        self.websocket = websocket
+        self.resync_message = resync_message
+        self.maxsize = maxsize or config.WS_SEND_QUEUE_SIZE
+        self.policy = policy or config.WS_OVERFLOW_POLICY
+        if self.policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {self.policy}")
+        self.batch_window = batch_window
+        self.batch_max = batch_max
+        self._queue: deque = deque()
+        self._ready = asyncio.Event()
+        self._send_lock = asyncio.Lock()
+        self._writer: asyncio.Task | None = None
+        self._evict_task: asyncio.Task | None = None
+        self.closed = False
+        # 통계
+        self.max_depth = 0
+        self.sent = 0
+        self.dropped = 0
+        self.collapsed = 0
+        self.evicted = False
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def put(self, item) -> None:
+        """송신 큐에 추가 (대기하지 않음)"""
+        if self.closed:
+            return
+        if len(self._queue) >= self.maxsize:
+            if self.policy == "disconnect":
+                # 이후 put은 바로 반환되므로 eviction 태스크는 한 번만 만들어짐
+                self.closed = True
+                self.evicted = True
+                self._evict_task = asyncio.create_task(self._evict())
+                return
+            if self.policy == "collapse":
+                self.dropped += len(self._queue)
+                self.collapsed += 1
+                self._queue.clear()
+                self._queue.append(self.resync_message)
+            else:
+                self._queue.popleft()
+                self.dropped += 1
+        if self.policy == "collapse" and self._queue and self._queue[0] is self.resync_message:
+            # resync 뒤의 메시지는 클라이언트가 다시 조회할 때 함께 받으므로 큐에 넣지 않음
+            self.dropped += 1
+            return
+        self._queue.append(item)
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._ready.set()
+
+    async def send_text(self, text: str) -> None:
+        """큐를 거치지 않는 제어 메시지 전송 (writer와 전송 순서만 직렬화)"""
+        async with self._send_lock:
+            await self.websocket.send_text(text)
+
+    def close(self) -> None:
+        self.closed = True
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": len(self._queue),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "collapsed": self.collapsed,
+            "evicted": self.evicted,
+        }
+
+    async def _write_loop(self) -> None:
+        while True:
+            await self._ready.wait()
+            if self.batch_window is not None:
+                await self._wait_for_batch()
+                items = [self._queue.popleft() for _ in range(min(self.batch_max, len(self._queue)))]
+                frame = items
+            else:
+                items = [self._queue.popleft()]
+                frame = items[0]
+            if not self._queue:
+                self._ready.clear()
+            try:
+                async with self._send_lock:
+                    await self.websocket.send_json(frame)
+            except Exception as e:
+                logger.debug(f"WebSocket send error: {e}")
+                self.closed = True
+                return
+            self.sent += len(items)
+
+    async def _wait_for_batch(self) -> None:
+        """batch_max개가 모이거나 batch_window가 지날 때까지 대기"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_window
+        while len(self._queue) < self.batch_max:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
+            finally:
+                # 대기 중 추가된 메시지가 있든 없든 큐가 비어 있지 않으면 다시 준비 상태로
+                if self._queue:
+                    self._ready.set()
+
+    async def _evict(self) -> None:
+        logger.warning(f"Evicting slow WebSocket client ({len(self._queue)} queued messages)")
+        self.close()
+        self.dropped += len(self._queue)
+        self._queue.clear()
+        try:
+            await asyncio.wait_for(self.websocket.close(code=EVICT_CLOSE_CODE), EVICT_CLOSE_TIMEOUT)
+        except Exception as e:
+            logger.debug(f"WebSocket close error: {e}")
+
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: dict[str, list[WebSocket]] = {}
+        self.active_connections: dict[str, list[ClientSender]] = {}
+        # 종료된 연결까지 포함한 누적 통계
+        self.totals = {"dropped": 0, "collapsed": 0, "evicted": 0}
 
-    async def connect(self, websocket: WebSocket, session_id: str):
+    async def connect(self, websocket: WebSocket, session_id: str, **sender_options) -> ClientSender:
         await websocket.accept()
-        if session_id not in self.active_connections:
-            self.active_connections[session_id] = []
-        self.active_connections[session_id].append(websocket)
+        sender = ClientSender(websocket, **sender_options)
+        sender.start()
+        self.active_connections.setdefault(session_id, []).append(sender)
         logger.debug(f"WebSocket connected: session_id={session_id}, total_connections={len(self.active_connections[session_id])}")
+        return sender
 
-    def disconnect(self, websocket: WebSocket, session_id: str):
+    def disconnect(self, sender: ClientSender, session_id: str):
+        sender.close()
         if session_id in self.active_connections:
-            if websocket in self.active_connections[session_id]:
-                self.active_connections[session_id].remove(websocket)
+            if sender in self.active_connections[session_id]:
+                self.active_connections[session_id].remove(sender)
+                self.totals["dropped"] += sender.dropped
+                self.totals["collapsed"] += sender.collapsed
+                self.totals["evicted"] += int(sender.evicted)
             remaining = len(self.active_connections.get(session_id, []))
             if not self.active_connections[session_id]:
                 del self.active_connections[session_id]
             logger.debug(f"WebSocket disconnected: session_id={session_id}, remaining_connections={remaining}")
 
     async def broadcast(self, session_id: str, message: dict):
-        if session_id in self.active_connections:
-            disconnected = []
-            for connection in self.active_connections[session_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    disconnected.append(connection)
-            # 연결이 끊긴 클라이언트 제거
-            for conn in disconnected:
-                self.active_connections[session_id].remove(conn)
+        """각 연결의 송신 큐에 추가 (느린 연결이 다른 연결을 기다리게 하지 않음)"""
+        for sender in self.active_connections.get(session_id, []):
+            sender.put(message)
 
+    def get_stats(self) -> dict:
+        connections = [
+            {"channel": channel, **sender.stats()}
+            for channel, senders in self.active_connections.items()
+            for sender in senders
+        ]
+        return {
+            "connections": connections,
+            "total_connections": len(connections),
+            "total_queued": sum(c["queue_depth"] for c in connections),
+            "total_dropped": self.totals["dropped"] + sum(c["dropped"] for c in connections),
+            "total_collapsed": self.totals["collapsed"] + sum(c["collapsed"] for c in connections),
+            "total_evicted": self.totals["evicted"] + sum(int(c["evicted"]) for c in connections),
+        }
+
+
+USAGE_CHANNEL = "__usage__"
+SESSION_RESYNC = {"type": "resync"}
+USAGE_RESYNC = {"type": "usage_reset"}
 
 manager = ConnectionManager()
 watcher_service = WatcherService()
 logger.debug("WebSocket router initialized with ConnectionManager and WatcherService")
 
 
-@websocket_router.websocket("/ws/{session_id}")
-async def websocket_endpoint(websocket: WebSocket, session_id: str):
-    await manager.connect(websocket, session_id)
+async def _receive_until_disconnect(websocket: WebSocket, sender: ClientSender) -> None:
+    """클라이언트 메시지 수신 (keep-alive), 연결이 끊기면 반환"""
+    try:
+        while True:
+            data = await websocket.receive_text()
+            if data == "ping":
+                await sender.send_text("pong")
+    except WebSocketDisconnect:
+        pass
+    except Exception:
+        pass
 
-    # 파일 감시 시작
-    async def on_new_data(data):
-        await manager.broadcast(session_id, data)
 
-    # 세션 메시지 감시
+@websocket_router.websocket("/ws/usage")
+async def usage_websocket_endpoint(websocket: WebSocket):
+    """전체 세션의 usage 증분 스트림 (usage_delta / usage_reset 이벤트)"""
+    sender = await manager.connect(websocket, USAGE_CHANNEL, resync_message=USAGE_RESYNC)
+
+    async def on_usage(data):
+        sender.put(data)
+
+    # 감시 태스크는 모든 대시보드가 공유
     watch_task = asyncio.create_task(
-        watcher_service.watch_session(session_id, on_new_data)
+        watcher_service.watch_usage(usage_service, on_usage)
     )
 
-    # 에이전트 메시지 감시
-    agent_watch_task = asyncio.create_task(
-        watcher_service.watch_agents(session_id, on_new_data)
+    try:
+        await _receive_until_disconnect(websocket, sender)
+    finally:
+        manager.disconnect(sender, USAGE_CHANNEL)
+        watch_task.cancel()
+
+
+@websocket_router.websocket("/ws/{session_id}")
+async def websocket_endpoint(
+    websocket: WebSocket,
+    session_id: str,
+    batch: bool = Query(False, description="메시지를 JSON 배열 프레임으로 묶어서 수신"),
+    batch_ms: int = Query(None, ge=1, le=1000, description="배치 대기 시간 (milliseconds)"),
+    batch_max: int = Query(None, ge=1, le=1000, description="배치 프레임당 최대 메시지 수"),
+):
+    batch_options = {}
+    if batch:
+        batch_options = {
+            "batch_window": (batch_ms or config.WS_BATCH_WINDOW_MS) / 1000,
+            "batch_max": batch_max or config.WS_BATCH_MAX_ITEMS,
+        }
+    sender = await manager.connect(websocket, session_id, resync_message=SESSION_RESYNC, **batch_options)
+
+    async def on_new_data(data):
+        sender.put(data)
+
+    # 세션/에이전트 감시 태스크는 같은 세션을 보는 연결끼리 공유
+    watch_task = asyncio.create_task(
+        watcher_service.subscribe_session(session_id, on_new_data)
     )
 
     try:
-        while True:
-            # 클라이언트 메시지 수신 (keep-alive)
-            data = await websocket.receive_text()
-            if data == "ping":
-                await websocket.send_text("pong")
-    except WebSocketDisconnect:
-        manager.disconnect(websocket, session_id)
-        watch_task.cancel()
-        agent_watch_task.cancel()
-    except Exception:
-        manager.disconnect(websocket, session_id)
+        await _receive_until_disconnect(websocket, sender)
+    finally:
+        manager.disconnect(sender, session_id)
         watch_task.cancel()
-        agent_watch_task.cancel()
@@ -0,0 +1 @@
+"""성능 벤치마크 스크립트 (backend 디렉토리에서 python -m benchmarks.<name> 으로 실행)"""
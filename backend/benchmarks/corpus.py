@@ -0,0 +1,62 @@
+"""벤치마크용 합성 Claude 세션 코퍼스 생성"""
+
+import json
+import random
+from pathlib import Path
+
+MODELS = ["claude-opus-4-20250514", "claude-sonnet-4-20250514"]
+
+
+def write_corpus(projects_dir: Path, projects: int = 4, sessions: int = 25,
+                 turns: int = 400, seed: int = 42) -> int:
+    """실제 세션과 비슷한 비율의 user/tool_result/assistant 라인으로 코퍼스 생성
+
+    Returns:
+        생성된 전체 바이트 수
+    """
+    rng = random.Random(seed)
+    filler = "x" * 2000
+    total = 0
+
+    for p in range(projects):
+        project = projects_dir / f"-bench-project{p}"
+        project.mkdir(parents=True, exist_ok=True)
+        for s in range(sessions):
+            session_id = f"{p:04d}-{s:04d}-bench"
+            lines = [json.dumps({"type": "summary", "summary": f"session {s}", "leafUuid": "x"})]
+            for t in range(turns):
+                ts = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00.000Z"
+                lines.append(json.dumps({
+                    "type": "user",
+                    "timestamp": ts,
+                    "sessionId": session_id,
+                    "cwd": f"/bench/project{p}",
+                    "message": {"role": "user", "content": [
+                        {"type": "tool_result", "tool_use_id": f"t{t}", "content": filler[:rng.randint(100, 2000)]},
+                    ]},
+                }))
+                lines.append(json.dumps({
+                    "type": "assistant",
+                    "timestamp": ts,
+                    "sessionId": session_id,
+                    "requestId": f"req-{p}-{s}-{t}",
+                    "message": {
+                        "id": f"msg-{p}-{s}-{t}",
+                        "model": rng.choice(MODELS),
+                        "content": [
+                            {"type": "text", "text": filler[:rng.randint(50, 500)]},
+                            {"type": "tool_use", "id": f"t{t}", "name": "Read", "input": {"file_path": "/a/b.py"}},
+                        ],
+                        "usage": {
+                            "input_tokens": rng.randint(1, 5000),
+                            "output_tokens": rng.randint(1, 2000),
+                            "cache_creation_input_tokens": rng.randint(0, 1000),
+                            "cache_read_input_tokens": rng.randint(0, 50000),
+                        },
+                    },
+                }))
+            data = "\n".join(lines) + "\n"
+            (project / f"{session_id}.jsonl").write_text(data)
+            total += len(data)
+
+    return total
@@ -0,0 +1,112 @@
+"""세션 카탈로그 조회 지연시간 벤치마크
+
+    python -m benchmarks.session_catalog [세션 수]
+"""
+
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from config import config
+from services.catalog import COLUMNS, UPSERT_SQL, SessionCatalog, build_match_query, project_key
+from services.session import SessionService
+
+WORDS = ["parser", "login", "refactor", "cache", "sqlite", "deploy", "test", "bug", "api", "docs"]
+# 메시지 본문용 어휘 (희귀 단어 검색을 위해 Zipf 분포로 선택)
+VOCABULARY = [f"word{i}" for i in range(20_000)] + WORDS
+
+
+def fill(catalog: SessionCatalog, count: int, projects: int = 200, messages_per_session: int = 10) -> None:
+    """파일을 만들지 않고 카탈로그 행과 메시지 본문만 직접 삽입"""
+    rng = random.Random(1)
+    rows = []
+    messages = []
+    for i in range(count):
+        project_id = f"-Users-bench-project{i % projects}"
+        summary = " ".join(rng.choice(WORDS) for _ in range(4))
+        first_message = " ".join(rng.choice(WORDS) for _ in range(12))
+        row = {
+            "path": f"/bench/{project_id}/session-{i}.jsonl",
+            "session_id": f"session-{i}",
+            "project_id": project_id,
+            "is_agent": int(i % 5 == 0),
+            "size": rng.randint(1_000, 10_000_000),
+            "mtime": 1_700_000_000 + rng.random() * 30_000_000,
+            "first_timestamp": None,
+            "last_timestamp": None,
+            "summary": summary,
+            "leaf_uuid": None,
+            "first_message": first_message,
+            "message_count": rng.randint(1, 500),
+            "user_message_count": 0,
+            "tool_calls": json.dumps({"Read": rng.randint(0, 50)}),
+            "agent_count": 0,
+            "agent_ids": "[]",
+            "agent_id": None,
+            "parent_session_id": None,
+            "search_text": f"{summary} {first_message} {project_id}".lower(),
+            "inode": 0,
+            "scanned": 0,
+            "fingerprint": b"",
+        }
+        rows.append(tuple(row[c] for c in COLUMNS))
+        for n in range(messages_per_session):
+            body = " ".join(
+                VOCABULARY[min(int(rng.paretovariate(0.6)), len(VOCABULARY)) - 1] for _ in range(40)
+            )
+            messages.append((row["path"], project_id, project_key(project_id), n * 1000, "user", None, body))
+    conn = catalog._connect()
+    conn.executemany(UPSERT_SQL, rows)
+    conn.executemany(
+        "INSERT INTO messages (path, project_id, project_key, offset, role, timestamp, body) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        messages,
+    )
+    conn.commit()
+    catalog._reconciled = True
+
+
+def timed(label: str, query, repeat: int = 20) -> None:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rows = query()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label}: {elapsed * 1000:.2f} ms ({len(rows)} rows)")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    config.CATALOG_RECONCILE_INTERVAL = 0  # 백그라운드 reconciler 비활성
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = SessionCatalog(Path(tmp) / "catalog.db", Path(tmp) / "projects")
+        start = time.perf_counter()
+        fill(catalog, count)
+        print(f"insert {count} rows: {time.perf_counter() - start:.2f}s")
+
+        timed("list_sessions(project)", lambda: catalog.list_sessions("-Users-bench-project7"))
+        timed("sessions_in_range(1 day)", lambda: catalog.sessions_in_range(1_710_000_000, 1_710_086_400))
+        timed("sessions_in_range(1 day, 3 projects)", lambda: catalog.sessions_in_range(
+            1_710_000_000, 1_710_086_400,
+            ["-Users-bench-project1", "-Users-bench-project2", "-Users-bench-project3"]))
+        timed("search(common keyword)", lambda: catalog.search("sqlite deploy"))
+        timed("search(rare keyword)", lambda: catalog.search("project77 "))
+        for query in ["word1", "word5000", '"word2 word3"', "word12*", "word3 word4 word9"]:
+            match = build_match_query(query)
+            timed(f"search_messages({query})", lambda: catalog.search_messages(match, limit=100))
+        timed("search_messages(word2, project)", lambda: catalog.search_messages(
+            build_match_query("word2"), "-Users-bench-project7", limit=100))
+
+        service = SessionService()
+        service.catalog = catalog
+        timed("service.search(word50) with snippets", lambda: service.search("word50"), repeat=5)
+        timed("iter_search(word1) first result", lambda: [next(service.iter_search("word1"))], repeat=5)
+        timed("iter_search(word1) all results", lambda: list(service.iter_search("word1")), repeat=1)
+        catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""세션 히스토리 tail 읽기 벤치마크
+
+    python -m benchmarks.session_history [파일 크기 MB]
+"""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from services.locator import SessionLocator
+from services.session import SessionService
+
+
+def write_session(path: Path, size_mb: int) -> None:
+    """tool_result가 큰 사용자/어시스턴트 메시지로 size_mb 크기의 세션 작성"""
+    user = json.dumps({"type": "user", "message": {"content": [
+        {"type": "tool_result", "tool_use_id": "toolu_1", "content": "y" * 4000}]}})
+    assistant = json.dumps({"type": "assistant", "message": {"content": [
+        {"type": "text", "text": "x" * 1000},
+        {"type": "tool_use", "id": "toolu_1", "name": "Read", "input": {"file_path": "/a/b.py"}}]}})
+    with open(path, "w") as f:
+        while f.tell() < size_mb * 1024 * 1024:
+            f.write(user + "\n" + assistant + "\n")
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    with tempfile.TemporaryDirectory() as tmp:
+        projects = Path(tmp) / "projects"
+        (projects / "-bench").mkdir(parents=True)
+        write_session(projects / "-bench" / "s1.jsonl", size_mb)
+
+        service = SessionService()
+        service.locator = SessionLocator(projects, watch=False)
+
+        for limit in (100, 1000, 0):
+            start = time.perf_counter()
+            messages = service.get_history("s1", limit)
+            label = limit or "all"
+            print(f"get_history(limit={label}) on {size_mb} MB: "
+                  f"{(time.perf_counter() - start) * 1000:.1f} ms ({len(messages)} messages)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""usage 파싱 워커 수별 스케일링 벤치마크
+
+    python -m benchmarks.usage_parse [최대 워커 수]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from config import config
+from services.usage import UsageLedger
+from benchmarks.corpus import write_corpus
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    config.USAGE_PARALLEL_MIN_BYTES = 0
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        projects_dir = Path(tmpdir) / "projects"
+        total_bytes = write_corpus(projects_dir)
+        print(f"corpus: {total_bytes / 1024 / 1024:.1f} MB")
+
+        baseline = None
+        for workers in range(1, max_workers + 1):
+            start = time.perf_counter()
+            entries = UsageLedger(workers=workers).refresh(projects_dir)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"workers={workers}: {elapsed:.2f}s "
+                  f"({total_bytes / 1024 / 1024 / elapsed:.0f} MB/s, "
+                  f"x{baseline / elapsed:.2f}, {len(entries)} entries)")
+
+
+if __name__ == "__main__":
+    main()
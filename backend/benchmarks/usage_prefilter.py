@@ -0,0 +1,38 @@
+"""usage 파싱 단계의 prefilter 전후 처리량(MB/s) 벤치마크
+
+    python -m benchmarks.usage_prefilter
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+from services.usage import LedgerRecord, parse_usage_tail
+from benchmarks.corpus import write_corpus
+
+
+def parse_all(files: list[Path], prefilter: bool) -> int:
+    rows = 0
+    for path in files:
+        record = LedgerRecord(project_name=path.parent.name)
+        rows += parse_usage_tail(path, record, prefilter=prefilter)
+    return rows
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        projects_dir = Path(tmpdir) / "projects"
+        total_bytes = write_corpus(projects_dir)
+        files = sorted(projects_dir.rglob("*.jsonl"))
+        megabytes = total_bytes / 1024 / 1024
+        print(f"corpus: {megabytes:.1f} MB, {len(files)} files")
+
+        for label, prefilter in (("json.loads every line", False), ("b'\"usage\"' prefilter", True)):
+            start = time.perf_counter()
+            rows = parse_all(files, prefilter)
+            elapsed = time.perf_counter() - start
+            print(f"{label}: {elapsed:.2f}s, {megabytes / elapsed:.0f} MB/s ({rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""UsageService 실제 메모리 사용량/집계 시간 벤치마크
+
+합성 코퍼스를 UsageService로 병합한 뒤 서비스가 붙잡고 있는 메모리
+(ledger의 파일별 row, 병합 테이블, rollup, 블록 집계 포함)를 tracemalloc으로 잰다.
+
+    python -m benchmarks.usage_table [프로젝트당 세션 수]
+"""
+
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from services.usage import UsageService
+from benchmarks.corpus import write_corpus
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        total_bytes = write_corpus(Path(tmpdir) / "projects", sessions=sessions)
+        print(f"corpus: {total_bytes / 1024 / 1024:.1f} MB")
+
+        gc.collect()
+        tracemalloc.start()
+        service = UsageService()
+        service.claude_path = Path(tmpdir)
+        service.ledger.storage_path = None
+
+        start = time.perf_counter()
+        stats = service.get_usage_stats()
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"UsageService ({stats['total_sessions']} entries): resident {current / 1024 / 1024:.1f} MB, "
+              f"peak {peak / 1024 / 1024:.1f} MB, first merge {elapsed:.2f}s (tracemalloc 포함)")
+
+        start = time.perf_counter()
+        service.get_usage_stats()
+        print(f"get_usage_stats (unchanged): {time.perf_counter() - start:.3f}s")
+
+        start = time.perf_counter()
+        service.get_usage_by_date_range("2025-03-05T12:00:00Z", "2025-09-20T06:00:00Z")
+        print(f"get_usage_by_date_range: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""세션 감시 유휴 CPU 벤치마크 (폴링 vs 파일시스템 이벤트)
+
+    python -m benchmarks.watch_idle [세션 수] [측정 시간(초)]
+
+세션마다 에이전트 파일 하나와 구독자 하나를 두고, 파일 변경 없이 대기하는
+동안의 프로세스 CPU 시간과 라인 추가 후 전달 지연시간을 측정한다.
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from config import config
+from services.locator import SessionLocator
+from services.watcher import WatcherService
+
+
+def make_projects(root: Path, sessions: int) -> Path:
+    projects = root / "projects"
+    for i in range(sessions):
+        project = projects / f"-bench-project{i % 10}"
+        project.mkdir(parents=True, exist_ok=True)
+        (project / f"s{i}.jsonl").write_text("")
+        (project / f"agent-a{i}.jsonl").write_text(json.dumps({"sessionId": f"s{i}", "agentId": f"a{i}"}) + "\n")
+    return projects
+
+
+async def measure(projects: Path, sessions: int, seconds: float, mode: str) -> None:
+    config.WATCH_MODE = mode
+    watcher = WatcherService()
+    watcher.locator = SessionLocator(projects, watch=(mode == "events"))
+    received = asyncio.Event()
+
+    async def callback(event):
+        received.set()
+
+    tasks = [asyncio.create_task(watcher.subscribe_session(f"s{i}", callback)) for i in range(sessions)]
+    await asyncio.sleep(1)  # 감시 시작 대기
+
+    cpu = time.process_time()
+    await asyncio.sleep(seconds)
+    idle = (time.process_time() - cpu) / seconds * 100
+
+    path = watcher.locator.find("s0")
+    start = time.perf_counter()
+    with open(path, "a") as f:
+        f.write(json.dumps({"type": "user", "message": {"content": "ping"}}) + "\n")
+    await asyncio.wait_for(received.wait(), 10)
+    latency = (time.perf_counter() - start) * 1000
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    watcher.locator.close()
+    if watcher.locator._watcher is not None:
+        watcher.locator._watcher.join(10)  # 감시 스레드가 끝나기 전에 인터프리터가 종료되지 않도록
+    print(f"{mode}: idle CPU {idle:.1f}% ({sessions} sessions), delivery latency {latency:.0f} ms")
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    config.LOCATOR_RESCAN_INTERVAL = 3600  # 폴링 모드에서도 재스캔 비용은 제외
+
+    with tempfile.TemporaryDirectory() as tmp:
+        projects = make_projects(Path(tmp), sessions)
+        for mode in ("poll", "events"):
+            asyncio.run(measure(projects, sessions, seconds, mode))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,28 @@
+import os
 from pathlib import Path
 
 
 class Config:
     CLAUDE_DIR = Path.home() / ".claude"
     PROJECTS_DIR = CLAUDE_DIR / "projects"
-    WATCH_INTERVAL = 0.2  # seconds
+    WATCH_INTERVAL = 0.2  # 폴링 모드 감시 주기 (seconds)
+    WATCH_MODE = "events"  # "events": 파일시스템 이벤트(watchfiles), "poll": stat 폴링
+    WATCH_EVENT_TIMEOUT = 5.0  # 이벤트 모드에서 이벤트가 없어도 다시 확인하는 간격 (seconds)
+    WATCH_DEBOUNCE_MS = 100  # 파일시스템 이벤트를 묶는 최대 시간 (milliseconds)
+    WS_BATCH_WINDOW_MS = 30  # 배치 모드 WebSocket에서 메시지를 모으는 최대 시간 (milliseconds)
+    WS_BATCH_MAX_ITEMS = 100  # 배치 프레임 하나에 담는 최대 메시지 수
+    WS_SEND_QUEUE_SIZE = 1000  # WebSocket 연결당 송신 큐 최대 길이
+    WS_OVERFLOW_POLICY = "collapse"  # 송신 큐가 가득 찼을 때: "drop_oldest", "collapse"(resync 전송), "disconnect"
+    USAGE_WATCH_INTERVAL = 1.0  # 변경 피드가 없을 때 전체 usage 감시 주기 (seconds)
+    USAGE_FEED_RESCAN_INTERVAL = 300.0  # 변경 피드 동작 중 usage 전체 재스캔 주기 (놓친 이벤트/하위 디렉토리 파일 대비)
+    LOCATOR_RESCAN_INTERVAL = 10.0  # 색인에 없는 세션 ID 조회 시 재스캔 최소 간격 (seconds)
+    CATALOG_RECONCILE_INTERVAL = 5.0  # 세션 카탈로그 갱신 주기 (seconds, 0이면 비활성)
+    CATALOG_FEED_RECONCILE_INTERVAL = 300.0  # 변경 피드 동작 중 카탈로그 전체 갱신 주기 (놓친 이벤트 대비)
+    CHANGE_FEED_CACHE_TTL = 600  # 변경 피드 동작 중 목록/메타데이터 캐시 TTL (seconds)
+    USAGE_PARSE_WORKERS = min(8, os.cpu_count() or 1)  # 1이면 직렬 파싱
+    USAGE_PARALLEL_MIN_BYTES = 32 * 1024 * 1024  # 이보다 적으면 직렬 파싱
+    USAGE_BLOCK_HOURS = 5  # 과금 블록 길이
+    USAGE_BLOCK_TOKEN_LIMIT = None  # 블록당 토큰 한도 (소진 시각 예측용)
 
 
 config = Config()
@@ -2,6 +2,7 @@
 """Standalone launcher for Claude Monitor backend."""
 import sys
 import os
+import multiprocessing
 
 # PyInstaller로 패키징된 경우 _MEIPASS 사용
 if getattr(sys, 'frozen', False):
@@ -15,6 +16,8 @@ sys.path.insert(0, base_path)
 import uvicorn
 
 if __name__ == "__main__":
+    # usage 파싱 프로세스 풀이 패키징 환경에서도 동작하도록
+    multiprocessing.freeze_support()
     port = int(os.environ.get("PORT", "8000"))
     uvicorn.run(
         "main:app",
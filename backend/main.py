@@ -8,6 +8,7 @@ import sys
 import os
 
 from api.routes import router
+from services.catalog import session_catalog
 from api.websocket import websocket_router
 from api.analysis_routes import router as analysis_router
 from api.work_analysis_routes import router as work_analysis_router
@@ -43,6 +44,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Prev-Cursor", "X-Next-Cursor", "X-Total-Count"],
 )
 
 # 프론트엔드 경로 설정
@@ -55,6 +57,12 @@ else:
 logger.debug(f"Frontend dist path: {frontend_dist}")
 
 
+@app.on_event("startup")
+async def start_background_services():
+    """세션 카탈로그 첫 동기화(FTS 색인 포함)를 요청 처리와 분리하여 백그라운드에서 시작"""
+    session_catalog.start()
+
+
 @app.get("/health")
 async def health_check():
     """헬스 체크"""
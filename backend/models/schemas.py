@@ -36,6 +36,16 @@ class SessionMetadata(BaseModel):
     leaf_uuid: Optional[str] = None
 
 
+class AgentSummary(BaseModel):
+    """백그라운드 에이전트 요약 (메시지는 에이전트 히스토리 API로 조회)"""
+    agent_id: str
+    size: int
+    size_human: str
+    message_count: int = 0
+    updated_at: datetime
+    tool_calls: dict[str, int] = {}
+
+
 class ToolCall(BaseModel):
     type: str = "tool"
     name: str
@@ -68,6 +78,16 @@ class ResumeResult(BaseModel):
     status: str = "started"
 
 
+class SearchHit(BaseModel):
+    """검색어와 일치한 메시지 (offset/cursor로 히스토리의 해당 위치 조회)"""
+    offset: int
+    cursor: str
+    role: str
+    timestamp: Optional[str] = None
+    snippet: str
+    highlights: list[tuple[int, int]] = []  # snippet 기준 (시작, 끝) 글자 위치
+
+
 class SearchResult(BaseModel):
     session_id: str
     project_id: str
@@ -80,3 +100,5 @@ class SearchResult(BaseModel):
     has_agents: bool = False
     agent_count: int = 0
     tool_calls: dict[str, int] = {}
+    score: Optional[float] = None  # 본문 검색 관련도 (bm25, 낮을수록 관련도 높음)
+    hits: list[SearchHit] = []
@@ -7,7 +7,6 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
-from config import config
 from models.analysis import Analysis, AnalysisListItem, AnalysisRequest
 from services.cache import cache_manager, CACHE_ANALYSES
 from services.common import (
@@ -21,6 +20,7 @@ from services.common import (
     parse_stream_event,
 )
 from services.common.utils import clean_content
+from services.locator import session_locator
 
 logger = logging.getLogger(__name__)
 
@@ -99,14 +99,8 @@ class AnalysisService:
         logger.debug(f"AnalysisService initialized. Storage: {self.STORAGE_DIR}")
 
     def _find_session_file(self, session_id: str) -> Path | None:
-        """세션 ID로 JSONL 파일 찾기"""
-        for project_dir in config.PROJECTS_DIR.iterdir():
-            if not project_dir.is_dir():
-                continue
-            session_file = project_dir / f"{session_id}.jsonl"
-            if session_file.exists():
-                return session_file
-        return None
+        """세션 ID로 JSONL 파일 찾기 (전역 색인)"""
+        return session_locator.find(session_id)
 
     def _get_projects_from_sessions(self, session_ids: list[str]) -> set[str]:
         """세션 ID들로부터 프로젝트 ID 추출"""
@@ -45,11 +45,25 @@ class CacheManager:
                 "misses": 0,
                 "maxsize": maxsize,
                 "ttl": ttl,
+                "default_ttl": ttl,
                 "created_at": datetime.now(),
             }
             logger.debug(f"Cache created: {name} (maxsize={maxsize}, ttl={ttl}s)")
             return cache
 
+    def set_ttl(self, name: str, ttl: int | None = None) -> None:
+        """캐시 TTL 변경 (None이면 생성 시 TTL로 복원, 기존 항목은 비워짐)"""
+        with self._lock:
+            if name not in self._caches:
+                return
+            stat = self._stats[name]
+            ttl = stat["default_ttl"] if ttl is None else ttl
+            if ttl == stat["ttl"]:
+                return
+            self._caches[name] = TTLCache(maxsize=stat["maxsize"], ttl=ttl)
+            stat["ttl"] = ttl
+            logger.debug(f"Cache TTL changed: {name} (ttl={ttl}s)")
+
     def get_cache(self, name: str) -> TTLCache | None:
         """캐시 조회"""
         return self._caches.get(name)
@@ -82,6 +96,17 @@ class CacheManager:
             return True
         return False
 
+    def delete_prefix(self, cache_name: str, prefix: str) -> int:
+        """키가 prefix로 시작하는 값 모두 삭제"""
+        cache = self._caches.get(cache_name)
+        if cache is None:
+            return 0
+        with self._lock:
+            keys = [key for key in list(cache.keys()) if key.startswith(prefix)]
+            for key in keys:
+                cache.pop(key, None)
+        return len(keys)
+
     def clear(self, cache_name: str | None = None) -> int:
         """캐시 클리어"""
         cleared = 0
@@ -0,0 +1,858 @@
+"""세션 카탈로그 (SQLite)
+
+요청마다 ~/.claude/projects를 순회하며 stat/파싱하는 대신, 세션 파일당 한 행을
+SQLite에 보관하고 목록/검색/날짜 범위 조회를 인덱스 쿼리로 처리한다.
+행은 파일 식별 정보(경로, inode, 크기, mtime)가 같으면 재시작 후에도 그대로
+사용하며, 변경 피드 이벤트로 바뀐 파일만 바로 갱신하고 백그라운드 reconciler가
+놓친 변경을 주기적으로 맞춘다. 뒤로 늘어난
+파일은 이전에 읽은 위치부터 추가분만 파싱하여 기존 집계에 합친다. 사용자 프롬프트와 어시스턴트 텍스트는
+메시지 단위 FTS5 색인에 함께 저장된다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from config import config
+from models.schemas import SessionMetadata
+from services.change_feed import ChangeEvent, change_feed, SESSION_DELETED, RESYNC
+from services.common import format_size, is_system_message
+from services.common.constants import DEFAULT_STORAGE_DIR
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILE = DEFAULT_STORAGE_DIR / "session_catalog.db"
+CATALOG_SCHEMA_VERSION = 2
+FINGERPRINT_BYTES = 64
+MAX_BODY_CHARS = 20_000  # 메시지 하나에서 색인할 최대 글자 수
+SCAN_BATCH_BYTES = 8 * 1024 * 1024  # 이만큼 파싱할 때마다 한 번씩 기록
+# 관련도 점수는 일치한 메시지를 최신순으로 N개씩 나눠 계산 (흔한 단어 검색의 지연시간 상한)
+RANK_CANDIDATES = 2000
+SNIPPET_CHARS = 160
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    path TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    project_id TEXT NOT NULL,
+    is_agent INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    first_timestamp TEXT,
+    last_timestamp TEXT,
+    summary TEXT,
+    leaf_uuid TEXT,
+    first_message TEXT,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    user_message_count INTEGER NOT NULL DEFAULT 0,
+    tool_calls TEXT NOT NULL DEFAULT '{}',
+    agent_count INTEGER NOT NULL DEFAULT 0,
+    agent_ids TEXT NOT NULL DEFAULT '[]',
+    agent_id TEXT,
+    parent_session_id TEXT,
+    search_text TEXT NOT NULL DEFAULT '',
+    inode INTEGER NOT NULL DEFAULT 0,
+    scanned INTEGER NOT NULL DEFAULT 0,
+    fingerprint BLOB NOT NULL DEFAULT x''
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    project_id TEXT NOT NULL,
+    project_key TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    timestamp TEXT,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS offset_indexes (
+    path TEXT PRIMARY KEY,
+    stride INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    scanned INTEGER NOT NULL,
+    fingerprint BLOB NOT NULL,
+    count INTEGER NOT NULL,
+    checkpoints BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_messages_path ON messages (path);
+CREATE INDEX IF NOT EXISTS idx_sessions_project_mtime ON sessions (project_id, mtime);
+CREATE INDEX IF NOT EXISTS idx_sessions_mtime ON sessions (mtime);
+CREATE INDEX IF NOT EXISTS idx_sessions_session_id ON sessions (session_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_parent ON sessions (parent_session_id);
+"""
+
+# 부분 문자열 검색용 trigram 색인 (FTS5가 없는 SQLite면 instr 전체 스캔으로 대체)
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS sessions_search USING fts5(
+    search_text, content='sessions', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS sessions_search_insert AFTER INSERT ON sessions BEGIN
+    INSERT INTO sessions_search (rowid, search_text) VALUES (new.rowid, new.search_text);
+END;
+CREATE TRIGGER IF NOT EXISTS sessions_search_delete AFTER DELETE ON sessions BEGIN
+    INSERT INTO sessions_search (sessions_search, rowid, search_text)
+    VALUES ('delete', old.rowid, old.search_text);
+END;
+CREATE TRIGGER IF NOT EXISTS sessions_search_update AFTER UPDATE ON sessions BEGIN
+    INSERT INTO sessions_search (sessions_search, rowid, search_text)
+    VALUES ('delete', old.rowid, old.search_text);
+    INSERT INTO sessions_search (rowid, search_text) VALUES (new.rowid, new.search_text);
+END;
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    body, project_key, content='messages', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, body, project_key) VALUES (new.id, new.body, new.project_key);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, body, project_key)
+    VALUES ('delete', old.id, old.body, old.project_key);
+END;
+"""
+TRIGRAM = 3
+
+# 검색어 구문: "따옴표 구문" 또는 공백으로 구분된 단어 (끝에 *가 있으면 접두사)
+QUERY_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+# FTS5 unicode61 토크나이저와 같은 단위 (문자/숫자 연속, 밑줄은 구분자)
+WORD_RE = re.compile(r"[^\W_]+")
+
+COLUMNS = (
+    "path", "session_id", "project_id", "is_agent", "size", "mtime",
+    "first_timestamp", "last_timestamp", "summary", "leaf_uuid", "first_message",
+    "message_count", "user_message_count", "tool_calls", "agent_count", "agent_ids",
+    "agent_id", "parent_session_id", "search_text", "inode", "scanned", "fingerprint",
+)
+
+# INSERT OR REPLACE는 delete 트리거를 발생시키지 않으므로 UPSERT 사용
+UPSERT_SQL = (
+    f"INSERT INTO sessions ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in COLUMNS)}) "
+    f"ON CONFLICT(path) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in COLUMNS[1:])
+)
+
+
+def scan_session_file(path: Path, project_id: str, stat: os.stat_result,
+                      previous: Optional[sqlite3.Row] = None) -> tuple[dict, list[tuple], bool]:
+    """세션 파일을 읽어 카탈로그 행과 색인할 메시지 목록 생성
+
+    previous 행이 같은 파일을 앞부분까지 읽은 결과이면 이어서 추가분만 읽는다.
+    줄바꿈으로 끝나지 않은 마지막 라인은 완성될 때까지 남겨둔다.
+
+    Returns:
+        row: 카탈로그 행
+        messages: (path, project_id, project_key, offset, role, timestamp, body) 목록
+        reset: 처음부터 다시 읽었는지 여부 (기존 메시지 색인 삭제 필요)
+    """
+    reset = previous is None or not _can_resume(path, previous, stat)
+    if reset:
+        row = {
+            "path": str(path),
+            "session_id": path.stem,
+            "project_id": project_id,
+            "is_agent": int(path.name.startswith("agent-")),
+            "first_timestamp": None,
+            "last_timestamp": None,
+            "summary": None,
+            "leaf_uuid": None,
+            "first_message": None,
+            "message_count": 0,
+            "user_message_count": 0,
+            "agent_id": None,
+            "parent_session_id": None,
+            "scanned": 0,
+        }
+        tool_calls: dict[str, int] = {}
+        agent_ids: set[str] = set()
+    else:
+        row = dict(previous)
+        tool_calls = json.loads(row["tool_calls"])
+        agent_ids = set(json.loads(row["agent_ids"]))
+
+    messages: list[tuple] = []
+    key = project_key(project_id)
+    # 에이전트 파일 본문은 검색 대상이 아니므로 색인하지 않음
+    index_bodies = not row["is_agent"]
+    pos = row["scanned"]
+
+    with open(path, "rb") as f:
+        f.seek(pos)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset = pos
+            pos += len(line)
+            try:
+                data = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if not isinstance(data, dict):
+                continue
+
+            msg_type = data.get("type")
+
+            if offset == 0:
+                if msg_type == "summary":
+                    row["summary"] = data.get("summary")
+                    row["leaf_uuid"] = data.get("leafUuid")
+                # 에이전트 파일은 첫 줄의 sessionId가 부모 세션
+                if row["is_agent"]:
+                    row["parent_session_id"] = data.get("sessionId")
+                    row["agent_id"] = data.get("agentId", path.stem.replace("agent-", ""))
+
+            timestamp = data.get("timestamp")
+            if timestamp:
+                if row["first_timestamp"] is None or timestamp < row["first_timestamp"]:
+                    row["first_timestamp"] = timestamp
+                if row["last_timestamp"] is None or timestamp > row["last_timestamp"]:
+                    row["last_timestamp"] = timestamp
+
+            message = data.get("message")
+            if not isinstance(message, dict):
+                message = {}
+
+            if msg_type == "user":
+                row["user_message_count"] += 1
+                if not row["first_message"]:
+                    display = data.get("display", "")
+                    if not display:
+                        msg_content = message.get("content", "")
+                        display = msg_content if isinstance(msg_content, str) else ""
+                    row["first_message"] = display[:100]
+
+            if msg_type in ["user", "assistant"]:
+                row["message_count"] += 1
+                if index_bodies:
+                    body = extract_message_text(msg_type, message)
+                    if body:
+                        messages.append((str(path), project_id, key, offset, msg_type, timestamp, body))
+
+            if msg_type == "assistant":
+                content = message.get("content", [])
+                if not isinstance(content, list):
+                    continue
+                for c in content:
+                    if isinstance(c, dict) and c.get("type") == "tool_use":
+                        tool_name = c.get("name", "Unknown")
+                        tool_calls[tool_name] = tool_calls.get(tool_name, 0) + 1
+
+                        if tool_name == "Task":
+                            agent_id = c.get("id", "")[:7]
+                            if agent_id:
+                                agent_ids.add(agent_id)
+
+        start = max(0, pos - FINGERPRINT_BYTES)
+        f.seek(start)
+        fingerprint = f.read(pos - start)
+
+    row["size"] = stat.st_size
+    row["mtime"] = stat.st_mtime
+    row["inode"] = stat.st_ino
+    row["scanned"] = pos
+    row["fingerprint"] = fingerprint
+    row["tool_calls"] = json.dumps(tool_calls)
+    row["agent_ids"] = json.dumps(sorted(agent_ids))
+    row["agent_count"] = len(agent_ids)
+    # 검색은 대소문자 구분 없이 요약/첫 메시지/프로젝트 ID를 대상으로 함
+    row["search_text"] = f"{row['summary'] or ''} {row['first_message'] or ''} {project_id}".lower()
+    return row, messages, reset
+
+
+def _can_resume(path: Path, previous: sqlite3.Row, stat: os.stat_result) -> bool:
+    """이전 행에 이어서 읽을 수 있는지 확인 (같은 파일이 뒤로만 늘어난 경우)"""
+    if previous["inode"] != stat.st_ino or stat.st_size < previous["scanned"]:
+        return False
+    fingerprint = previous["fingerprint"]
+    if not fingerprint:
+        return previous["scanned"] == 0
+    try:
+        with open(path, "rb") as f:
+            f.seek(previous["scanned"] - len(fingerprint))
+            return f.read(len(fingerprint)) == fingerprint
+    except OSError:
+        return False
+
+
+def extract_message_text(msg_type: str, message: dict) -> str:
+    """검색 색인용 메시지 본문 (사용자 프롬프트/어시스턴트 텍스트, 시스템 메시지 제외)"""
+    content = message.get("content", "")
+    if isinstance(content, str):
+        parts = [content]
+    elif isinstance(content, list):
+        parts = [
+            item.get("text", "") for item in content
+            if isinstance(item, dict) and item.get("type") == "text"
+        ]
+    else:
+        return ""
+
+    text = "\n".join(p for p in parts if isinstance(p, str)).strip()
+    if msg_type == "user" and is_system_message(text):
+        return ""
+    return text[:MAX_BODY_CHARS]
+
+
+def project_key(project_id: str) -> str:
+    """프로젝트 필터용 FTS 토큰 (프로젝트 ID의 '-'는 토큰 구분자라 해시로 대체)"""
+    return "p" + hashlib.sha1(project_id.encode()).hexdigest()[:16]
+
+
+def fold_token(token: str) -> str:
+    """unicode61 remove_diacritics 토큰 정규화 (대소문자/발음 구별 기호 무시)"""
+    if token.isascii():
+        return token.lower()
+    decomposed = unicodedata.normalize("NFKD", token)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def parse_query(query: str) -> list[tuple[list[str], bool]]:
+    """검색어를 (토큰 목록, 접두사 여부) 항목으로 분리
+
+    "따옴표"는 구문 검색, 끝에 *가 붙은 단어는 접두사 검색이다. 구두점이 섞인
+    단어는 FTS5 색인과 같이 여러 토큰의 구문으로 취급한다.
+    """
+    terms = []
+    for phrase, word in QUERY_TOKEN_RE.findall(query):
+        prefix = not phrase and word.endswith("*")
+        tokens = [fold_token(t) for t in WORD_RE.findall(phrase or word)]
+        if tokens:
+            terms.append((tokens, prefix))
+    return terms
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """사용자 검색어를 FTS5 MATCH 구문으로 변환 (모든 항목을 포함해야 함, AND)"""
+    return " ".join(
+        '"' + " ".join(tokens) + '"' + ("*" if prefix else "")
+        for tokens, prefix in parse_query(query)
+    ) or None
+
+
+def highlight_spans(text: str, terms: list[tuple[list[str], bool]]) -> list[tuple[int, int]]:
+    """본문에서 검색 항목과 일치하는 (시작, 끝) 글자 위치"""
+    if not terms:
+        return []
+    if text.isascii():
+        # ASCII 본문은 토큰 정규화가 대소문자 무시와 같으므로 정규식 한 번으로 찾음
+        return [m.span() for m in _term_pattern(terms).finditer(text)]
+
+    words = [(m.start(), m.end(), fold_token(m.group())) for m in WORD_RE.finditer(text)]
+    spans = []
+    for i in range(len(words)):
+        for tokens, prefix in terms:
+            if i + len(tokens) > len(words):
+                continue
+            window = [w[2] for w in words[i:i + len(tokens)]]
+            if window[:-1] != tokens[:-1]:
+                continue
+            last = window[-1]
+            if last == tokens[-1] or (prefix and last.startswith(tokens[-1])):
+                spans.append((words[i][0], words[i + len(tokens) - 1][1]))
+                break
+    return spans
+
+
+def _term_pattern(terms: list[tuple[list[str], bool]]) -> re.Pattern:
+    alternatives = []
+    for tokens, prefix in terms:
+        body = r"[\W_]+".join(re.escape(t) for t in tokens)
+        alternatives.append(body + (r"[^\W_]*" if prefix else "") + r"(?![^\W_])")
+    return re.compile(r"(?<![^\W_])(?:" + "|".join(alternatives) + ")", re.IGNORECASE)
+
+
+def make_snippet(text: str, spans: list[tuple[int, int]],
+                 width: int = SNIPPET_CHARS) -> tuple[str, list[tuple[int, int]]]:
+    """첫 일치 위치 주변 width자 발췌와 발췌 기준 강조 위치"""
+    start = max(0, spans[0][0] - width // 4) if spans else 0
+    end = min(len(text), start + width)
+    start = max(0, min(start, end - width))
+    head = "…" if start > 0 else ""
+    # 한 줄로 표시하되 글자 수는 그대로 두어 강조 위치를 유지
+    snippet = head + text[start:end].replace("\n", " ")
+    if end < len(text):
+        snippet += "…"
+    shift = len(head) - start
+    return snippet, [(s + shift, e + shift) for s, e in spans if s >= start and e <= end]
+
+
+def file_identity(stat: os.stat_result) -> tuple[int, int, float]:
+    """카탈로그 행이 최신인지 판단하는 파일 식별 정보 (경로 외)"""
+    return stat.st_ino, stat.st_size, stat.st_mtime
+
+
+def row_to_metadata(row: sqlite3.Row) -> SessionMetadata:
+    """카탈로그 행을 SessionMetadata로 변환"""
+    return SessionMetadata(
+        session_id=row["session_id"],
+        size=row["size"],
+        size_human=format_size(row["size"]),
+        updated_at=datetime.fromtimestamp(row["mtime"]),
+        summary=row["summary"],
+        first_message=row["first_message"],
+        message_count=row["message_count"],
+        user_message_count=row["user_message_count"],
+        tool_calls=json.loads(row["tool_calls"]),
+        has_agents=row["agent_count"] > 0,
+        agent_count=row["agent_count"],
+        leaf_uuid=row["leaf_uuid"],
+    )
+
+
+class SessionCatalog:
+    """세션 파일당 한 행을 보관하는 SQLite 카탈로그
+
+    db_path가 None이면 메모리 DB를 사용한다. start()로 시작한 백그라운드 스레드가
+    처음 한 번 전체를 맞춘 뒤 config.CATALOG_RECONCILE_INTERVAL 주기(피드 동작
+    중에는 config.CATALOG_FEED_RECONCILE_INTERVAL)로 다시 맞추고, 그 사이에는
+    변경 피드 이벤트(apply_changes)로 파일 단위 갱신한다. 첫 동기화가 끝나기 전의
+    세션 목록/기간 조회는 디렉토리 스캔으로 응답하고, 검색은 첫 동기화가 끝날 때까지 기다린다.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, projects_dir: Optional[Path] = None):
+        self.db_path = db_path
+        self.projects_dir = projects_dir if projects_dir is not None else config.PROJECTS_DIR
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._fts = False
+        self._reconciled = False
+        self._ready = threading.Event()  # 첫 동기화 시도가 끝나면 set
+        self._reconciler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ---- 연결/스키마 ----
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+
+        conn = None
+        if self.db_path is not None:
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA cache_size=-32768")  # 32MB
+                self._init_schema(conn)
+            except (sqlite3.DatabaseError, OSError) as e:
+                logger.warning(f"Failed to open session catalog {self.db_path}: {e}")
+                if conn is not None:
+                    conn.close()
+                conn = None
+
+        if conn is None:
+            conn = sqlite3.connect(":memory:", check_same_thread=False)
+            self._init_schema(conn)
+
+        conn.row_factory = sqlite3.Row
+        self._conn = conn
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection) -> None:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != CATALOG_SCHEMA_VERSION:
+            for table in ("messages_fts", "messages", "sessions_search", "sessions", "offset_indexes"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.executescript(SCHEMA)
+        try:
+            conn.executescript(SEARCH_SCHEMA)
+            self._fts = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 unavailable, session search falls back to metadata scan: {e}")
+            self._fts = False
+        conn.execute(f"PRAGMA user_version = {CATALOG_SCHEMA_VERSION}")
+        conn.commit()
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---- 동기화 ----
+
+    def reconcile(self) -> int:
+        """디렉토리와 카탈로그를 비교하여 바뀐 파일만 다시 파싱 (변경 행 수 반환)"""
+        with self._lock:
+            conn = self._connect()
+            known = {
+                path: (inode, size, mtime)
+                for path, inode, size, mtime in conn.execute("SELECT path, inode, size, mtime FROM sessions")
+            }
+
+        # 파일 파싱은 잠금 밖에서 수행하여 조회를 막지 않음
+        seen = set()
+        batch: list[tuple] = []
+        batch_bytes = 0
+        updated = 0
+        if self.projects_dir.exists():
+            for project_entry in os.scandir(self.projects_dir):
+                if not project_entry.is_dir():
+                    continue
+                try:
+                    files = list(os.scandir(project_entry.path))
+                except OSError:
+                    continue
+                for file_entry in files:
+                    if not file_entry.name.endswith(".jsonl"):
+                        continue
+                    try:
+                        stat = file_entry.stat()
+                        seen.add(file_entry.path)
+                        if known.get(file_entry.path) == file_identity(stat):
+                            continue
+                        item = self._scan(Path(file_entry.path), project_entry.name, stat)
+                    except OSError as e:
+                        logger.debug(f"Failed to scan session file {file_entry.path}: {e}")
+                        continue
+                    batch.append(item)
+                    batch_bytes += sum(len(m[-1]) for m in item[2])
+                    # 첫 동기화에서 메시지 본문이 메모리에 쌓이지 않도록 나눠서 기록
+                    if batch_bytes >= SCAN_BATCH_BYTES:
+                        self._apply(batch)
+                        updated += len(batch)
+                        batch, batch_bytes = [], 0
+
+        removed = [(path,) for path in known.keys() - seen]
+
+        with self._lock:
+            self._apply(batch, removed)
+            self._reconciled = True
+        self._ready.set()
+        updated += len(batch)
+
+        if updated or removed:
+            logger.debug(f"Session catalog reconciled: {updated} updated, {len(removed)} removed")
+        return updated + len(removed)
+
+    def _scan(self, path: Path, project_id: str, stat: os.stat_result) -> tuple:
+        """이전 행을 기준으로 파일 파싱 (previous, row, messages, reset)"""
+        with self._lock:
+            previous = self._connect().execute(
+                "SELECT * FROM sessions WHERE path = ?", (str(path),)
+            ).fetchone()
+        row, messages, reset = scan_session_file(path, project_id, stat, previous)
+        return previous, row, messages, reset
+
+    def _apply(self, batch: list[tuple], removed: Iterable[tuple] = ()) -> None:
+        """파싱 결과를 한 트랜잭션으로 기록
+
+        같은 파일을 다른 스레드가 먼저 갱신했으면(이어 읽기 기준 위치가 달라졌으면)
+        중복 색인을 막기 위해 해당 결과는 버리고 다음 reconcile에서 다시 읽는다.
+        """
+        with self._lock:
+            conn = self._connect()
+            for previous, row, messages, reset in batch:
+                current = conn.execute(
+                    "SELECT scanned, inode FROM sessions WHERE path = ?", (row["path"],)
+                ).fetchone()
+                if not reset and (current is None or tuple(current) != (previous["scanned"], previous["inode"])):
+                    continue
+                if reset:
+                    conn.execute("DELETE FROM messages WHERE path = ?", (row["path"],))
+                conn.execute(UPSERT_SQL, tuple(row[c] for c in COLUMNS))
+                if messages and self._fts:
+                    conn.executemany(
+                        "INSERT INTO messages (path, project_id, project_key, offset, role, timestamp, body) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        messages,
+                    )
+            for (path,) in removed:
+                conn.execute("DELETE FROM sessions WHERE path = ?", (path,))
+                conn.execute("DELETE FROM messages WHERE path = ?", (path,))
+                conn.execute("DELETE FROM offset_indexes WHERE path = ?", (path,))
+            conn.commit()
+
+    def start(self) -> None:
+        """백그라운드 reconciler 시작 (첫 전체 동기화도 이 스레드에서 수행)"""
+        with self._lock:
+            if self._reconciler is not None:
+                return
+            self._connect()
+            self._reconciler = threading.Thread(
+                target=self._reconcile_loop, name="session-catalog", daemon=True
+            )
+            self._reconciler.start()
+
+    def wait_ready(self) -> None:
+        """첫 동기화가 끝날 때까지 대기 (실패해도 반환)"""
+        self.start()
+        self._ready.wait()
+
+    def _reconcile_loop(self) -> None:
+        try:
+            self.reconcile()
+        except Exception as e:
+            logger.error(f"Session catalog reconcile error: {e}")
+        finally:
+            # 실패했으면 그때까지 기록된 행으로 조회하도록 대기 중인 요청을 풀어줌
+            self._ready.set()
+        if config.CATALOG_RECONCILE_INTERVAL <= 0:
+            return
+
+        last = time.monotonic()
+        while not self._stop.wait(config.CATALOG_RECONCILE_INTERVAL):
+            interval = config.CATALOG_FEED_RECONCILE_INTERVAL if change_feed.active else 0
+            if time.monotonic() - last < interval:
+                continue
+            try:
+                self.reconcile()
+            except Exception as e:
+                logger.error(f"Session catalog reconcile error: {e}")
+            last = time.monotonic()
+
+    def apply_changes(self, events: list[ChangeEvent]) -> None:
+        """변경 피드 이벤트의 파일만 다시 파싱하거나 삭제
+
+        첫 reconcile 도중에도 반영한다. 같은 파일을 reconcile이 먼저 기록했으면
+        _apply가 이어 읽기 기준 위치를 비교하여 중복 색인을 막는다.
+        """
+        batch: list[tuple] = []
+        removed: list[tuple] = []
+        for event in events:
+            if event.kind == RESYNC or event.path.parent.parent != self.projects_dir:
+                continue
+            if event.kind == SESSION_DELETED:
+                removed.append((str(event.path),))
+                continue
+            try:
+                batch.append(self._scan(event.path, event.project_id, event.path.stat()))
+            except FileNotFoundError:
+                removed.append((str(event.path),))
+            except OSError as e:
+                logger.debug(f"Failed to scan session file {event.path}: {e}")
+        if batch or removed:
+            self._apply(batch, removed)
+
+    def _query(self, sql: str, params: Iterable = ()) -> list[sqlite3.Row]:
+        self.start()
+        with self._lock:
+            return self._connect().execute(sql, tuple(params)).fetchall()
+
+    # ---- 조회 ----
+
+    def list_sessions(self, project_id: str) -> list:
+        """프로젝트의 세션 파일 목록 (최근 수정순)
+
+        첫 동기화가 끝나기 전에는 요청 처리 중에 파일을 파싱하지 않도록 디렉토리
+        스캔 결과(path/session_id/project_id/size/mtime/is_agent만 있는 dict)를 반환한다.
+        """
+        self.start()
+        if not self._reconciled:
+            return self._scan_directory(project_id)
+        return self._query(
+            "SELECT * FROM sessions WHERE project_id = ? ORDER BY mtime DESC",
+            (project_id,),
+        )
+
+    def _scan_projects(self) -> list[dict]:
+        """카탈로그 없이 모든 프로젝트의 세션 파일 목록"""
+        rows = []
+        try:
+            projects = [entry.name for entry in os.scandir(self.projects_dir) if entry.is_dir()]
+        except OSError:
+            return rows
+        for project_id in projects:
+            rows.extend(self._scan_directory(project_id))
+        return rows
+
+    def _scan_directory(self, project_id: str) -> list[dict]:
+        """카탈로그 없이 프로젝트 디렉토리의 세션 파일 목록 (최근 수정순)"""
+        rows = []
+        try:
+            entries = list(os.scandir(self.projects_dir / project_id))
+        except OSError:
+            return rows
+        for entry in entries:
+            if not entry.name.endswith(".jsonl"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            rows.append({
+                "path": entry.path,
+                "session_id": entry.name[:-len(".jsonl")],
+                "project_id": project_id,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "is_agent": int(entry.name.startswith("agent-")),
+            })
+        rows.sort(key=lambda row: row["mtime"], reverse=True)
+        return rows
+
+    def search(self, keyword: str, project_id: Optional[str] = None) -> list[sqlite3.Row]:
+        """요약/첫 메시지/프로젝트 ID에 검색어가 포함된 세션 (에이전트 파일 제외)
+
+        첫 동기화가 끝나기 전에는 일부 세션이 빠지지 않도록 끝날 때까지 기다린다.
+        """
+        keyword = keyword.lower()
+        self.wait_ready()
+        if self._fts and len(keyword) >= TRIGRAM:
+            # trigram 구문 검색은 부분 문자열 일치와 같음
+            sql = (
+                "SELECT sessions.* FROM sessions_search "
+                "JOIN sessions ON sessions.rowid = sessions_search.rowid "
+                "WHERE sessions_search MATCH ? AND sessions.is_agent = 0"
+            )
+            params: list = ['"' + keyword.replace('"', '""') + '"']
+        else:
+            sql = "SELECT * FROM sessions WHERE is_agent = 0 AND instr(search_text, ?) > 0"
+            params = [keyword]
+        if project_id:
+            sql += " AND sessions.project_id = ?"
+            params.append(project_id)
+        return self._query(sql + " ORDER BY sessions.mtime DESC", params)
+
+    def search_messages(self, match: str, project_id: Optional[str] = None,
+                        limit: int = 1000) -> list[sqlite3.Row]:
+        """최신 일치 메시지 RANK_CANDIDATES개 중 관련도 높은 순으로 limit개"""
+        return next(self.iter_message_hits(match, project_id), [])[:limit]
+
+    def iter_message_hits(self, match: str, project_id: Optional[str] = None,
+                          window: Optional[int] = None) -> Iterator[list[sqlite3.Row]]:
+        """FTS5 색인에서 MATCH 구문과 일치하는 메시지를 최신순 window개 구간별로 반환
+
+        구간마다 bm25 점수 순(낮을수록 관련도 높음)으로 정렬되어 있으며, 다음 구간은
+        요청할 때 계산한다. 프로젝트 필터도 FTS 질의에 포함하여 색인 안에서 교집합을 구한다.
+        첫 동기화가 끝나기 전에는 끝날 때까지 기다린다.
+        """
+        self.wait_ready()
+        if not self._fts:
+            return
+        window = window or RANK_CANDIDATES
+        query = f"body : ({match})"
+        if project_id:
+            query += f' AND project_key : "{project_key(project_id)}"'
+
+        before = None
+        while True:
+            params: list = [query]
+            bound = ""
+            if before is not None:
+                bound = " AND rowid < ?"
+                params.append(before)
+            params.append(window)
+            sql = (
+                "SELECT messages.id, messages.path, messages.project_id, messages.offset, "
+                "messages.role, messages.timestamp, hits.score FROM ("
+                "  SELECT rowid, bm25(messages_fts, 1.0, 0.0) AS score FROM messages_fts"
+                f"  WHERE messages_fts MATCH ?{bound} ORDER BY rowid DESC LIMIT ?"
+                ") AS hits JOIN messages ON messages.id = hits.rowid "
+                "ORDER BY hits.score"
+            )
+            try:
+                rows = self._query(sql, params)
+            except sqlite3.OperationalError as e:
+                logger.debug(f"Invalid search query {match!r}: {e}")
+                return
+            if rows:
+                yield rows
+            if len(rows) < window:
+                return
+            before = min(row["id"] for row in rows)
+
+    def message_bodies(self, ids: list[int]) -> dict[int, str]:
+        """메시지 ID별 색인된 본문"""
+        bodies = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            for row in self._query(
+                f"SELECT id, body FROM messages WHERE id IN ({', '.join('?' for _ in chunk)})", chunk
+            ):
+                bodies[row["id"]] = row["body"]
+        return bodies
+
+    def get_rows(self, paths: list[str]) -> dict[str, sqlite3.Row]:
+        """경로별 카탈로그 행"""
+        rows = {}
+        # SQLite 바인딩 변수 개수 제한 내에서 나눠 조회
+        for i in range(0, len(paths), 500):
+            chunk = paths[i:i + 500]
+            for row in self._query(
+                f"SELECT * FROM sessions WHERE path IN ({', '.join('?' for _ in chunk)})", chunk
+            ):
+                rows[row["path"]] = row
+        return rows
+
+    def sessions_in_range(self, mtime_from: float, mtime_to: float,
+                          project_ids: Optional[list[str]] = None) -> list[sqlite3.Row]:
+        """수정 시각이 [mtime_from, mtime_to]인 세션 파일 (오래된 순)
+
+        첫 동기화가 끝나기 전에는 list_sessions처럼 디렉토리 스캔 결과를 반환한다.
+        """
+        self.start()
+        if not self._reconciled:
+            if project_ids:
+                rows = [row for project_id in project_ids for row in self._scan_directory(project_id)]
+            else:
+                rows = self._scan_projects()
+            rows = [row for row in rows if mtime_from <= row["mtime"] <= mtime_to]
+            rows.sort(key=lambda row: row["mtime"])
+            return rows
+        sql = "SELECT * FROM sessions WHERE mtime BETWEEN ? AND ?"
+        params: list = [mtime_from, mtime_to]
+        if project_ids:
+            sql += f" AND project_id IN ({', '.join('?' for _ in project_ids)})"
+            params.extend(project_ids)
+        return self._query(sql + " ORDER BY mtime", params)
+
+    def metadata(self, path: Path) -> SessionMetadata:
+        """파일 하나의 메타데이터 (카탈로그 행이 최신이 아니면 다시 파싱하여 갱신)"""
+        stat = path.stat()
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT * FROM sessions WHERE path = ?", (str(path),)
+            ).fetchone()
+        if row is not None and (row["inode"], row["size"], row["mtime"]) == file_identity(stat):
+            return row_to_metadata(row)
+
+        self._apply([self._scan(path, path.parent.name, stat)])
+        with self._lock:
+            row = self._connect().execute("SELECT * FROM sessions WHERE path = ?", (str(path),)).fetchone()
+        return row_to_metadata(row)
+
+    def agent_headers(self) -> list[sqlite3.Row]:
+        """첫 줄을 읽은 에이전트 파일의 (path, inode, parent_session_id, agent_id)"""
+        with self._lock:
+            return self._connect().execute(
+                "SELECT path, inode, parent_session_id, agent_id FROM sessions "
+                "WHERE is_agent = 1 AND parent_session_id IS NOT NULL"
+            ).fetchall()
+
+    # ---- 메시지 오프셋 색인 (services.offset_index) ----
+
+    def load_offset_index(self, path: Path) -> Optional[sqlite3.Row]:
+        """파일의 저장된 오프셋 색인 행"""
+        with self._lock:
+            return self._connect().execute(
+                "SELECT * FROM offset_indexes WHERE path = ?", (str(path),)
+            ).fetchone()
+
+    def save_offset_index(self, path: Path, stride: int, inode: int, scanned: int,
+                          fingerprint: bytes, count: int, checkpoints: bytes) -> None:
+        """파일의 오프셋 색인 저장 (체크포인트는 array('Q')의 바이트)"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO offset_indexes "
+                "(path, stride, inode, scanned, fingerprint, count, checkpoints) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (str(path), stride, inode, scanned, fingerprint, count, checkpoints),
+            )
+            conn.commit()
+
+
+# 싱글톤 인스턴스
+session_catalog = SessionCatalog(CATALOG_FILE)
+change_feed.subscribe(session_catalog.apply_changes)
@@ -0,0 +1,96 @@
+"""projects 디렉토리 변경 피드
+
+세션 locator의 단일 watchfiles 감시가 .jsonl 생성/수정/삭제를 타입이 있는 이벤트로
+바꿔 이 피드에 발행한다. 프로젝트/세션 목록 캐시, 메타데이터 캐시, 세션 카탈로그는
+피드를 구독하여 바뀐 파일에 해당하는 항목만 무효화/갱신하므로, 감시가 동작하는
+동안에는 TTL 만료가 아니라 이벤트가 최신성을 보장한다.
+
+감시가 시작되거나 멈추면 그 사이 놓친 이벤트가 있을 수 있으므로 RESYNC 이벤트를
+발행하며, 구독자는 관련 캐시를 모두 비운다. 감시가 없을 때는 기존 TTL/주기적
+reconcile이 그대로 최신성을 담당한다.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from config import config
+from services.cache import cache_manager, CACHE_PROJECTS, CACHE_SESSIONS, CACHE_METADATA
+
+logger = logging.getLogger(__name__)
+
+SESSION_CREATED = "session_created"
+SESSION_APPENDED = "session_appended"
+SESSION_DELETED = "session_deleted"
+AGENT_CREATED = "agent_created"
+# 프로젝트 하위 디렉토리의 .jsonl 변경 (세션 색인/카탈로그 대상이 아니며 usage 집계만 사용)
+NESTED_CHANGED = "nested_changed"
+RESYNC = "resync"
+
+# 감시 중에는 이벤트로 무효화하므로 TTL은 놓친 이벤트 대비 상한으로만 사용
+FEED_CACHES = (CACHE_PROJECTS, CACHE_SESSIONS, CACHE_METADATA)
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """세션 파일 하나의 변경
+
+    에이전트 파일은 생성 시 AGENT_CREATED, 이후 추가/삭제는 is_agent=True인
+    SESSION_APPENDED/SESSION_DELETED로 발행된다. RESYNC는 path가 None이다.
+    """
+    kind: str
+    path: Optional[Path] = None
+    project_id: Optional[str] = None
+    is_agent: bool = False
+
+    @property
+    def session_id(self) -> Optional[str]:
+        return self.path.stem if self.path is not None else None
+
+
+class ChangeFeed:
+    """변경 이벤트를 구독자에게 전달 (감시 스레드에서 호출)
+
+    구독자는 등록 순서대로 호출되므로, 다른 구독자가 읽는 색인(카탈로그)은
+    그 결과를 캐시하는 구독자보다 먼저 등록되어야 한다.
+    """
+
+    def __init__(self):
+        self._subscribers: list[Callable[[list[ChangeEvent]], None]] = []
+        self._lock = threading.Lock()
+        self.active = False
+
+    def subscribe(self, callback: Callable[[list[ChangeEvent]], None]) -> None:
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[list[ChangeEvent]], None]) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def publish(self, events: list[ChangeEvent]) -> None:
+        if not events:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(events)
+            except Exception as e:
+                logger.warning(f"Change feed subscriber error: {e}")
+
+    def set_active(self, active: bool) -> None:
+        """감시 시작/중단 (놓친 변경이 있을 수 있으므로 구독자에게 RESYNC 발행)"""
+        self.active = active
+        for name in FEED_CACHES:
+            cache_manager.set_ttl(name, config.CHANGE_FEED_CACHE_TTL if active else None)
+        logger.debug(f"Change feed {'active' if active else 'inactive'}")
+        self.publish([ChangeEvent(RESYNC)])
+
+
+# 싱글톤 인스턴스
+change_feed = ChangeFeed()
@@ -7,6 +7,7 @@ from services.common.utils import (
     extract_summary,
     get_project_name,
     save_prompts_to_file,
+    iter_lines_reversed,
 )
 from services.common.claude_cli import run_claude_cli_stream, parse_stream_event
 
@@ -19,6 +20,7 @@ __all__ = [
     "extract_summary",
     "get_project_name",
     "save_prompts_to_file",
+    "iter_lines_reversed",
     "run_claude_cli_stream",
     "parse_stream_event",
 ]
@@ -1,8 +1,10 @@
 """공통 유틸리티 함수"""
 
+import os
 import uuid
 import logging
 from pathlib import Path
+from typing import Iterator
 
 from services.common.constants import SKIP_PATTERNS, DEFAULT_STORAGE_DIR
 
@@ -91,3 +93,42 @@ def clean_content(content: str) -> str:
     content = re.sub(r'\n{3,}', '\n\n', content)
     content = re.sub(r' {2,}', ' ', content)
     return content
+
+
+def iter_lines_reversed(path: Path, block_size: int = 64 * 1024,
+                        end: int | None = None) -> Iterator[tuple[int, bytes]]:
+    """파일 끝(또는 end 오프셋)에서부터 블록 단위로 거꾸로 읽으며 (시작 오프셋, 라인) 반환
+
+    라인은 마지막 줄부터 반환되며 줄바꿈 문자는 포함하지 않는다.
+    블록보다 긴 라인은 줄 시작을 찾을 때까지 조각을 모아 한 번만 합친다.
+    """
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        if end is not None:
+            pos = min(pos, end)
+        pending: list[bytes] = []  # 줄 시작을 아직 찾지 못한 조각 (뒤쪽 조각부터)
+
+        while pos > 0:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            chunk = f.read(size)
+
+            newline = chunk.find(b"\n")
+            if newline < 0:
+                pending.append(chunk)
+                continue
+
+            # 첫 줄바꿈 이후는 완전한 라인들 (마지막 라인은 이전 블록 조각과 이어짐)
+            pending.append(chunk[newline + 1:])
+            region = b"".join(reversed(pending))
+            pending = [chunk[:newline]]
+
+            lines = region.split(b"\n")
+            offset = pos + newline + 1 + len(region) + 1
+            for line in reversed(lines):
+                offset -= len(line) + 1
+                yield offset, line
+
+        if pending:
+            yield 0, b"".join(reversed(pending))
@@ -0,0 +1,324 @@
+"""세션 ID → 파일 경로 색인
+
+서비스마다 요청 때마다 모든 프로젝트 디렉토리를 순회하던 _find_session_file을
+프로세스 전역 색인 하나로 대체한다. 처음 한 번 디렉토리를 스캔하여 만들고,
+이후에는 파일시스템 이벤트(watchfiles)로 추가/삭제를 반영한다.
+
+감시 스레드는 .jsonl 변경 이벤트를 프로젝트 디렉토리별 리스너에게도 전달하여,
+세션 tailer가 stat 폴링 대신 이벤트를 기다릴 수 있게 한다.
+
+같은 변경은 타입이 있는 이벤트(ChangeEvent)로 변환되어 변경 피드에도 발행되며,
+카탈로그와 목록/메타데이터 캐시가 이를 구독한다.
+
+에이전트 파일(agent-*.jsonl)은 첫 줄의 sessionId/agentId를 파일당 한 번만 읽어
+부모 세션별로 묶어 두며, 재시작 후에는 세션 카탈로그에 기록된 첫 줄 정보를
+inode가 같은 파일에 한해 그대로 사용한다.
+"""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import config
+from services.catalog import SessionCatalog, session_catalog
+from services.change_feed import (
+    ChangeEvent, ChangeFeed, change_feed, SESSION_CREATED, SESSION_APPENDED, SESSION_DELETED, AGENT_CREATED,
+    NESTED_CHANGED,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SessionLocator:
+    """파일 이름(stem)과 정확히 일치하는 세션 ID로 JSONL 경로를 찾는 색인
+
+    색인에 없는 ID를 조회하면 config.LOCATOR_RESCAN_INTERVAL 간격으로만 다시
+    스캔한다 (이벤트 감시를 시작하기 전에 생긴 파일이나 감시를 쓸 수 없는 환경 대비).
+    catalog가 None이면 에이전트 파일의 첫 줄을 모두 직접 읽고, feed가 None이면
+    변경 이벤트를 발행하지 않는다.
+    """
+
+    def __init__(self, projects_dir: Optional[Path] = None, watch: bool = True,
+                 catalog: Optional[SessionCatalog] = None, feed: Optional[ChangeFeed] = None):
+        self.projects_dir = projects_dir if projects_dir is not None else config.PROJECTS_DIR
+        self.watch = watch
+        self.catalog = catalog
+        self.feed = feed
+        self._index: dict[str, Path] = {}
+        # 에이전트 파일 → (inode, 부모 세션 ID, 에이전트 ID), 첫 줄을 아직 못 읽었으면 None
+        self._agent_files: dict[Path, Optional[tuple[int, Optional[str], str]]] = {}
+        self._agents: dict[str, dict[str, Path]] = {}  # 부모 세션 ID → {에이전트 ID: 경로}
+        self._pending_agents: set[Path] = set()  # 첫 줄을 아직 읽지 않은 에이전트 파일
+        self._listeners: dict[Path, list] = {}  # 프로젝트 디렉토리 → 변경 콜백 (감시 스레드에서 호출)
+        self._built = False
+        self._last_scan = 0.0
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """색인을 만들고 파일시스템 감시 시작 (이미 시작했으면 아무것도 하지 않음)"""
+        if not self._built:
+            self.rebuild()
+        self._start_watcher()
+
+    def find(self, session_id: str) -> Optional[Path]:
+        """세션 ID에 해당하는 파일 경로 (없으면 None)"""
+        if not self._built:
+            self.start()
+
+        path = self._index.get(session_id)
+        if path is not None:
+            if path.exists():
+                return path
+            self._discard(path)
+
+        if time.monotonic() - self._last_scan < config.LOCATOR_RESCAN_INTERVAL:
+            return None
+        self.rebuild()
+        return self._index.get(session_id)
+
+    def agents(self, session_id: str) -> dict[str, Path]:
+        """세션에 연결된 에이전트 파일 {에이전트 ID: 경로}
+
+        매핑은 새 에이전트 파일이 생겼을 때만 바뀌므로 반복 호출 비용은 dict 복사뿐이다.
+        """
+        if not self._built:
+            self.start()
+        elif not self.watching() and time.monotonic() - self._last_scan >= config.LOCATOR_RESCAN_INTERVAL:
+            # 이벤트 감시가 없으면 새 에이전트 파일을 재스캔으로만 발견
+            self.rebuild()
+
+        if self._pending_agents:
+            self._resolve_agents()
+        with self._lock:
+            return dict(self._agents.get(session_id, {}))
+
+    def rebuild(self) -> None:
+        """projects 디렉토리를 스캔하여 색인 재생성"""
+        index: dict[str, Path] = {}
+        agent_inodes: dict[Path, int] = {}
+        if self.projects_dir.exists():
+            for project_entry in os.scandir(self.projects_dir):
+                if not project_entry.is_dir():
+                    continue
+                try:
+                    for file_entry in os.scandir(project_entry.path):
+                        if file_entry.name.endswith(".jsonl"):
+                            path = Path(file_entry.path)
+                            index.setdefault(file_entry.name[:-len(".jsonl")], path)
+                            if file_entry.name.startswith("agent-"):
+                                agent_inodes[path] = file_entry.inode()
+                except OSError:
+                    continue
+
+        with self._lock:
+            if not self._built:
+                self._load_agent_headers()
+            # 같은 파일(inode)이면 이미 읽은 첫 줄 정보를 그대로 사용
+            self._agent_files = {
+                path: entry if entry is not None and entry[0] == agent_inodes[path] else None
+                for path, entry in ((p, self._agent_files.get(p)) for p in agent_inodes)
+            }
+            self._pending_agents = {path for path, entry in self._agent_files.items() if entry is None}
+            self._group_agents()
+            self._index = index
+            self._built = True
+            self._last_scan = time.monotonic()
+        logger.debug(f"Session locator built: {len(index)} files, {len(agent_inodes)} agent files")
+
+    def close(self) -> None:
+        """감시 중단 (감시 스레드가 끝날 때까지 잠시 대기)"""
+        self._stop.set()
+        if self._watcher is not None and self._watcher is not threading.current_thread():
+            self._watcher.join(timeout=1.0)
+
+    def watching(self) -> bool:
+        """파일시스템 이벤트 감시가 동작 중인지 여부"""
+        return self._watcher is not None and self._watcher.is_alive()
+
+    def add_listener(self, directory: Path, callback) -> None:
+        """디렉토리 안의 .jsonl 파일이 바뀔 때마다 callback() 호출 (감시 스레드에서 실행)"""
+        self._start_watcher()
+        with self._lock:
+            self._listeners.setdefault(directory, []).append(callback)
+
+    def remove_listener(self, directory: Path, callback) -> None:
+        with self._lock:
+            callbacks = self._listeners.get(directory, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                self._listeners.pop(directory, None)
+
+    def _add(self, path: Path) -> bool:
+        """색인에 추가 (처음 보는 파일이면 True)"""
+        with self._lock:
+            if path.name.startswith("agent-"):
+                if path in self._agent_files:
+                    return False
+                self._index.setdefault(path.stem, path)
+                self._agent_files[path] = None
+                self._pending_agents.add(path)
+                return True
+            if self._index.get(path.stem) == path:
+                return False
+            self._index.setdefault(path.stem, path)
+            return True
+
+    def _discard(self, path: Path) -> None:
+        with self._lock:
+            if self._index.get(path.stem) == path:
+                del self._index[path.stem]
+            self._pending_agents.discard(path)
+            if self._agent_files.pop(path, None) is not None:
+                self._group_agents()
+
+    def _handle_changes(self, raw_paths) -> None:
+        """감시 이벤트 경로 묶음을 색인에 반영하고 리스너/변경 피드에 전달
+
+        한 묶음에 같은 파일의 생성/수정/삭제가 섞일 수 있으므로 이벤트 종류 대신
+        현재 존재 여부와 색인에 있었는지로 분류한다. 프로젝트 하위 디렉토리의 .jsonl은
+        색인하지 않고 usage 집계(재귀 스캔)가 놓치지 않도록 NESTED_CHANGED로만 발행한다.
+        """
+        # 이벤트 경로는 심볼릭 링크가 풀린 절대 경로일 수 있으므로 색인 경로로 변환
+        root = self.projects_dir.resolve()
+        paths = set()
+        nested = set()
+        for raw_path in raw_paths:
+            event_path = Path(raw_path)
+            if event_path.suffix != ".jsonl":
+                continue
+            try:
+                parts = event_path.relative_to(root).parts
+            except ValueError:
+                continue
+            if len(parts) == 2:
+                paths.add(self.projects_dir.joinpath(*parts))
+            elif len(parts) > 2:
+                nested.add(self.projects_dir.joinpath(*parts))
+
+        events = []
+        for path in sorted(paths):
+            is_agent = path.name.startswith("agent-")
+            if not path.exists():
+                self._discard(path)
+                kind = SESSION_DELETED
+            elif self._add(path):
+                kind = AGENT_CREATED if is_agent else SESSION_CREATED
+            else:
+                kind = SESSION_APPENDED
+            events.append(ChangeEvent(kind, path, path.parent.name, is_agent))
+        for path in sorted(nested):
+            events.append(ChangeEvent(NESTED_CHANGED, path, path.relative_to(self.projects_dir).parts[0]))
+
+        # 세션 tailer를 먼저 깨운 뒤 캐시/카탈로그 구독자에게 전달
+        self._notify({path.parent for path in paths})
+        if self.feed is not None:
+            self.feed.publish(events)
+
+    def _notify(self, directories: set[Path]) -> None:
+        with self._lock:
+            callbacks = [cb for d in directories for cb in self._listeners.get(d, [])]
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.debug(f"Session locator listener error: {e}")
+
+    def _resolve_agents(self) -> None:
+        """첫 줄을 아직 읽지 않은 에이전트 파일의 부모 세션 확인"""
+        resolved = {}
+        for path in list(self._pending_agents):
+            info = read_agent_header(path)
+            if info is not None:
+                resolved[path] = info
+
+        if not resolved:
+            return
+        with self._lock:
+            for path, info in resolved.items():
+                if path in self._pending_agents:
+                    self._agent_files[path] = info
+                    self._pending_agents.discard(path)
+            self._group_agents()
+
+    def _group_agents(self) -> None:
+        agents: dict[str, dict[str, Path]] = {}
+        for path, entry in self._agent_files.items():
+            if entry is not None and entry[1]:
+                agents.setdefault(entry[1], {})[entry[2]] = path
+        self._agents = agents
+
+    def _load_agent_headers(self) -> None:
+        """카탈로그가 이미 읽은 에이전트 파일 첫 줄 정보로 매핑 초기화"""
+        if self.catalog is None:
+            return
+        try:
+            rows = self.catalog.agent_headers()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to load agent headers from session catalog: {e}")
+            return
+        self._agent_files = {
+            Path(row["path"]): (row["inode"], row["parent_session_id"], row["agent_id"]) for row in rows
+        }
+
+    def _start_watcher(self) -> None:
+        if not self.watch or self._watcher is not None or not self.projects_dir.exists():
+            return
+        self._watcher = threading.Thread(target=self._watch_loop, name="session-locator", daemon=True)
+        self._watcher.start()
+
+    def _watch_loop(self) -> None:
+        try:
+            from watchfiles import watch
+        except ImportError:
+            logger.warning("watchfiles not installed, session locator falls back to rescans")
+            return
+
+        if self.feed is not None:
+            self.feed.set_active(True)
+        try:
+            for changes in watch(self.projects_dir, stop_event=self._stop,
+                                 debounce=config.WATCH_DEBOUNCE_MS, step=20):
+                self._handle_changes(raw_path for _, raw_path in changes)
+        except Exception as e:
+            logger.warning(f"Session locator watch stopped: {e}")
+        finally:
+            if self.feed is not None:
+                self.feed.set_active(False)
+
+
+def read_agent_header(path: Path) -> Optional[tuple[int, Optional[str], str]]:
+    """에이전트 파일 첫 줄의 (inode, 부모 세션 ID, 에이전트 ID)
+
+    첫 줄이 아직 완성되지 않았으면 None (다음 조회 때 다시 읽음).
+    """
+    try:
+        with open(path, "rb") as f:
+            inode = os.fstat(f.fileno()).st_ino
+            first_line = f.readline()
+    except OSError:
+        return None
+
+    agent_id = path.stem.replace("agent-", "")
+    try:
+        data = json.loads(first_line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        # 줄바꿈까지 쓰인 라인만 손상된 것으로 확정
+        return (inode, None, agent_id) if first_line.endswith(b"\n") else None
+    if not isinstance(data, dict):
+        return inode, None, agent_id
+    return inode, data.get("sessionId"), data.get("agentId", agent_id)
+
+
+# 싱글톤 인스턴스
+session_locator = SessionLocator(catalog=session_catalog, feed=change_feed)
+# 종료 시 감시 스레드(watchfiles)가 실행 중인 채로 인터프리터가 내려가지 않도록 정리
+atexit.register(session_locator.close)
@@ -0,0 +1,173 @@
+"""세션 파일별 희소 메시지 오프셋 색인
+
+"N번째 메시지"를 바이트 위치로 바꾸기 위해, 표시 가능한 메시지
+(user/assistant/summary) STRIDE개마다 라인 시작 오프셋을 array('Q')로 보관한다.
+색인은 세션 카탈로그(SQLite)의 offset_indexes 테이블에 파일별로 저장되며, 파일이
+뒤로 늘어난 경우 이전에 읽은 위치부터 추가분만 스캔한다.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from cachetools import LRUCache
+
+if TYPE_CHECKING:
+    from services.catalog import SessionCatalog
+
+logger = logging.getLogger(__name__)
+
+OFFSET_INDEX_STRIDE = 256
+FINGERPRINT_BYTES = 64
+
+DISPLAY_TYPES = ("user", "assistant", "summary")
+
+
+@dataclass
+class SessionOffsetIndex:
+    """파일 하나의 희소 오프셋 색인
+
+    checkpoints[k]는 (k * stride)번째 메시지 라인의 시작 오프셋이다.
+    scanned는 완성된 라인까지 스캔한 바이트 위치이다.
+    """
+    stride: int = OFFSET_INDEX_STRIDE
+    inode: int = 0
+    scanned: int = 0
+    fingerprint: bytes = b""
+    count: int = 0
+    checkpoints: array = field(default_factory=lambda: array("Q"))
+
+    def locate(self, n: int) -> tuple[int, int]:
+        """n번째 메시지 앞의 가장 가까운 체크포인트 (오프셋, 건너뛸 메시지 수)"""
+        if not self.checkpoints:
+            return 0, n
+        k = min(n // self.stride, len(self.checkpoints) - 1)
+        return self.checkpoints[k], n - k * self.stride
+
+    def refresh(self, path: Path) -> bool:
+        """파일 변경을 반영 (색인이 바뀌면 True)"""
+        stat = path.stat()
+        changed = False
+        if not self._can_resume(path, stat):
+            self._reset(stat.st_ino)
+            changed = True
+
+        if stat.st_size > self.scanned:
+            changed = self._scan(path) or changed
+        return changed
+
+    def _reset(self, inode: int) -> None:
+        self.inode = inode
+        self.scanned = 0
+        self.fingerprint = b""
+        self.count = 0
+        self.checkpoints = array("Q")
+
+    def _can_resume(self, path: Path, stat: os.stat_result) -> bool:
+        """같은 파일이 뒤로만 늘어났는지 확인 (이미 스캔한 영역의 끝부분 비교)"""
+        if stat.st_ino != self.inode or stat.st_size < self.scanned:
+            return False
+        if not self.fingerprint:
+            return True
+        try:
+            with open(path, "rb") as f:
+                f.seek(self.scanned - len(self.fingerprint))
+                return f.read(len(self.fingerprint)) == self.fingerprint
+        except OSError:
+            return False
+
+    def _scan(self, path: Path) -> bool:
+        """scanned 위치부터 완성된 라인만 스캔"""
+        pos = self.scanned
+        with open(path, "rb") as f:
+            f.seek(pos)
+            for line in f:
+                # 줄바꿈 없는 마지막 라인은 완성될 때까지 남겨둠
+                if not line.endswith(b"\n"):
+                    break
+                if is_display_line(line):
+                    if self.count % self.stride == 0:
+                        self.checkpoints.append(pos)
+                    self.count += 1
+                pos += len(line)
+
+            if pos == self.scanned:
+                return False
+            start = max(0, pos - FINGERPRINT_BYTES)
+            f.seek(start)
+            self.fingerprint = f.read(pos - start)
+
+        self.scanned = pos
+        return True
+
+
+def is_display_line(line: bytes) -> bool:
+    """MessageParser가 메시지로 반환하는 라인인지 확인"""
+    if not line.strip():
+        return False
+    try:
+        data = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return False
+    return isinstance(data, dict) and data.get("type") in DISPLAY_TYPES
+
+
+class OffsetIndexStore:
+    """세션 파일 경로별 오프셋 색인 로드/갱신/저장
+
+    catalog가 None이면 메모리에만 보관한다.
+    """
+
+    def __init__(self, catalog: Optional["SessionCatalog"] = None, maxsize: int = 64):
+        self.catalog = catalog
+        self._indexes: LRUCache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> SessionOffsetIndex:
+        """최신 상태로 갱신된 색인 반환"""
+        key = str(path)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._load(path) or SessionOffsetIndex()
+                self._indexes[key] = index
+            if index.refresh(path):
+                self._save(path, index)
+            return index
+
+    def _load(self, path: Path) -> Optional[SessionOffsetIndex]:
+        if self.catalog is None:
+            return None
+        try:
+            row = self.catalog.load_offset_index(path)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to load offset index for {path}: {e}")
+            return None
+        if row is None or row["stride"] != OFFSET_INDEX_STRIDE:
+            return None
+        checkpoints = array("Q")
+        checkpoints.frombytes(row["checkpoints"])
+        return SessionOffsetIndex(
+            inode=row["inode"],
+            scanned=row["scanned"],
+            fingerprint=row["fingerprint"],
+            count=row["count"],
+            checkpoints=checkpoints,
+        )
+
+    def _save(self, path: Path, index: SessionOffsetIndex) -> None:
+        if self.catalog is None:
+            return
+        try:
+            self.catalog.save_offset_index(
+                path, index.stride, index.inode, index.scanned,
+                index.fingerprint, index.count, index.checkpoints.tobytes(),
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to save offset index for {path}: {e}")
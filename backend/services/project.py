@@ -4,6 +4,8 @@ from datetime import datetime
 from config import config
 from models.schemas import Project
 from services.cache import cache_manager, CACHE_PROJECTS
+from services.change_feed import ChangeEvent, change_feed, NESTED_CHANGED, RESYNC
+from services.locator import session_locator
 
 logger = logging.getLogger(__name__)
 
@@ -11,10 +13,12 @@ logger = logging.getLogger(__name__)
 class ProjectService:
     def __init__(self):
         self.projects_dir = config.PROJECTS_DIR
+        self.locator = session_locator
         logger.debug("ProjectService initialized with caching")
 
     def list_all(self) -> list[Project]:
         """모든 프로젝트 목록 조회 (캐싱 적용)"""
+        self.locator.start()  # 캐시를 무효화할 변경 피드 시작
         cache_key = "all_projects"
         cached = cache_manager.get(CACHE_PROJECTS, cache_key)
         if cached is not None:
@@ -54,6 +58,7 @@ class ProjectService:
 
     def get_project(self, project_id: str) -> Project | None:
         """프로젝트 상세 조회 (캐싱 적용)"""
+        self.locator.start()
         cache_key = f"project:{project_id}"
         cached = cache_manager.get(CACHE_PROJECTS, cache_key)
         if cached is not None:
@@ -90,3 +95,19 @@ class ProjectService:
         """프로젝트 이름 추출 (마지막 경로 세그먼트)"""
         path = self._decode_project_path(encoded)
         return Path(path).name
+
+
+def invalidate_projects(events: list[ChangeEvent]) -> None:
+    """변경된 세션 파일이 속한 프로젝트와 전체 목록 캐시만 무효화"""
+    if any(event.kind == RESYNC for event in events):
+        cache_manager.clear(CACHE_PROJECTS)
+        return
+    events = [event for event in events if event.kind != NESTED_CHANGED]
+    if not events:
+        return
+    cache_manager.delete(CACHE_PROJECTS, "all_projects")
+    for project_id in {event.project_id for event in events}:
+        cache_manager.delete(CACHE_PROJECTS, f"project:{project_id}")
+
+
+change_feed.subscribe(invalidate_projects)
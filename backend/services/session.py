@@ -1,70 +1,200 @@
+import base64
 import logging
+from dataclasses import dataclass, field
+from typing import Iterator
 from pathlib import Path
 from datetime import datetime
-import json
 import subprocess
 from config import config
-from models.schemas import Session, SessionMetadata, SearchResult, ResumeInfo, ResumeResult
+from models.schemas import (
+    Session, SessionMetadata, SearchHit, SearchResult, ResumeInfo, ResumeResult, AgentSummary,
+)
 from services.parser import MessageParser
 from services.cache import cache_manager, CACHE_SESSIONS, CACHE_METADATA
-from services.common import format_size
+from services.change_feed import ChangeEvent, change_feed, SESSION_APPENDED, SESSION_DELETED, NESTED_CHANGED, RESYNC
+from services.catalog import (
+    session_catalog, row_to_metadata, file_identity,
+    build_match_query, parse_query, highlight_spans, make_snippet,
+)
+from services.locator import session_locator
+from services.offset_index import OffsetIndexStore
+from services.common import format_size, iter_lines_reversed
 
 logger = logging.getLogger(__name__)
 
+CURSOR_PREFIX = "o:"
+SEARCH_HITS_PER_SESSION = 3
+# 비스트리밍 검색은 본문이 일치한 세션을 이만큼 모을 때까지 오래된 구간을 계속 읽음
+SEARCH_MIN_SESSIONS = 100
+
+
+def encode_cursor(offset: int) -> str:
+    """JSONL 바이트 오프셋을 불투명 커서 문자열로 변환"""
+    return base64.urlsafe_b64encode(f"{CURSOR_PREFIX}{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """커서를 바이트 오프셋으로 변환 (형식이 잘못되면 ValueError)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not raw.startswith(CURSOR_PREFIX) or not raw[len(CURSOR_PREFIX):].isdigit():
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return int(raw[len(CURSOR_PREFIX):])
+
+
+@dataclass
+class HistoryPage:
+    """히스토리 한 페이지와 앞/뒤 페이지 커서
+
+    prev_cursor는 이 페이지보다 오래된 메시지(before), next_cursor는 이후에
+    추가될 메시지를 포함한 더 최신 메시지(after) 조회에 사용한다.
+    """
+    messages: list[dict] = field(default_factory=list)
+    prev_cursor: str | None = None
+    next_cursor: str | None = None
+    total: int | None = None  # 메시지 번호(start)로 조회한 경우 전체 메시지 수
+
 
 class SessionService:
     def __init__(self):
         self.projects_dir = config.PROJECTS_DIR
         self.parser = MessageParser()
-        self._session_file_cache: dict[str, Path] = {}
+        self.catalog = session_catalog
+        self.locator = session_locator
+        self.offset_indexes = OffsetIndexStore(session_catalog)
         logger.debug("SessionService initialized with caching")
 
     def list_sessions(self, project_id: str) -> list[Session]:
         """프로젝트 내 세션 목록 조회 (캐싱 적용)"""
+        self.locator.start()  # 캐시를 무효화할 변경 피드 시작
         cache_key = f"sessions:{project_id}"
         cached = cache_manager.get(CACHE_SESSIONS, cache_key)
         if cached is not None:
             return cached
 
-        project_dir = self.projects_dir / project_id
-
-        if not project_dir.exists():
-            return []
-
-        sessions = []
-        for session_file in project_dir.glob("*.jsonl"):
-            stat = session_file.stat()
-            sessions.append(
-                Session(
-                    id=session_file.stem,
-                    project_id=project_id,
-                    filename=session_file.name,
-                    size=stat.st_size,
-                    size_human=format_size(stat.st_size),
-                    updated_at=datetime.fromtimestamp(stat.st_mtime),
-                    is_agent=session_file.name.startswith("agent-"),
-                )
+        sessions = [
+            Session(
+                id=row["session_id"],
+                project_id=project_id,
+                filename=Path(row["path"]).name,
+                size=row["size"],
+                size_human=format_size(row["size"]),
+                updated_at=datetime.fromtimestamp(row["mtime"]),
+                is_agent=bool(row["is_agent"]),
             )
+            for row in self.catalog.list_sessions(project_id)
+        ]
 
-        result = sorted(sessions, key=lambda s: s.updated_at, reverse=True)
-        cache_manager.set(CACHE_SESSIONS, cache_key, result)
-        return result
+        cache_manager.set(CACHE_SESSIONS, cache_key, sessions)
+        return sessions
 
     def get_history(self, session_id: str, limit: int = 100) -> list[dict]:
         """세션 히스토리 조회"""
+        return self.get_history_page(session_id, limit).messages
+
+    def get_history_page(self, session_id: str, limit: int = 100,
+                         before: str | None = None, after: str | None = None,
+                         start: int | None = None) -> HistoryPage:
+        """커서 기반 세션 히스토리 조회
+
+        커서는 JSONL 바이트 오프셋이므로 페이지마다 해당 위치로 한 번 seek하고
+        limit개를 모을 때까지만 읽는다. start(메시지 번호)를 지정하면 오프셋 색인의
+        가장 가까운 체크포인트로 이동한 뒤 읽는다. 아무것도 없으면 파일 끝의
+        limit개를 반환한다.
+        """
         session_file = self._find_session_file(session_id)
 
         if not session_file:
-            return []
+            return HistoryPage()
+
+        return self._read_page(session_file, limit, before, after, start)
 
-        messages = []
-        with open(session_file, "r") as f:
+    def get_agent_history_page(self, session_id: str, agent_id: str, limit: int = 100,
+                               before: str | None = None, after: str | None = None,
+                               start: int | None = None) -> HistoryPage | None:
+        """에이전트 히스토리 조회 (세션 히스토리와 같은 커서 규칙, 에이전트가 없으면 None)"""
+        agent_file = self.locator.agents(session_id).get(agent_id)
+
+        if not agent_file:
+            return None
+
+        return self._read_page(agent_file, limit, before, after, start)
+
+    def _read_page(self, path: Path, limit: int, before: str | None,
+                   after: str | None, start: int | None) -> HistoryPage:
+        if start is not None:
+            index = self.offset_indexes.get(path)
+            offset, skip = index.locate(start)
+            page = self._read_forward(path, offset, limit, skip)
+            page.total = index.count
+            return page
+        if after is not None:
+            return self._read_forward(path, decode_cursor(after), limit)
+        end = decode_cursor(before) if before is not None else None
+        return self._read_backward(path, end, limit)
+
+    def _parse_bytes(self, line: bytes) -> dict | None:
+        if not line.strip():
+            return None
+        return self.parser.parse_line(line.decode("utf-8", errors="replace"))
+
+    def _read_backward(self, session_file: Path, end: int | None, limit: int) -> HistoryPage:
+        """end 오프셋(없으면 파일 끝) 이전의 마지막 limit개 메시지"""
+        page = HistoryPage()
+        first = True
+        newest_end = end
+        exhausted = True
+
+        # 파일 끝에서부터 거꾸로 읽어 limit개를 모으면 중단 (파일 크기와 무관)
+        for offset, line in iter_lines_reversed(session_file, end=end):
+            parsed = self._parse_bytes(line)
+            if first:
+                first = False
+                # 파일 끝의 줄바꿈 없는 라인은 파싱되는 경우에만 완성된 라인으로 취급
+                if end is None:
+                    newest_end = offset + len(line) if parsed else offset
+            if parsed:
+                if not page.messages and end is not None:
+                    newest_end = offset + len(line) + 1
+                page.messages.append(parsed)
+                page.prev_cursor = encode_cursor(offset)
+                if limit and len(page.messages) >= limit:
+                    exhausted = False
+                    break
+
+        page.messages.reverse()
+        if exhausted:
+            page.prev_cursor = None
+        page.next_cursor = encode_cursor(newest_end or 0)
+        return page
+
+    def _read_forward(self, session_file: Path, start: int, limit: int, skip: int = 0) -> HistoryPage:
+        """start 오프셋부터 skip개를 건너뛴 뒤 limit개 메시지 (마지막 미완성 라인은 소비하지 않음)"""
+        page = HistoryPage(prev_cursor=encode_cursor(start))
+        pos = start
+
+        with open(session_file, "rb") as f:
+            f.seek(start)
             for line in f:
-                parsed = self.parser.parse_line(line)
+                complete = line.endswith(b"\n")
+                parsed = self._parse_bytes(line)
+                if not complete and parsed is None:
+                    break
                 if parsed:
-                    messages.append(parsed)
-
-        return messages[-limit:] if limit else messages
+                    if skip:
+                        skip -= 1
+                    else:
+                        if not page.messages:
+                            page.prev_cursor = encode_cursor(pos)
+                        page.messages.append(parsed)
+                pos += len(line)
+                if limit and len(page.messages) >= limit:
+                    break
+
+        page.next_cursor = encode_cursor(pos)
+        return page
 
     def get_metadata(self, session_id: str) -> SessionMetadata | None:
         """세션 메타데이터 조회"""
@@ -76,43 +206,85 @@ class SessionService:
         return self._extract_metadata(session_file)
 
     def search(self, keyword: str, project_id: str | None = None) -> list[SearchResult]:
-        """세션 검색"""
-        results = []
-
-        if project_id:
-            search_dirs = [self.projects_dir / project_id]
-        else:
-            search_dirs = [d for d in self.projects_dir.iterdir() if d.is_dir()]
-
-        for project_dir in search_dirs:
-            if not project_dir.exists():
-                continue
+        """세션 검색 (카탈로그 조회)
+
+        본문이 일치한 세션을 SEARCH_MIN_SESSIONS개 모일 때까지 최신 구간부터 읽어
+        가장 관련도 높은 메시지 점수 순으로 먼저 반환하고, 요약/첫 메시지/프로젝트 ID에만
+        일치한 세션을 최신순으로 잇는다.
+        """
+        results = list(self.iter_search(keyword, project_id, exhaustive=False))
+        # bm25 점수는 색인 전체 통계로 계산되므로 구간이 달라도 비교 가능 (점수 없는 결과는 뒤에 유지)
+        results.sort(key=lambda result: (result.score is None, result.score or 0.0))
+        return results
+
+    def iter_search(self, keyword: str, project_id: str | None = None,
+                    exhaustive: bool = True) -> Iterator[SearchResult]:
+        """세션 검색 결과를 준비되는 대로 반환
+
+        일치 메시지를 최신순 구간별로 점수를 매기므로 첫 구간의 결과는 나머지
+        구간을 계산하기 전에 반환된다. exhaustive가 False이면 본문이 일치한 세션이
+        SEARCH_MIN_SESSIONS개 모이면 나머지 구간을 읽지 않는다.
+        """
+        seen: set[str] = set()
+        match = build_match_query(keyword)
+        terms = parse_query(keyword)
+
+        if match:
+            for window in self.catalog.iter_message_hits(match, project_id):
+                # 구간은 점수 순이므로 세션별 첫 일치가 가장 관련도 높은 메시지
+                sessions: dict[str, list] = {}
+                for hit in window:
+                    if hit["path"] not in seen:
+                        sessions.setdefault(hit["path"], []).append(hit)
+
+                rows = self.catalog.get_rows(list(sessions))
+                bodies = self.catalog.message_bodies([
+                    hit["id"] for hits in sessions.values() for hit in hits[:SEARCH_HITS_PER_SESSION]
+                ])
+                for path, hits in sessions.items():
+                    if path not in rows:
+                        continue
+                    seen.add(path)
+                    yield self._to_search_result(rows[path], hits[0]["score"], [
+                        self._to_search_hit(hit, bodies.get(hit["id"], ""), terms)
+                        for hit in hits[:SEARCH_HITS_PER_SESSION]
+                    ])
+                if not exhaustive and len(seen) >= SEARCH_MIN_SESSIONS:
+                    break
+
+        for row in self.catalog.search(keyword, project_id):
+            if row["path"] not in seen:
+                yield self._to_search_result(row)
+
+    def _to_search_hit(self, hit, body: str, terms) -> SearchHit:
+        snippet, highlights = make_snippet(body, highlight_spans(body, terms))
+        return SearchHit(
+            offset=hit["offset"],
+            cursor=encode_cursor(hit["offset"]),
+            role=hit["role"],
+            timestamp=hit["timestamp"],
+            snippet=snippet,
+            highlights=highlights,
+        )
 
-            for session_file in project_dir.glob("*.jsonl"):
-                if session_file.name.startswith("agent-"):
-                    continue
-
-                metadata = self._extract_metadata(session_file)
-                searchable = f"{metadata.summary or ''} {metadata.first_message or ''} {project_dir.name}"
-
-                if keyword.lower() in searchable.lower():
-                    results.append(
-                        SearchResult(
-                            session_id=session_file.stem,
-                            project_id=project_dir.name,
-                            project_path=self._decode_project_path(project_dir.name),
-                            summary=metadata.summary,
-                            first_message=metadata.first_message,
-                            message_count=metadata.message_count,
-                            size_human=metadata.size_human,
-                            updated_at=metadata.updated_at,
-                            has_agents=metadata.has_agents,
-                            agent_count=metadata.agent_count,
-                            tool_calls=metadata.tool_calls,
-                        )
-                    )
-
-        return sorted(results, key=lambda x: x.updated_at, reverse=True)
+    def _to_search_result(self, row, score: float | None = None,
+                          hits: list[SearchHit] | None = None) -> SearchResult:
+        metadata = row_to_metadata(row)
+        return SearchResult(
+            session_id=row["session_id"],
+            project_id=row["project_id"],
+            project_path=self._decode_project_path(row["project_id"]),
+            summary=metadata.summary,
+            first_message=metadata.first_message,
+            message_count=metadata.message_count,
+            size_human=metadata.size_human,
+            updated_at=metadata.updated_at,
+            has_agents=metadata.has_agents,
+            agent_count=metadata.agent_count,
+            tool_calls=metadata.tool_calls,
+            score=score,
+            hits=hits or [],
+        )
 
     def get_resume_info(self, session_id: str) -> ResumeInfo | None:
         """세션 재개 정보 조회"""
@@ -159,131 +331,70 @@ class SessionService:
             status="started",
         )
 
-    def get_agent_logs(self, session_id: str) -> list[dict]:
-        """세션과 관련된 백그라운드 에이전트 로그 조회"""
-        session_file = self._find_session_file(session_id)
-
-        if not session_file:
+    def get_agent_logs(self, session_id: str) -> list[AgentSummary]:
+        """세션과 관련된 백그라운드 에이전트 요약 (메시지는 get_agent_history_page로 조회)"""
+        if not self._find_session_file(session_id):
             return []
 
-        project_dir = session_file.parent
         agents = []
-
-        # 에이전트 파일들을 순회하며 sessionId가 일치하는 것을 찾음
-        for agent_file in project_dir.glob("agent-*.jsonl"):
+        # 에이전트 → 세션 매핑은 locator가, 개수/도구 집계는 카탈로그가 유지
+        for agent_id, agent_file in self.locator.agents(session_id).items():
             try:
-                with open(agent_file, "r") as f:
-                    first_line = f.readline()
-                    if not first_line:
-                        continue
-
-                    first_data = json.loads(first_line)
-                    agent_session_id = first_data.get("sessionId", "")
-
-                    # sessionId가 현재 세션과 일치하는 경우
-                    if agent_session_id == session_id:
-                        agent_id = first_data.get("agentId", agent_file.stem.replace("agent-", ""))
-
-                        # 파일을 다시 열어서 모든 메시지 파싱
-                        messages = []
-                        f.seek(0)
-                        for line in f:
-                            parsed = self.parser.parse_line(line)
-                            if parsed:
-                                messages.append(parsed)
-
-                        stat = agent_file.stat()
-                        agents.append({
-                            "agent_id": agent_id,
-                            "messages": messages,
-                            "size_human": format_size(stat.st_size),
-                            "updated_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                        })
-            except (json.JSONDecodeError, IOError):
+                metadata = self._extract_metadata(agent_file)
+            except OSError:
                 continue
+            agents.append(AgentSummary(
+                agent_id=agent_id,
+                size=metadata.size,
+                size_human=metadata.size_human,
+                message_count=metadata.message_count,
+                updated_at=metadata.updated_at,
+                tool_calls=metadata.tool_calls,
+            ))
 
         # 업데이트 시간 기준 정렬
-        return sorted(agents, key=lambda x: x["updated_at"], reverse=True)
+        return sorted(agents, key=lambda x: x.updated_at, reverse=True)
 
     def _extract_metadata(self, session_file: Path) -> SessionMetadata:
-        """세션 파일에서 메타데이터 추출 (캐싱 적용)"""
+        """세션 파일 메타데이터 (메모리 캐시 → 카탈로그 순, 파일 식별 정보 기준)"""
         stat = session_file.stat()
-        cache_key = f"meta:{session_file.stem}:{stat.st_mtime}"
+        inode, size, mtime = file_identity(stat)
+        cache_key = f"meta:{session_file}:{inode}:{size}:{mtime}"
         cached = cache_manager.get(CACHE_METADATA, cache_key)
         if cached is not None:
             return cached
 
-        metadata = SessionMetadata(
-            session_id=session_file.stem,
-            size=stat.st_size,
-            size_human=format_size(stat.st_size),
-            updated_at=datetime.fromtimestamp(stat.st_mtime),
-        )
-
-        agent_ids = set()
-
-        with open(session_file, "r") as f:
-            for i, line in enumerate(f):
-                try:
-                    data = json.loads(line)
-                    msg_type = data.get("type")
-
-                    if i == 0 and msg_type == "summary":
-                        metadata.summary = data.get("summary")
-                        metadata.leaf_uuid = data.get("leafUuid")
-
-                    if msg_type == "user":
-                        metadata.user_message_count += 1
-                        if not metadata.first_message:
-                            display = data.get("display", "")
-                            if not display:
-                                msg_content = data.get("message", {}).get("content", "")
-                                display = msg_content if isinstance(msg_content, str) else ""
-                            metadata.first_message = display[:100]
-
-                    if msg_type in ["user", "assistant"]:
-                        metadata.message_count += 1
-
-                    if msg_type == "assistant":
-                        content = data.get("message", {}).get("content", [])
-                        for c in content:
-                            if c.get("type") == "tool_use":
-                                tool_name = c.get("name", "Unknown")
-                                metadata.tool_calls[tool_name] = metadata.tool_calls.get(tool_name, 0) + 1
-
-                                if tool_name == "Task":
-                                    agent_id = c.get("id", "")[:7]
-                                    if agent_id:
-                                        agent_ids.add(agent_id)
-
-                except json.JSONDecodeError:
-                    continue
-
-        metadata.has_agents = len(agent_ids) > 0
-        metadata.agent_count = len(agent_ids)
-
+        metadata = self.catalog.metadata(session_file)
         cache_manager.set(CACHE_METADATA, cache_key, metadata)
         return metadata
 
     def _find_session_file(self, session_id: str) -> Path | None:
-        """세션 ID로 파일 경로 찾기 (인스턴스 캐싱)"""
-        if session_id in self._session_file_cache:
-            cached_path = self._session_file_cache[session_id]
-            if cached_path.exists():
-                return cached_path
-            del self._session_file_cache[session_id]
-
-        for project_dir in self.projects_dir.iterdir():
-            if not project_dir.is_dir():
-                continue
-            for session_file in project_dir.glob("*.jsonl"):
-                if session_id in session_file.name:
-                    self._session_file_cache[session_id] = session_file
-                    return session_file
-        return None
+        """세션 ID로 파일 경로 찾기 (전역 색인)"""
+        return self.locator.find(session_id)
 
     def _decode_project_path(self, encoded: str) -> str:
         """프로젝트 경로 디코딩"""
         if encoded.startswith("-"):
             return "/" + encoded[1:].replace("-", "/")
         return encoded.replace("-", "/")
+
+
+def invalidate_sessions(events: list[ChangeEvent]) -> None:
+    """변경된 프로젝트의 세션 목록과 변경된 파일의 메타데이터 캐시만 무효화
+
+    카탈로그 구독자(session_catalog.apply_changes)가 먼저 등록되어 있으므로 여기서
+    비운 목록은 다음 조회 때 이미 갱신된 카탈로그에서 다시 만들어진다.
+    """
+    if any(event.kind == RESYNC for event in events):
+        cache_manager.clear(CACHE_SESSIONS)
+        cache_manager.clear(CACHE_METADATA)
+        return
+    events = [event for event in events if event.kind != NESTED_CHANGED]
+    for project_id in {event.project_id for event in events}:
+        cache_manager.delete(CACHE_SESSIONS, f"sessions:{project_id}")
+    for event in events:
+        if event.kind in (SESSION_APPENDED, SESSION_DELETED):
+            cache_manager.delete_prefix(CACHE_METADATA, f"meta:{event.path}:")
+
+
+change_feed.subscribe(invalidate_sessions)
@@ -1,13 +1,27 @@
 """Claude Code Usage 데이터 파싱 서비스"""
 
+import bisect
+import hashlib
 import json
 import logging
+import multiprocessing
+import os
+import re
+import sqlite3
+import sys
+import threading
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Iterable, Optional
 from collections import defaultdict
 
+from config import config
+from services.common.constants import DEFAULT_STORAGE_DIR
+
 logger = logging.getLogger(__name__)
 
 # Claude 4 pricing constants (per million tokens)
@@ -21,8 +35,23 @@ SONNET_4_OUTPUT_PRICE = 15.0
 SONNET_4_CACHE_WRITE_PRICE = 3.75
 SONNET_4_CACHE_READ_PRICE = 0.30
 
+# Usage ledger 저장 설정
+USAGE_LEDGER_FILE = DEFAULT_STORAGE_DIR / "usage_ledger.db"
+USAGE_LEDGER_VERSION = 5
+LEDGER_FINGERPRINT_BYTES = 64
 
-@dataclass
+# 타임스탬프는 수집 시점에 UTC epoch 밀리초로 한 번만 변환
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MS_PER_DAY = 86_400_000
+NO_TIMESTAMP = -(2 ** 63)  # 파싱할 수 없는 타임스탬프
+
+# JSON 디코딩 전 바이트 단위 prefilter
+USAGE_MARKER = b'"usage"'
+TIMESTAMP_BYTES_RE = re.compile(rb'"timestamp"\s*:\s*"([^"\\]*)"')
+CWD_BYTES_RE = re.compile(rb'"cwd"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+
+@dataclass(slots=True)
 class UsageEntry:
     timestamp: str
     model: str
@@ -33,6 +62,7 @@ class UsageEntry:
     cost: float
     session_id: str
     project_path: str
+    timestamp_ms: int = NO_TIMESTAMP
 
 
 @dataclass
@@ -149,280 +179,1420 @@ def calculate_cost(model: str, input_tokens: int, output_tokens: int,
     return cost
 
 
-def get_earliest_timestamp(path: Path) -> Optional[str]:
-    """파일에서 가장 이른 타임스탬프 가져오기"""
-    earliest = None
+def _hash_key(unique_hash: str) -> int:
+    """중복 제거용 "message_id:request_id"를 64비트 정수 키로 축약 (0은 hash 없음)
+
+    문자열 대신 정수로 보관하여 row마다 수십 바이트의 문자열 객체를 두지 않는다.
+    프로세스/재시작 간에 같은 값이어야 하므로 내장 hash() 대신 blake2b를 사용한다.
+    """
+    digest = hashlib.blake2b(unique_hash.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True) or 1
+
+
+class UsageRows:
+    """파일 하나에서 파싱한 usage row (컬럼형)
+
+    row마다 UsageEntry 객체를 두지 않고 중복 제거 키/타임스탬프/토큰/비용은
+    array 컬럼에, 모델/세션/프로젝트는 intern된 문자열 참조로 보관한다.
+    토큰이 없는 엔트리도 중복 제거 키를 선점하므로 model이 None인 row로 남긴다.
+    """
+
+    __slots__ = ("hashes", "timestamps", "input_tokens", "output_tokens",
+                 "cache_creation_tokens", "cache_read_tokens", "costs",
+                 "models", "sessions", "projects")
+    _ARRAY_COLUMNS = __slots__[:7]
+    _STRING_COLUMNS = __slots__[7:]
+
+    def __init__(self):
+        self.hashes = array("q")
+        self.timestamps = array("q")
+        self.input_tokens = array("q")
+        self.output_tokens = array("q")
+        self.cache_creation_tokens = array("q")
+        self.cache_read_tokens = array("q")
+        self.costs = array("d")
+        self.models: list[Optional[str]] = []
+        self.sessions: list[Optional[str]] = []
+        self.projects: list[Optional[str]] = []
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, UsageRows):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def append(self, key: int, entry: Optional[UsageEntry]) -> None:
+        """row 추가 (entry가 None이면 중복 제거 키만 선점하는 row)"""
+        self.hashes.append(key)
+        if entry is None:
+            self.timestamps.append(NO_TIMESTAMP)
+            for name in self._ARRAY_COLUMNS[2:]:
+                getattr(self, name).append(0)
+            self.models.append(None)
+            self.sessions.append(None)
+            self.projects.append(None)
+            return
+        self.timestamps.append(entry.timestamp_ms)
+        self.input_tokens.append(entry.input_tokens)
+        self.output_tokens.append(entry.output_tokens)
+        self.cache_creation_tokens.append(entry.cache_creation_tokens)
+        self.cache_read_tokens.append(entry.cache_read_tokens)
+        self.costs.append(entry.cost)
+        self.models.append(entry.model)
+        self.sessions.append(entry.session_id)
+        self.projects.append(entry.project_path)
+
+    def extend(self, other: "UsageRows") -> None:
+        """다른 프로세스에서 파싱한 row 추가 (문자열은 다시 intern)"""
+        for name in self._ARRAY_COLUMNS:
+            getattr(self, name).extend(getattr(other, name))
+        for name in self._STRING_COLUMNS:
+            getattr(self, name).extend(
+                sys.intern(value) if value is not None else None
+                for value in getattr(other, name)
+            )
+
+    def entry(self, i: int) -> Optional[UsageEntry]:
+        """i번째 row를 UsageEntry로 변환 (중복 제거 키만 있는 row는 None)"""
+        model = self.models[i]
+        if model is None:
+            return None
+        ts = self.timestamps[i]
+        return UsageEntry(
+            timestamp=format_timestamp_ms(ts),
+            model=model,
+            input_tokens=self.input_tokens[i],
+            output_tokens=self.output_tokens[i],
+            cache_creation_tokens=self.cache_creation_tokens[i],
+            cache_read_tokens=self.cache_read_tokens[i],
+            cost=self.costs[i],
+            session_id=self.sessions[i],
+            project_path=self.projects[i],
+            timestamp_ms=ts,
+        )
+
+
+@dataclass
+class LedgerRecord:
+    """파일별 usage ledger 레코드
+
+    (path, inode, size, mtime)으로 파일을 식별하고, 이미 소비한 바이트 위치와
+    파싱된 row(UsageRows)를 기억한다.
+    """
+    project_name: str
+    inode: int = 0
+    size: int = 0
+    mtime: float = 0.0
+    offset: int = 0
+    fingerprint: bytes = b""
+    project_path: Optional[str] = None
+    earliest_timestamp: Optional[str] = None
+    rows: UsageRows = field(default_factory=UsageRows)
+
+
+def _ingest_usage_line(data: dict, record: LedgerRecord, session_id: str) -> None:
+    """파싱된 JSONL 라인 하나를 record에 반영"""
+    ts = data.get("timestamp")
+    if ts and (record.earliest_timestamp is None or ts < record.earliest_timestamp):
+        record.earliest_timestamp = ts
+
+    # cwd에서 실제 프로젝트 경로 추출
+    if record.project_path is None and "cwd" in data:
+        record.project_path = data["cwd"]
+
+    # message에서 usage 데이터 추출
+    message = data.get("message")
+    if not message:
+        return
+
+    usage = message.get("usage")
+    if not usage:
+        return
+
+    msg_id = message.get("id", "")
+    req_id = data.get("requestId", "")
+    key = _hash_key(f"{msg_id}:{req_id}") if msg_id and req_id else 0
+
+    input_tokens = usage.get("input_tokens", 0) or 0
+    output_tokens = usage.get("output_tokens", 0) or 0
+    cache_creation = usage.get("cache_creation_input_tokens", 0) or 0
+    cache_read = usage.get("cache_read_input_tokens", 0) or 0
+
+    # 토큰이 없는 엔트리는 hash만 선점
+    if input_tokens == 0 and output_tokens == 0 and cache_creation == 0 and cache_read == 0:
+        if key:
+            record.rows.append(key, None)
+        return
+
+    model = message.get("model", "unknown")
+    cost = data.get("costUSD")
+    if cost is None:
+        cost = calculate_cost(model, input_tokens, output_tokens,
+                              cache_creation, cache_read)
+
+    # 반복되는 문자열은 intern하여 엔트리마다 사본이 생기지 않게 함
+    timestamp = data.get("timestamp", "")
+    record.rows.append(key, UsageEntry(
+        timestamp=timestamp,
+        model=sys.intern(model),
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cache_creation_tokens=cache_creation,
+        cache_read_tokens=cache_read,
+        cost=cost,
+        session_id=sys.intern(data.get("sessionId", session_id)),
+        project_path=sys.intern(record.project_path or record.project_name),
+        timestamp_ms=parse_timestamp_ms(timestamp),
+    ))
+
+
+def _scan_line_bytes(line: bytes, record: LedgerRecord) -> None:
+    """usage가 없는 라인에서 JSON 디코딩 없이 timestamp/cwd만 추출"""
+    match = TIMESTAMP_BYTES_RE.search(line)
+    if match:
+        ts = match.group(1).decode("utf-8", "replace")
+        if ts and (record.earliest_timestamp is None or ts < record.earliest_timestamp):
+            record.earliest_timestamp = ts
+
+    if record.project_path is None:
+        match = CWD_BYTES_RE.search(line)
+        if match:
+            try:
+                record.project_path = json.loads(match.group(1))
+            except ValueError:
+                pass
+
+
+def parse_usage_tail(path: Path, record: LedgerRecord, prefilter: bool = True) -> int:
+    """record.offset 이후에 추가된 바이트만 파싱하여 record에 누적
+
+    아직 쓰는 중인 마지막 라인(개행 없음 + JSON 파싱 실패)은 소비하지 않고
+    다음 호출에서 다시 읽는다. prefilter가 켜져 있으면 "usage" 키가 없는
+    완성된 라인은 JSON 디코딩 없이 timestamp/cwd만 바이트에서 추출한다.
+
+    Returns:
+        새로 추가된 row 수
+    """
+    session_id = path.parent.name if path.parent else "unknown"
+    rows_before = len(record.rows)
+
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    data = json.loads(line)
-                    ts = data.get("timestamp")
-                    if ts:
-                        if earliest is None or ts < earliest:
-                            earliest = ts
-                except json.JSONDecodeError:
-                    continue
+        with open(path, "rb") as f:
+            f.seek(record.offset)
+            for raw in f:
+                line = raw.strip()
+                if line and prefilter and USAGE_MARKER not in line and raw.endswith(b"\n"):
+                    _scan_line_bytes(line, record)
+                elif line:
+                    try:
+                        data = json.loads(line)
+                    except ValueError:
+                        if not raw.endswith(b"\n"):
+                            break
+                        data = None
+                    if isinstance(data, dict):
+                        _ingest_usage_line(data, record, session_id)
+                record.offset += len(raw)
+
+            start = max(0, record.offset - LEDGER_FINGERPRINT_BYTES)
+            f.seek(start)
+            record.fingerprint = f.read(record.offset - start)
     except Exception as e:
-        logger.debug(f"Error reading {path}: {e}")
-    return earliest
+        logger.debug(f"Error parsing {path}: {e}")
 
+    return len(record.rows) - rows_before
 
-def parse_jsonl_file(path: Path, encoded_project_name: str,
-                     processed_hashes: set) -> list[UsageEntry]:
-    """JSONL 파일에서 usage 엔트리 파싱"""
-    entries = []
-    actual_project_path = None
 
-    # 세션 ID 추출 (파일 경로에서)
-    session_id = path.parent.name if path.parent else "unknown"
+def _parse_usage_job(path: str, record: LedgerRecord) -> tuple:
+    """프로세스 풀 워커: 파일 tail을 파싱하고 결과 반환
+
+    row는 컬럼형(UsageRows)이므로 array 그대로 직렬화되어 프로세스 간 전송 비용이 작다.
+    """
+    parse_usage_tail(Path(path), record)
+    return record.offset, record.fingerprint, record.project_path, record.earliest_timestamp, record.rows
+
+
+def _apply_usage_job(record: LedgerRecord, result: tuple) -> None:
+    """워커 결과를 원래 레코드에 반영"""
+    offset, fingerprint, project_path, earliest, rows = result
+    record.offset = offset
+    record.fingerprint = fingerprint
+    record.project_path = project_path
+    record.earliest_timestamp = earliest
+    record.rows.extend(rows)
 
+
+def parse_timestamp_ms(timestamp: str) -> int:
+    """ISO 타임스탬프를 UTC epoch 밀리초로 변환 (timezone 없으면 UTC로 간주)"""
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
+        dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except (ValueError, AttributeError):
+        return NO_TIMESTAMP
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - EPOCH) // timedelta(milliseconds=1)
 
-                try:
-                    data = json.loads(line)
 
-                    # cwd에서 실제 프로젝트 경로 추출
-                    if actual_project_path is None and "cwd" in data:
-                        actual_project_path = data["cwd"]
+def format_timestamp_ms(ms: int) -> str:
+    """UTC epoch 밀리초를 Claude 로그와 같은 ISO 형식으로 변환"""
+    if ms == NO_TIMESTAMP:
+        return ""
+    dt = EPOCH + timedelta(milliseconds=ms)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.") + f"{ms % 1000:03d}Z"
 
-                    # message에서 usage 데이터 추출
-                    message = data.get("message")
-                    if not message:
-                        continue
 
-                    usage = message.get("usage")
-                    if not usage:
-                        continue
+def _entry_timestamp_ms(entry: UsageEntry) -> int:
+    return entry.timestamp_ms
 
-                    # 중복 제거
-                    msg_id = message.get("id", "")
-                    req_id = data.get("requestId", "")
-                    if msg_id and req_id:
-                        unique_hash = f"{msg_id}:{req_id}"
-                        if unique_hash in processed_hashes:
-                            continue
-                        processed_hashes.add(unique_hash)
-
-                    input_tokens = usage.get("input_tokens", 0) or 0
-                    output_tokens = usage.get("output_tokens", 0) or 0
-                    cache_creation = usage.get("cache_creation_input_tokens", 0) or 0
-                    cache_read = usage.get("cache_read_input_tokens", 0) or 0
-
-                    # 토큰이 없는 엔트리 건너뛰기
-                    if input_tokens == 0 and output_tokens == 0 and cache_creation == 0 and cache_read == 0:
-                        continue
 
-                    model = message.get("model", "unknown")
-                    cost = data.get("costUSD")
-                    if cost is None:
-                        cost = calculate_cost(model, input_tokens, output_tokens,
-                                              cache_creation, cache_read)
-
-                    project_path = actual_project_path or encoded_project_name
-
-                    entries.append(UsageEntry(
-                        timestamp=data.get("timestamp", ""),
-                        model=model,
-                        input_tokens=input_tokens,
-                        output_tokens=output_tokens,
-                        cache_creation_tokens=cache_creation,
-                        cache_read_tokens=cache_read,
-                        cost=cost,
-                        session_id=data.get("sessionId", session_id),
-                        project_path=project_path,
-                    ))
-
-                except json.JSONDecodeError:
-                    continue
+def _day_of(timestamp_ms: int) -> Optional[int]:
+    """epoch 밀리초가 속한 UTC 날짜 번호 (epoch 기준 일수)"""
+    return timestamp_ms // MS_PER_DAY if timestamp_ms != NO_TIMESTAMP else None
 
-    except Exception as e:
-        logger.debug(f"Error parsing {path}: {e}")
 
-    return entries
+def _format_day(day: Optional[int]) -> str:
+    return (EPOCH + timedelta(days=day)).strftime("%Y-%m-%d") if day is not None else ""
 
 
-def get_all_usage_entries(claude_path: Path) -> list[UsageEntry]:
-    """모든 usage 엔트리 가져오기"""
-    all_entries = []
-    processed_hashes = set()
-    projects_dir = claude_path / "projects"
+@dataclass
+class RollupBucket:
+    """일 × 모델 × 프로젝트 단위 usage 합계"""
+    date: str
+    model: str
+    project_path: str
+    total_cost: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_tokens: int = 0
+    cache_read_tokens: int = 0
+    count: int = 0
+    first_timestamp: str = ""
+    last_timestamp: str = ""
 
-    if not projects_dir.exists():
-        return all_entries
 
-    # 처리할 파일 수집
-    files_to_process = []
-    for project_dir in projects_dir.iterdir():
-        if not project_dir.is_dir():
-            continue
+class UsageRollup:
+    """일 × 모델 × 프로젝트 버킷으로 미리 집계한 usage 저장소
 
-        project_name = project_dir.name
-        for jsonl_file in project_dir.rglob("*.jsonl"):
-            files_to_process.append((jsonl_file, project_name))
+    UsageLedger 리스너로 등록되어 새 엔트리가 들어올 때마다 증분 갱신된다.
+    """
 
-    # 타임스탬프 순으로 정렬
-    files_to_process.sort(key=lambda x: get_earliest_timestamp(x[0]) or "")
+    def __init__(self):
+        self.buckets: dict[tuple[Optional[int], str, str], RollupBucket] = {}
 
-    # 파일 처리
-    for path, project_name in files_to_process:
-        entries = parse_jsonl_file(path, project_name, processed_hashes)
-        all_entries.extend(entries)
+    def rebuild(self, table: "UsageTable") -> None:
+        """병합된 전체 테이블로 버킷 재생성"""
+        self.buckets = table.bucket_map()
 
-    # 타임스탬프 순 정렬
-    all_entries.sort(key=lambda x: x.timestamp)
+    def extend(self, entries: list[UsageEntry]) -> None:
+        """새 엔트리를 버킷에 누적"""
+        for entry in entries:
+            day = _day_of(entry.timestamp_ms)
+            key = (day, entry.model, entry.project_path)
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = RollupBucket(
+                    date=_format_day(day),
+                    model=entry.model,
+                    project_path=entry.project_path,
+                    first_timestamp=entry.timestamp,
+                    last_timestamp=entry.timestamp,
+                )
+                self.buckets[key] = bucket
+            bucket.total_cost += entry.cost
+            bucket.input_tokens += entry.input_tokens
+            bucket.output_tokens += entry.output_tokens
+            bucket.cache_creation_tokens += entry.cache_creation_tokens
+            bucket.cache_read_tokens += entry.cache_read_tokens
+            bucket.count += 1
+            if entry.timestamp < bucket.first_timestamp:
+                bucket.first_timestamp = entry.timestamp
+            if entry.timestamp > bucket.last_timestamp:
+                bucket.last_timestamp = entry.timestamp
+
+    def query(self, first_day: Optional[int] = None, last_day: Optional[int] = None) -> list[RollupBucket]:
+        """[first_day, last_day] UTC 날짜 버킷 조회 (인자가 없으면 전체)"""
+        if first_day is None and last_day is None:
+            return list(self.buckets.values())
+        return [
+            bucket for (day, _, _), bucket in self.buckets.items()
+            if day is not None and first_day <= day <= last_day
+        ]
+
+
+MS_PER_HOUR = 3_600_000
 
-    return all_entries
+
+@dataclass
+class UsageBlock:
+    """과금 블록 (첫 사용 시각을 정시로 내림한 시점부터 N시간)"""
+    start_ms: int
+    end_ms: int
+    first_ms: int
+    last_ms: int
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_tokens: int = 0
+    cache_read_tokens: int = 0
+    cost: float = 0.0
+    entry_count: int = 0
+    models: list = field(default_factory=list)
+
+    @property
+    def total_tokens(self) -> int:
+        return (self.input_tokens + self.output_tokens +
+                self.cache_creation_tokens + self.cache_read_tokens)
+
+    def add(self, ts: int, input_tokens: int, output_tokens: int, cache_creation: int,
+            cache_read: int, cost: float, model: str) -> None:
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cache_creation_tokens += cache_creation
+        self.cache_read_tokens += cache_read
+        self.cost += cost
+        self.entry_count += 1
+        self.first_ms = min(self.first_ms, ts)
+        self.last_ms = max(self.last_ms, ts)
+        if model not in self.models:
+            self.models.append(model)
+
+    def to_dict(self) -> dict:
+        return {
+            "start": format_timestamp_ms(self.start_ms),
+            "end": format_timestamp_ms(self.end_ms),
+            "first_activity": format_timestamp_ms(self.first_ms),
+            "last_activity": format_timestamp_ms(self.last_ms),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_creation_tokens": self.cache_creation_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "total_tokens": self.total_tokens,
+            "total_cost": self.cost,
+            "entry_count": self.entry_count,
+            "models": self.models,
+        }
+
+
+class UsageBlockTracker:
+    """최근 과금 블록을 유지하는 슬라이딩 윈도우 집계기
+
+    UsageLedger 리스너로 등록되어 새 엔트리만 받아 현재 블록에 누적한다.
+    직전 엔트리보다 N시간 이상 비었거나 블록 종료 시각을 넘은 엔트리가
+    들어오면 새 블록을 시작한다.
+    """
+
+    def __init__(self, block_hours: int = 5, history: int = 24):
+        self.block_ms = block_hours * MS_PER_HOUR
+        self.blocks: deque[UsageBlock] = deque(maxlen=history)
+        self._table: Optional[UsageTable] = None
+
+    def rebuild(self, table: "UsageTable") -> None:
+        """정렬된 전체 테이블로 블록 재계산"""
+        # ledger가 정렬 상태로 계속 갱신하는 테이블이므로 참조를 보관
+        self._table = table
+        self.blocks.clear()
+        models = table.models.values
+        for ts, input_tokens, output_tokens, cache_creation, cache_read, cost, model_id in zip(
+                table.timestamps, table.input_tokens, table.output_tokens,
+                table.cache_creation_tokens, table.cache_read_tokens, table.costs, table.model_ids):
+            self._add(ts, input_tokens, output_tokens, cache_creation, cache_read, cost, models[model_id])
+
+    def extend(self, entries: list[UsageEntry]) -> None:
+        """새 엔트리를 블록에 누적 (타임스탬프 없는 엔트리는 rebuild처럼 무시)"""
+        entries = [e for e in entries if e.timestamp_ms != NO_TIMESTAMP]
+        if (self._table is not None and self.blocks
+                and any(e.timestamp_ms < self.blocks[-1].last_ms for e in entries)):
+            # 과거 엔트리는 블록 경계를 바꿀 수 있으므로 전체 재계산
+            self.rebuild(self._table)
+            return
+        for entry in sorted(entries, key=_entry_timestamp_ms):
+            self._add(entry.timestamp_ms, entry.input_tokens, entry.output_tokens,
+                      entry.cache_creation_tokens, entry.cache_read_tokens, entry.cost, entry.model)
+
+    def _add(self, ts: int, input_tokens: int, output_tokens: int, cache_creation: int,
+             cache_read: int, cost: float, model: str) -> None:
+        if ts == NO_TIMESTAMP:
+            return
+
+        block = self.blocks[-1] if self.blocks else None
+        if block is None or ts >= block.end_ms or ts - block.last_ms >= self.block_ms:
+            start = ts - ts % MS_PER_HOUR
+            block = UsageBlock(start_ms=start, end_ms=start + self.block_ms, first_ms=ts, last_ms=ts)
+            self.blocks.append(block)
+        block.add(ts, input_tokens, output_tokens, cache_creation, cache_read, cost, model)
+
+    def snapshot(self, now_ms: int, token_limit: Optional[int] = None) -> dict:
+        """현재 블록(소진 속도/예상치 포함)과 최근 블록 목록"""
+        current = None
+        recent = list(reversed(self.blocks))
+        if recent and now_ms < recent[0].end_ms and now_ms - recent[0].last_ms < self.block_ms:
+            current = recent.pop(0)
+
+        result = {
+            "block_hours": self.block_ms // MS_PER_HOUR,
+            "token_limit": token_limit,
+            "current": None,
+            "recent": [b.to_dict() for b in recent],
+        }
+        if current is None:
+            return result
+
+        # 첫 사용부터 현재까지의 소진 속도 (최소 1분)
+        elapsed_minutes = max((now_ms - current.first_ms) / 60_000, 1.0)
+        remaining_minutes = (current.end_ms - now_ms) / 60_000
+        tokens_per_minute = current.total_tokens / elapsed_minutes
+        cost_per_hour = current.cost / elapsed_minutes * 60
+
+        exhausts_at = None
+        if token_limit and tokens_per_minute > 0:
+            minutes_left = max(token_limit - current.total_tokens, 0) / tokens_per_minute
+            if minutes_left <= remaining_minutes:
+                exhausts_at = format_timestamp_ms(now_ms + int(minutes_left * 60_000))
+
+        block = current.to_dict()
+        block.update({
+            "remaining_minutes": round(remaining_minutes, 1),
+            "burn_rate": {
+                "tokens_per_minute": tokens_per_minute,
+                "cost_per_hour": cost_per_hour,
+            },
+            "projection": {
+                "total_tokens": int(current.total_tokens + tokens_per_minute * remaining_minutes),
+                "total_cost": current.cost + cost_per_hour * remaining_minutes / 60,
+            },
+            "exhausts_at": exhausts_at,
+        })
+        result["current"] = block
+        return result
+
+
+class UsageDeltaFeed:
+    """ledger에 새로 병합된 엔트리를 모아 두었다가 증분 이벤트로 내보내는 리스너
+
+    refresh를 누가 호출했는지(HTTP 요청/감시 태스크)와 무관하게 병합된
+    엔트리가 모두 모이므로, 감시 태스크는 drain()만 호출하면 된다.
+    구독자가 있는 동안(start() ~ stop())에만 모으며, start() 이전에 병합된
+    엔트리는 구독자가 /api/usage/stats로 이미 받은 기준선으로 취급한다.
+    """
+
+    def __init__(self):
+        self._pending: list[UsageEntry] = []
+        self._active = False
+        self._reset = False
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """수집 시작 (기존에 쌓인 변경은 버림)"""
+        with self._lock:
+            self._active = True
+            self._pending = []
+            self._reset = False
+
+    def stop(self) -> None:
+        """수집 중단 (구독자가 없는 동안 변경이 쌓이지 않도록)"""
+        with self._lock:
+            self._active = False
+            self._pending = []
+            self._reset = False
+
+    def rebuild(self, table: "UsageTable") -> None:
+        with self._lock:
+            if self._active:
+                self._reset = True
+                self._pending = []
+
+    def extend(self, entries: list[UsageEntry]) -> None:
+        with self._lock:
+            if self._active and not self._reset:
+                self._pending.extend(entries)
+
+    def drain(self) -> Optional[dict]:
+        """쌓인 변경을 이벤트 하나로 반환 (변경이 없으면 None)
+
+        파일 교체/삭제 등으로 전체 재병합된 경우에는 증분을 계산할 수 없으므로
+        클라이언트가 통계를 다시 조회하도록 usage_reset 이벤트를 반환한다.
+        """
+        with self._lock:
+            if self._reset:
+                self._reset = False
+                return {"type": "usage_reset"}
+            if not self._pending:
+                return None
+            entries, self._pending = self._pending, []
+
+        totals = {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_tokens": 0,
+            "cache_read_tokens": 0,
+            "total_cost": 0.0,
+            "count": len(entries),
+        }
+        for entry in entries:
+            totals["input_tokens"] += entry.input_tokens
+            totals["output_tokens"] += entry.output_tokens
+            totals["cache_creation_tokens"] += entry.cache_creation_tokens
+            totals["cache_read_tokens"] += entry.cache_read_tokens
+            totals["total_cost"] += entry.cost
+        totals["total_tokens"] = (totals["input_tokens"] + totals["output_tokens"] +
+                                  totals["cache_creation_tokens"] + totals["cache_read_tokens"])
+
+        return {
+            "type": "usage_delta",
+            "totals": totals,
+            "entries": [
+                {
+                    "timestamp": entry.timestamp,
+                    "model": entry.model,
+                    "session_id": entry.session_id,
+                    "project_path": entry.project_path,
+                    "input_tokens": entry.input_tokens,
+                    "output_tokens": entry.output_tokens,
+                    "cache_creation_tokens": entry.cache_creation_tokens,
+                    "cache_read_tokens": entry.cache_read_tokens,
+                    "cost": entry.cost,
+                }
+                for entry in entries
+            ],
+        }
+
+
+class _StringDictionary:
+    """문자열 ↔ 정수 코드 사전 (dictionary encoding)"""
+
+    def __init__(self):
+        self.values: list[str] = []
+        self._codes: dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+
+class UsageTable:
+    """타임스탬프 순으로 정렬된 컬럼형 usage 저장소
+
+    토큰은 array('q'), 비용은 array('d') 컬럼에 저장하고, 타임스탬프는 UTC
+    epoch 밀리초, 모델/프로젝트/세션은 사전 인코딩된 정수 코드로 보관한다.
+    UsageLedger가 소유하는 병합 결과 저장소로, 중복 제거 후 남은 row만 담는다.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self.timestamps = array("q")
+        self.input_tokens = array("q")
+        self.output_tokens = array("q")
+        self.cache_creation_tokens = array("q")
+        self.cache_read_tokens = array("q")
+        self.costs = array("d")
+        self.model_ids = array("l")
+        self.project_ids = array("l")
+        self.session_ids = array("l")
+        self.models = _StringDictionary()
+        self.projects = _StringDictionary()
+        self.sessions = _StringDictionary()
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __iter__(self):
+        return (self.entry(i) for i in range(len(self.timestamps)))
+
+    def entry(self, i: int) -> UsageEntry:
+        """i번째 행을 UsageEntry로 변환"""
+        ts = self.timestamps[i]
+        return UsageEntry(
+            timestamp=format_timestamp_ms(ts),
+            model=self.models.values[self.model_ids[i]],
+            input_tokens=self.input_tokens[i],
+            output_tokens=self.output_tokens[i],
+            cache_creation_tokens=self.cache_creation_tokens[i],
+            cache_read_tokens=self.cache_read_tokens[i],
+            cost=self.costs[i],
+            session_id=self.sessions.values[self.session_ids[i]],
+            project_path=self.projects.values[self.project_ids[i]],
+            timestamp_ms=ts,
+        )
+
+    def append_row(self, rows: UsageRows, i: int) -> None:
+        """파일별 row 하나를 끝에 추가 (정렬 순서는 호출자가 보장)"""
+        self.timestamps.append(rows.timestamps[i])
+        self.input_tokens.append(rows.input_tokens[i])
+        self.output_tokens.append(rows.output_tokens[i])
+        self.cache_creation_tokens.append(rows.cache_creation_tokens[i])
+        self.cache_read_tokens.append(rows.cache_read_tokens[i])
+        self.costs.append(rows.costs[i])
+        self.model_ids.append(self.models.encode(rows.models[i]))
+        self.project_ids.append(self.projects.encode(rows.projects[i]))
+        self.session_ids.append(self.sessions.encode(rows.sessions[i]))
+
+    def rebuild(self, entries: list[UsageEntry]) -> None:
+        """정렬된 전체 엔트리로 테이블 재생성"""
+        self.clear()
+        for entry in entries:
+            self._insert(len(self.timestamps), entry, entry.timestamp_ms)
+
+    def extend(self, entries: list[UsageEntry]) -> None:
+        """새 엔트리를 타임스탬프 순서를 유지하며 추가"""
+        for entry in entries:
+            ts = entry.timestamp_ms
+            if not self.timestamps or ts >= self.timestamps[-1]:
+                index = len(self.timestamps)
+            else:
+                index = bisect.bisect_right(self.timestamps, ts)
+            self._insert(index, entry, ts)
+
+    def _insert(self, index: int, entry: UsageEntry, ts: int) -> None:
+        self.timestamps.insert(index, ts)
+        self.input_tokens.insert(index, entry.input_tokens)
+        self.output_tokens.insert(index, entry.output_tokens)
+        self.cache_creation_tokens.insert(index, entry.cache_creation_tokens)
+        self.cache_read_tokens.insert(index, entry.cache_read_tokens)
+        self.costs.insert(index, entry.cost)
+        self.model_ids.insert(index, self.models.encode(entry.model))
+        self.project_ids.insert(index, self.projects.encode(entry.project_path))
+        self.session_ids.insert(index, self.sessions.encode(entry.session_id))
+
+    def row_range(self, lo: int, hi: int) -> range:
+        """lo <= timestamp <= hi 인 행 범위 (이진 탐색)"""
+        return range(
+            bisect.bisect_left(self.timestamps, lo),
+            bisect.bisect_right(self.timestamps, hi),
+        )
+
+    def buckets(self, rows: Optional[Iterable[int]] = None) -> list[RollupBucket]:
+        """지정한 행(기본: 전체)을 일 × 모델 × 프로젝트 버킷으로 집계 (첫 사용 시각 순)"""
+        return list(self.bucket_map(rows).values())
+
+    def bucket_map(self, rows: Optional[Iterable[int]] = None) -> dict[tuple, RollupBucket]:
+        """buckets()와 같은 집계를 (UTC 날짜 번호, 모델, 프로젝트) 키의 dict로 반환"""
+        if rows is None:
+            rows = range(len(self.timestamps))
+
+        timestamps = self.timestamps
+        model_ids = self.model_ids
+        project_ids = self.project_ids
+        costs = self.costs
+        input_tokens = self.input_tokens
+        output_tokens = self.output_tokens
+        cache_creation_tokens = self.cache_creation_tokens
+        cache_read_tokens = self.cache_read_tokens
+        groups: dict[tuple, list] = {}
+
+        for i in rows:
+            ts = timestamps[i]
+            key = (_day_of(ts), model_ids[i], project_ids[i])
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [costs[i], input_tokens[i], output_tokens[i],
+                               cache_creation_tokens[i], cache_read_tokens[i], 1, ts, ts]
+            else:
+                group[0] += costs[i]
+                group[1] += input_tokens[i]
+                group[2] += output_tokens[i]
+                group[3] += cache_creation_tokens[i]
+                group[4] += cache_read_tokens[i]
+                group[5] += 1
+                group[7] = ts
+
+        dates: dict[Optional[int], str] = {}
+        result = {}
+        for (day, model_id, project_id), group in groups.items():
+            if day not in dates:
+                dates[day] = _format_day(day)
+            model = self.models.values[model_id]
+            project_path = self.projects.values[project_id]
+            result[(day, model, project_path)] = RollupBucket(
+                date=dates[day],
+                model=model,
+                project_path=project_path,
+                total_cost=group[0],
+                input_tokens=group[1],
+                output_tokens=group[2],
+                cache_creation_tokens=group[3],
+                cache_read_tokens=group[4],
+                count=group[5],
+                first_timestamp=format_timestamp_ms(group[6]),
+                last_timestamp=format_timestamp_ms(group[7]),
+            )
+        return result
+
+
+LEDGER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    project_name TEXT NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    offset INTEGER NOT NULL,
+    fingerprint BLOB NOT NULL,
+    project_path TEXT,
+    earliest_timestamp TEXT
+);
+
+CREATE TABLE IF NOT EXISTS rows (
+    file_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    hash INTEGER NOT NULL,
+    timestamp_ms INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    cache_creation_tokens INTEGER NOT NULL,
+    cache_read_tokens INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    model TEXT,
+    session_id TEXT,
+    project_path TEXT,
+    PRIMARY KEY (file_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+class UsageLedgerStore:
+    """UsageLedger 레코드를 SQLite에 증분 저장
+
+    파일 메타데이터는 files, 파싱된 row는 rows 테이블에 (file_id, seq) 순서로
+    보관한다. 뒤에 추가된 row만 INSERT하고 바뀌지 않은 파일은 건드리지 않으므로
+    저장 비용이 전체 ledger 크기가 아니라 변경량에 비례한다.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                if conn.execute("PRAGMA user_version").fetchone()[0] != USAGE_LEDGER_VERSION:
+                    conn.execute("DROP TABLE IF EXISTS rows")
+                    conn.execute("DROP TABLE IF EXISTS files")
+                conn.executescript(LEDGER_SCHEMA)
+                conn.execute(f"PRAGMA user_version = {USAGE_LEDGER_VERSION}")
+                conn.commit()
+            except sqlite3.DatabaseError:
+                conn.close()
+                raise
+            self._conn = conn
+        return self._conn
+
+    def load(self) -> dict[str, LedgerRecord]:
+        """저장된 레코드 전체 로드"""
+        conn = self._connect()
+        records: dict[str, LedgerRecord] = {}
+        by_id: dict[int, LedgerRecord] = {}
+        for (file_id, path, project_name, inode, size, mtime, offset,
+             fingerprint, project_path, earliest) in conn.execute("SELECT * FROM files"):
+            record = LedgerRecord(
+                project_name=project_name,
+                inode=inode,
+                size=size,
+                mtime=mtime,
+                offset=offset,
+                fingerprint=fingerprint,
+                project_path=project_path,
+                earliest_timestamp=earliest,
+            )
+            records[path] = by_id[file_id] = record
+
+        strings: dict[str, str] = {}
+        for (file_id, _, key, ts, input_tokens, output_tokens, cache_creation,
+             cache_read, cost, model, session_id, project_path) in conn.execute(
+                "SELECT * FROM rows ORDER BY file_id, seq"):
+            rows = by_id[file_id].rows
+            rows.hashes.append(key)
+            rows.timestamps.append(ts)
+            rows.input_tokens.append(input_tokens)
+            rows.output_tokens.append(output_tokens)
+            rows.cache_creation_tokens.append(cache_creation)
+            rows.cache_read_tokens.append(cache_read)
+            rows.costs.append(cost)
+            # 같은 문자열은 객체 하나를 공유
+            rows.models.append(strings.setdefault(model, model) if model is not None else None)
+            rows.sessions.append(strings.setdefault(session_id, session_id) if session_id is not None else None)
+            rows.projects.append(strings.setdefault(project_path, project_path) if project_path is not None else None)
+        return records
+
+    def save(self, updated: list[tuple[str, LedgerRecord, int]], removed: list[str]) -> None:
+        """변경된 레코드만 반영
+
+        Args:
+            updated: (경로, 레코드, 이미 저장된 row 수) 목록. row 수가 0이면
+                처음부터 다시 파싱된 파일이므로 기존 row를 지우고 모두 저장한다.
+            removed: 삭제된 파일 경로 목록
+        """
+        conn = self._connect()
+        with conn:
+            for path in removed:
+                conn.execute("DELETE FROM rows WHERE file_id = (SELECT id FROM files WHERE path = ?)", (path,))
+                conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+            for path, record, rows_before in updated:
+                conn.execute(
+                    """
+                    INSERT INTO files (path, project_name, inode, size, mtime, offset,
+                                       fingerprint, project_path, earliest_timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(path) DO UPDATE SET
+                        project_name = excluded.project_name,
+                        inode = excluded.inode,
+                        size = excluded.size,
+                        mtime = excluded.mtime,
+                        offset = excluded.offset,
+                        fingerprint = excluded.fingerprint,
+                        project_path = excluded.project_path,
+                        earliest_timestamp = excluded.earliest_timestamp
+                    """,
+                    (path, record.project_name, record.inode, record.size, record.mtime,
+                     record.offset, record.fingerprint, record.project_path,
+                     record.earliest_timestamp),
+                )
+                file_id = conn.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()[0]
+                if rows_before == 0:
+                    conn.execute("DELETE FROM rows WHERE file_id = ?", (file_id,))
+
+                rows = record.rows
+                conn.executemany(
+                    "INSERT INTO rows VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (file_id, i, rows.hashes[i], rows.timestamps[i], rows.input_tokens[i],
+                         rows.output_tokens[i], rows.cache_creation_tokens[i],
+                         rows.cache_read_tokens[i], rows.costs[i], rows.models[i],
+                         rows.sessions[i], rows.projects[i])
+                        for i in range(rows_before, len(rows))
+                    ),
+                )
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class UsageLedger:
+    """JSONL 파일별 usage 파싱 결과를 보존하는 증분 ledger
+
+    요청마다 모든 파일을 다시 읽는 대신, 파일이 늘어난 경우 추가된 바이트만
+    파싱하고 잘리거나 교체된 경우에만 처음부터 다시 읽는다. 파일별 row를 중복
+    제거하여 병합한 결과는 컬럼형 UsageTable(self.table) 하나에만 보관한다.
+    storage_path가 있으면 바뀐 레코드만 UsageLedgerStore(SQLite)에 증분 저장한다.
+    """
+
+    def __init__(self, storage_path: Optional[Path] = None, workers: Optional[int] = None):
+        self.storage_path = storage_path
+        self.workers = workers if workers is not None else config.USAGE_PARSE_WORKERS
+        self._records: dict[str, LedgerRecord] = {}
+        self._store: Optional[UsageLedgerStore] = None
+        self.table = UsageTable()
+        self._ranks: dict[str, int] = {}
+        self._claims: dict[str, int] = {}
+        self._listeners: list = []
+        self._loaded = False
+        self._merged = False
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener) -> None:
+        """병합 결과를 받을 리스너 등록
+
+        리스너는 rebuild(table)과 extend(new_entries) 메서드를 구현한다.
+        rebuild는 병합된 전체 UsageTable을, extend는 새로 병합된 UsageEntry 목록을 받는다.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+            if self._merged:
+                listener.rebuild(self.table)
+
+    def refresh(self, projects_dir: Path) -> UsageTable:
+        """변경된 파일만 다시 파싱하고 중복 제거된 전체 usage 테이블 반환"""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+
+            if not projects_dir.exists():
+                if self._records:
+                    self._save([], list(self._records))
+                self._records = {}
+                self._rebuild()
+                return self.table
+
+            files = [
+                (jsonl_file, project_dir.name)
+                for project_dir in projects_dir.iterdir() if project_dir.is_dir()
+                for jsonl_file in project_dir.rglob("*.jsonl")
+            ]
+            self._update(files, full=True)
+            return self.table
+
+    def refresh_paths(self, projects_dir: Path, paths: Iterable[Path]) -> UsageTable:
+        """지정한 파일만 stat하여 반영 (변경 피드 이벤트로 바뀐 파일을 알 때)
+
+        아직 전체 병합을 한 번도 하지 않았으면 refresh()로 전체를 읽는다.
+        """
+        if not self._merged:
+            return self.refresh(projects_dir)
+        with self._lock:
+            files = []
+            for path in paths:
+                try:
+                    files.append((path, path.relative_to(projects_dir).parts[0]))
+                except (ValueError, IndexError):
+                    continue
+            self._update(files, full=False)
+            return self.table
+
+    def _update(self, files: list[tuple[Path, str]], full: bool) -> None:
+        """(파일, 프로젝트 이름) 목록을 확인하여 바뀐 부분만 반영
+
+        full이면 files가 전체 목록이므로 없는 레코드는 삭제된 파일로 본다.
+        아니면 files 중 stat할 수 없는 파일만 삭제된 것으로 본다.
+        """
+        changed = False
+        structural = False
+        seen: dict[str, LedgerRecord] = {} if full else dict(self._records)
+        pending: list[tuple[Path, LedgerRecord, os.stat_result]] = []
+        new_keys: set[str] = set()
+
+        for jsonl_file, project_name in files:
+            key = str(jsonl_file)
+            try:
+                stat = jsonl_file.stat()
+            except OSError:
+                seen.pop(key, None)
+                continue
+
+            record = self._records.get(key)
+            if record is None:
+                # 새 파일은 기존 파일보다 뒤 순서이면 뒤에 이어 병합 (아래에서 확인)
+                record = LedgerRecord(project_name=project_name)
+                new_keys.add(key)
+                changed = True
+            elif not self._can_resume(jsonl_file, record, stat):
+                record = LedgerRecord(project_name=project_name)
+                changed = structural = True
+
+            if record.size != stat.st_size or record.mtime != stat.st_mtime:
+                pending.append((jsonl_file, record, stat))
+                changed = True
+
+            seen[key] = record
+
+        before = [(len(record.rows), record.earliest_timestamp) for _, record, _ in pending]
+        self._parse_pending(pending)
+
+        removed = [key for key in self._records if key not in seen]
+        if removed:
+            changed = structural = True
+        # 파일 순서(가장 이른 타임스탬프)가 바뀌면 중복 제거 결과가 달라질 수 있음
+        if any(str(path) not in new_keys and record.earliest_timestamp != earliest
+               for (path, record, _), (_, earliest) in zip(pending, before)):
+            structural = True
+
+        self._records = seen
+        if new_keys and not structural and self._merged:
+            structural = not self._rank_new_files(new_keys)
+        if structural or not self._merged:
+            self._rebuild()
+        elif pending:
+            appended = [
+                (str(path), record, rows_before)
+                for (path, record, _), (rows_before, _) in zip(pending, before)
+            ]
+            if not self._merge_appended(appended):
+                self._rebuild()
+
+        if changed:
+            self._save(
+                [(str(path), record, rows_before)
+                 for (path, record, _), (rows_before, _) in zip(pending, before)],
+                removed,
+            )
+
+    def _rebuild(self) -> None:
+        """파일별 row를 합치고 중복 제거 (가장 이른 타임스탬프의 파일이 우선)"""
+        ordered = sorted(self._records.items(), key=lambda x: x[1].earliest_timestamp or "")
+        self._ranks = {key: rank for rank, (key, _) in enumerate(ordered)}
+        claims: dict[int, int] = {}
+        winners = []
+
+        for rank, (_, record) in enumerate(ordered):
+            rows = record.rows
+            models = rows.models
+            timestamps = rows.timestamps
+            for i, key in enumerate(rows.hashes):
+                if key:
+                    if key in claims:
+                        continue
+                    claims[key] = rank
+                if models[i] is not None:
+                    winners.append((timestamps[i], rank, i))
+
+        # 타임스탬프 순으로 테이블 재생성 (같은 시각은 파일 순서, 파일 내 순서 유지)
+        winners.sort()
+        self._claims = claims
+        self.table.clear()
+        for _, rank, i in winners:
+            self.table.append_row(ordered[rank][1].rows, i)
+        self._merged = True
+
+        for listener in self._listeners:
+            listener.rebuild(self.table)
+
+    def _rank_new_files(self, new_keys: set[str]) -> bool:
+        """새 파일이 모두 기존 파일보다 뒤 순서이면 마지막 순위를 부여
+
+        기존 파일 중 가장 늦은 earliest_timestamp보다 이르면 기존 파일의 중복 제거
+        승자가 바뀔 수 있으므로 False를 반환하여 전체 재병합하게 한다.
+        """
+        latest = max((record.earliest_timestamp or "" for key, record in self._records.items()
+                      if key not in new_keys), default="")
+        new = sorted((self._records[key].earliest_timestamp or "", key) for key in new_keys)
+        if new[0][0] < latest:
+            return False
+        for earliest, key in new:
+            self._ranks[key] = len(self._ranks)
+        return True
+
+    def _merge_appended(self, appended: list[tuple[str, LedgerRecord, int]]) -> bool:
+        """뒤에 추가된 row만 기존 병합 결과에 반영
+
+        새 row가 자신보다 뒤 순서 파일이 선점한 hash와 겹치면 승자가 바뀌므로
+        False를 반환하여 전체 재병합하게 한다.
+        """
+        added = []
+        for path, record, rows_before in sorted(appended, key=lambda x: self._ranks[x[0]]):
+            rank = self._ranks[path]
+            rows = record.rows
+            for i in range(rows_before, len(rows)):
+                key = rows.hashes[i]
+                if key:
+                    owner = self._claims.get(key)
+                    if owner is not None:
+                        if owner > rank:
+                            return False
+                        continue
+                    self._claims[key] = rank
+                entry = rows.entry(i)
+                if entry is not None:
+                    added.append(entry)
+
+        if not added:
+            return True
+
+        added.sort(key=_entry_timestamp_ms)
+        self.table.extend(added)
+
+        for listener in self._listeners:
+            listener.extend(added)
+        return True
+
+    def _parse_pending(self, pending: list[tuple[Path, LedgerRecord, os.stat_result]]) -> None:
+        """변경된 파일 파싱 (분량이 크면 프로세스 풀로 분산)
+
+        중복 제거는 파싱 후 병합 단계에서 파일 순서로 결정되므로
+        워커 완료 순서와 무관하게 결과가 같다.
+        """
+        pending_bytes = sum(stat.st_size - record.offset for _, record, stat in pending)
+        if (self.workers > 1 and len(pending) > 1
+                and pending_bytes >= config.USAGE_PARALLEL_MIN_BYTES):
+            # 큰 파일부터 제출하여 워커 간 부하 균형 유지
+            jobs = sorted(pending, key=lambda x: x[2].st_size - x[1].offset, reverse=True)
+            # 서버 프로세스에는 감시/reconcile 스레드가 있으므로 fork 대신 spawn으로 워커 시작
+            # (다른 스레드가 잡고 있던 잠금을 복제한 워커가 멈추지 않도록)
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs)),
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                futures = [
+                    (record, pool.submit(_parse_usage_job, str(path), LedgerRecord(
+                        project_name=record.project_name,
+                        offset=record.offset,
+                        project_path=record.project_path,
+                        earliest_timestamp=record.earliest_timestamp,
+                    )))
+                    for path, record, _ in jobs
+                ]
+                for record, future in futures:
+                    _apply_usage_job(record, future.result())
+            logger.debug(f"Parsed {len(jobs)} usage files with {self.workers} workers")
+        else:
+            for path, record, _ in pending:
+                parse_usage_tail(path, record)
+
+        for _, record, stat in pending:
+            record.inode = stat.st_ino
+            record.size = stat.st_size
+            record.mtime = stat.st_mtime
+
+    def _can_resume(self, path: Path, record: LedgerRecord, stat: os.stat_result) -> bool:
+        """기존 레코드에 이어서 읽을 수 있는지 확인 (같은 파일이 뒤로만 늘어난 경우)"""
+        if record.inode != stat.st_ino:
+            return False
+        if stat.st_size == record.size:
+            return stat.st_mtime == record.mtime
+        if stat.st_size < record.size:
+            return False
+
+        # 이미 소비한 영역의 끝부분이 그대로인지 확인
+        start = record.offset - len(record.fingerprint)
+        try:
+            with open(path, "rb") as f:
+                f.seek(start)
+                return f.read(len(record.fingerprint)) == record.fingerprint
+        except OSError:
+            return False
+
+    def _load(self) -> None:
+        """디스크에서 ledger 로드"""
+        self._loaded = True
+        if self.storage_path is None:
+            return
+        try:
+            self._store = UsageLedgerStore(self.storage_path)
+            self._records = self._store.load()
+            logger.debug(f"Usage ledger loaded: {len(self._records)} files")
+        except Exception as e:
+            logger.warning(f"Failed to load usage ledger {self.storage_path}: {e}")
+            self._store = None
+            self._records = {}
+
+    def _save(self, updated: list[tuple[str, LedgerRecord, int]], removed: list[str]) -> None:
+        """바뀐 레코드만 디스크에 저장 (새로 추가된 row만 INSERT)"""
+        if self._store is None:
+            return
+        try:
+            self._store.save(updated, removed)
+        except Exception as e:
+            # 실패한 트랜잭션은 롤백되어 디스크에는 직전 상태가 남음. 이후 증분을 이어
+            # 쓰면 빠진 row가 생기므로 이번 프로세스에서는 저장을 멈추고, 재시작 시
+            # 직전 상태의 offset부터 다시 파싱한다.
+            logger.warning(f"Failed to save usage ledger {self.storage_path}: {e}")
+            self._store.close()
+            self._store = None
+
+
+def parse_jsonl_file(path: Path, encoded_project_name: str,
+                     processed_hashes: set) -> list[UsageEntry]:
+    """JSONL 파일에서 usage 엔트리 파싱"""
+    record = LedgerRecord(project_name=encoded_project_name)
+    parse_usage_tail(path, record)
+
+    entries = []
+    for i, key in enumerate(record.rows.hashes):
+        # 중복 제거
+        if key:
+            if key in processed_hashes:
+                continue
+            processed_hashes.add(key)
+        entry = record.rows.entry(i)
+        if entry is not None:
+            entries.append(entry)
+    return entries
+
+
+def get_all_usage_entries(claude_path: Path) -> list[UsageEntry]:
+    """모든 usage 엔트리 가져오기
+
+    파일마다 한 번만 파싱하고, 파싱 중 수집한 가장 이른 타임스탬프로
+    파일 순서를 정해 중복을 제거한다 (먼저 시작된 파일의 엔트리 우선).
+    """
+    return list(UsageLedger().refresh(claude_path / "projects"))
 
 
 class UsageService:
     def __init__(self):
         self.claude_path = Path.home() / ".claude"
+        self.ledger = UsageLedger(USAGE_LEDGER_FILE)
+        self.table = self.ledger.table
+        self.rollup = UsageRollup()
+        self.blocks = UsageBlockTracker(config.USAGE_BLOCK_HOURS)
+        self.feed = UsageDeltaFeed()
+        self.ledger.add_listener(self.rollup)
+        self.ledger.add_listener(self.blocks)
+        self.ledger.add_listener(self.feed)
         logger.debug(f"UsageService initialized with claude_path: {self.claude_path}")
 
     def get_usage_stats(self, days: Optional[int] = None) -> dict:
         """전체 또는 특정 기간의 usage 통계 조회"""
-        all_entries = get_all_usage_entries(self.claude_path)
+        table = self.ledger.refresh(self.claude_path / "projects")
 
-        if not all_entries:
+        if not table:
             return UsageStats().to_dict()
 
-        # days가 지정되면 필터링
+        # days가 지정되면 현재 시각 기준 최근 N일로 필터링
         if days is not None:
-            cutoff = datetime.now() - timedelta(days=days)
-            filtered_entries = []
-            for entry in all_entries:
-                try:
-                    entry_dt = datetime.fromisoformat(entry.timestamp.replace("Z", "+00:00"))
-                    if entry_dt.replace(tzinfo=None) >= cutoff:
-                        filtered_entries.append(entry)
-                except ValueError:
-                    continue
-        else:
-            filtered_entries = all_entries
+            now = parse_timestamp_ms(datetime.now(timezone.utc).isoformat())
+            return self._stats_for_range(now - days * MS_PER_DAY, now)
 
-        return self._calculate_stats(filtered_entries)
+        return self._calculate_stats(self.rollup.query())
 
     def get_usage_by_date_range(self, start_date: str, end_date: str) -> dict:
         """날짜 범위로 usage 통계 조회"""
-        all_entries = get_all_usage_entries(self.claude_path)
+        table = self.ledger.refresh(self.claude_path / "projects")
 
-        if not all_entries:
+        if not table:
             return UsageStats().to_dict()
 
-        # 날짜 파싱
-        try:
-            if "T" in start_date:
-                start = datetime.fromisoformat(start_date.replace("Z", "+00:00")).replace(tzinfo=None)
-            else:
-                start = datetime.strptime(start_date, "%Y-%m-%d")
-        except ValueError:
-            start = datetime.min
+        # 날짜 파싱 (timezone이 없는 입력은 로그 타임스탬프와 같이 UTC로 간주)
+        lo = parse_timestamp_ms(start_date)
+        hi = parse_timestamp_ms(end_date)
+        if lo == NO_TIMESTAMP:
+            lo = NO_TIMESTAMP + 1
+        if hi == NO_TIMESTAMP:
+            hi = 2 ** 63 - 1
+
+        return self._stats_for_range(lo, hi)
+
+    def get_usage_blocks(self, token_limit: Optional[int] = None) -> dict:
+        """현재 과금 블록의 사용량/소진 속도/예상 소진 시각 조회"""
+        self.ledger.refresh(self.claude_path / "projects")
+        now = parse_timestamp_ms(datetime.now(timezone.utc).isoformat())
+        return self.blocks.snapshot(now, token_limit or config.USAGE_BLOCK_TOKEN_LIMIT)
+
+    def start_usage_feed(self) -> None:
+        """usage 증분 수집 시작 (현재까지 병합된 usage는 기준선으로 취급)"""
+        self.ledger.refresh(self.claude_path / "projects")
+        self.feed.start()
+
+    def stop_usage_feed(self) -> None:
+        """usage 증분 수집 중단"""
+        self.feed.stop()
+
+    def poll_usage_delta(self, paths: Optional[Iterable[Path]] = None) -> Optional[dict]:
+        """변경된 로그만 반영한 뒤 마지막 호출 이후 추가된 usage 이벤트 반환
+
+        paths가 주어지면 전체 디렉토리를 스캔하지 않고 그 파일들만 확인한다.
+        """
+        if paths is None:
+            self.ledger.refresh(self.claude_path / "projects")
+        else:
+            self.ledger.refresh_paths(self.claude_path / "projects", paths)
+        return self.feed.drain()
 
-        try:
-            if "T" in end_date:
-                end = datetime.fromisoformat(end_date.replace("Z", "+00:00")).replace(tzinfo=None)
-            else:
-                end = datetime.strptime(end_date, "%Y-%m-%d")
-        except ValueError:
-            end = datetime.max
+    def _stats_for_range(self, lo: int, hi: int) -> dict:
+        """[lo, hi] epoch 밀리초 구간 통계 계산
 
-        # 필터링
-        filtered_entries = []
-        for entry in all_entries:
-            try:
-                entry_dt = datetime.fromisoformat(entry.timestamp.replace("Z", "+00:00")).replace(tzinfo=None)
-                if start <= entry_dt <= end:
-                    filtered_entries.append(entry)
-            except ValueError:
-                continue
+        구간에 온전히 포함되는 UTC 날짜는 rollup 버킷을 합산하고, 경계에 걸친
+        부분 날짜만 정렬된 테이블에서 이진 탐색으로 잘라낸 행을 집계한다.
+        """
+        first_day = -(-lo // MS_PER_DAY)
+        last_day = (hi + 1) // MS_PER_DAY - 1
 
-        return self._calculate_stats(filtered_entries)
+        if first_day > last_day:
+            return self._calculate_stats(self.table.buckets(self.table.row_range(lo, hi)))
 
-    def _calculate_stats(self, entries: list[UsageEntry]) -> dict:
-        """엔트리에서 통계 계산"""
-        if not entries:
-            return UsageStats().to_dict()
+        buckets = self.rollup.query(first_day, last_day)
+        buckets += self.table.buckets(self.table.row_range(lo, first_day * MS_PER_DAY - 1))
+        buckets += self.table.buckets(self.table.row_range((last_day + 1) * MS_PER_DAY, hi))
+        return self._calculate_stats(buckets)
 
-        total_cost = 0.0
-        total_input_tokens = 0
-        total_output_tokens = 0
-        total_cache_creation = 0
-        total_cache_read = 0
+    def _calculate_stats(self, buckets: list[RollupBucket]) -> dict:
+        """버킷에서 통계 계산 (첫 사용 시각 순으로 합산하여 정렬 결과 유지)"""
+        builder = _StatsBuilder()
+        for bucket in sorted(buckets, key=lambda b: b.first_timestamp):
+            builder.add_bucket(bucket)
+        return builder.to_dict()
 
-        model_stats: dict[str, ModelUsage] = {}
-        daily_stats: dict[str, DailyUsage] = {}
-        project_stats: dict[str, ProjectUsage] = {}
 
-        for entry in entries:
-            # 총계 업데이트
-            total_cost += entry.cost
-            total_input_tokens += entry.input_tokens
-            total_output_tokens += entry.output_tokens
-            total_cache_creation += entry.cache_creation_tokens
-            total_cache_read += entry.cache_read_tokens
-
-            # 모델별 통계
-            if entry.model not in model_stats:
-                model_stats[entry.model] = ModelUsage(model=entry.model)
-            ms = model_stats[entry.model]
-            ms.total_cost += entry.cost
-            ms.input_tokens += entry.input_tokens
-            ms.output_tokens += entry.output_tokens
-            ms.cache_creation_tokens += entry.cache_creation_tokens
-            ms.cache_read_tokens += entry.cache_read_tokens
-            ms.total_tokens = ms.input_tokens + ms.output_tokens
-            ms.session_count += 1
-
-            # 일별 통계
-            date = entry.timestamp.split("T")[0] if "T" in entry.timestamp else entry.timestamp
-            if date not in daily_stats:
-                daily_stats[date] = DailyUsage(date=date)
-            ds = daily_stats[date]
-            ds.total_cost += entry.cost
-            ds.total_tokens += (entry.input_tokens + entry.output_tokens +
-                                entry.cache_creation_tokens + entry.cache_read_tokens)
-            if entry.model not in ds.models_used:
-                ds.models_used.append(entry.model)
-
-            # 프로젝트별 통계
-            if entry.project_path not in project_stats:
-                project_name = entry.project_path.split("/")[-1] if "/" in entry.project_path else entry.project_path
-                project_stats[entry.project_path] = ProjectUsage(
-                    project_path=entry.project_path,
-                    project_name=project_name,
-                )
-            ps = project_stats[entry.project_path]
-            ps.total_cost += entry.cost
-            ps.total_tokens += (entry.input_tokens + entry.output_tokens +
-                                entry.cache_creation_tokens + entry.cache_read_tokens)
-            ps.session_count += 1
-            if entry.timestamp > ps.last_used:
-                ps.last_used = entry.timestamp
+class _StatsBuilder:
+    """rollup 버킷을 누적하여 UsageStats 생성"""
+
+    def __init__(self):
+        self.total_cost = 0.0
+        self.total_input_tokens = 0
+        self.total_output_tokens = 0
+        self.total_cache_creation = 0
+        self.total_cache_read = 0
+        self.count = 0
+        self.model_stats: dict[str, ModelUsage] = {}
+        self.daily_stats: dict[str, DailyUsage] = {}
+        self.project_stats: dict[str, ProjectUsage] = {}
+
+    def add_bucket(self, bucket: RollupBucket) -> None:
+        self.add(
+            bucket.model, bucket.date, bucket.project_path,
+            bucket.total_cost, bucket.input_tokens, bucket.output_tokens,
+            bucket.cache_creation_tokens, bucket.cache_read_tokens,
+            bucket.count, bucket.last_timestamp,
+        )
+
+    def add(self, model: str, date: str, project_path: str, cost: float,
+            input_tokens: int, output_tokens: int, cache_creation: int,
+            cache_read: int, count: int, last_timestamp: str) -> None:
+        all_tokens = input_tokens + output_tokens + cache_creation + cache_read
+
+        # 총계 업데이트
+        self.total_cost += cost
+        self.total_input_tokens += input_tokens
+        self.total_output_tokens += output_tokens
+        self.total_cache_creation += cache_creation
+        self.total_cache_read += cache_read
+        self.count += count
+
+        # 모델별 통계
+        if model not in self.model_stats:
+            self.model_stats[model] = ModelUsage(model=model)
+        ms = self.model_stats[model]
+        ms.total_cost += cost
+        ms.input_tokens += input_tokens
+        ms.output_tokens += output_tokens
+        ms.cache_creation_tokens += cache_creation
+        ms.cache_read_tokens += cache_read
+        ms.total_tokens = ms.input_tokens + ms.output_tokens
+        ms.session_count += count
+
+        # 일별 통계
+        if date not in self.daily_stats:
+            self.daily_stats[date] = DailyUsage(date=date)
+        ds = self.daily_stats[date]
+        ds.total_cost += cost
+        ds.total_tokens += all_tokens
+        if model not in ds.models_used:
+            ds.models_used.append(model)
+
+        # 프로젝트별 통계
+        if project_path not in self.project_stats:
+            project_name = project_path.split("/")[-1] if "/" in project_path else project_path
+            self.project_stats[project_path] = ProjectUsage(
+                project_path=project_path,
+                project_name=project_name,
+            )
+        ps = self.project_stats[project_path]
+        ps.total_cost += cost
+        ps.total_tokens += all_tokens
+        ps.session_count += count
+        if last_timestamp > ps.last_used:
+            ps.last_used = last_timestamp
+
+    def to_dict(self) -> dict:
+        if not self.count:
+            return UsageStats().to_dict()
 
-        total_tokens = total_input_tokens + total_output_tokens + total_cache_creation + total_cache_read
+        total_tokens = (self.total_input_tokens + self.total_output_tokens +
+                        self.total_cache_creation + self.total_cache_read)
 
         # 정렬
-        by_model = sorted(model_stats.values(), key=lambda x: x.total_cost, reverse=True)
-        by_date = sorted(daily_stats.values(), key=lambda x: x.date, reverse=True)
-        by_project = sorted(project_stats.values(), key=lambda x: x.total_cost, reverse=True)
+        by_model = sorted(self.model_stats.values(), key=lambda x: x.total_cost, reverse=True)
+        by_date = sorted(self.daily_stats.values(), key=lambda x: x.date, reverse=True)
+        by_project = sorted(self.project_stats.values(), key=lambda x: x.total_cost, reverse=True)
 
         stats = UsageStats(
-            total_cost=total_cost,
+            total_cost=self.total_cost,
             total_tokens=total_tokens,
-            total_input_tokens=total_input_tokens,
-            total_output_tokens=total_output_tokens,
-            total_cache_creation_tokens=total_cache_creation,
-            total_cache_read_tokens=total_cache_read,
-            total_sessions=len(entries),
+            total_input_tokens=self.total_input_tokens,
+            total_output_tokens=self.total_output_tokens,
+            total_cache_creation_tokens=self.total_cache_creation,
+            total_cache_read_tokens=self.total_cache_read,
+            total_sessions=self.count,
             by_model=by_model,
             by_date=by_date,
             by_project=by_project,
@@ -1,17 +1,100 @@
 import logging
+import os
 from pathlib import Path
 import asyncio
 from config import config
 from services.parser import MessageParser
+from services.locator import session_locator
+from services.change_feed import RESYNC
 
 logger = logging.getLogger(__name__)
 
 
+class ChangeWaiter:
+    """프로젝트 디렉토리의 변경을 기다리는 tailer용 대기 객체
+
+    이벤트 모드에서는 locator의 파일시스템 감시가 알려줄 때까지(최대
+    WATCH_EVENT_TIMEOUT) 기다리고, 감시를 쓸 수 없거나 폴링 모드이면
+    WATCH_INTERVAL마다 깨어난다.
+    """
+
+    def __init__(self, locator, directory: Path):
+        self.locator = locator
+        self.directory = directory
+        self._event = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._events = config.WATCH_MODE == "events"
+        if self._events:
+            locator.add_listener(directory, self._notify)
+
+    def _notify(self) -> None:
+        # 감시 스레드에서 호출되므로 이벤트 루프로 넘겨서 설정
+        self._loop.call_soon_threadsafe(self._event.set)
+
+    async def wait(self) -> None:
+        if not self._events or not self.locator.watching():
+            await asyncio.sleep(config.WATCH_INTERVAL)
+            return
+        try:
+            await asyncio.wait_for(self._event.wait(), config.WATCH_EVENT_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        # 파일을 읽기 전에 지워야 읽는 동안 생긴 변경을 놓치지 않음
+        self._event.clear()
+
+    def close(self) -> None:
+        if self._events:
+            self.locator.remove_listener(self.directory, self._notify)
+
+
+class FileTailer:
+    """파일 끝에 추가된 완성된 라인만 읽는 바이너리 tailer
+
+    위치는 바이트 단위로 관리하며, 줄바꿈까지 쓰이지 않은 마지막 라인은 버퍼에
+    남겨 두었다가 나머지가 쓰이면 합쳐서 반환한다. UTF-8 디코딩은 완성된 라인에만
+    하므로 멀티바이트 문자가 중간에 잘려도 깨지지 않는다. 파일이 읽은 위치보다
+    짧아지면(재작성) 새 끝에서 다시 시작한다.
+    """
+
+    def __init__(self, path: Path, pos: int = 0):
+        self.path = path
+        self.pos = pos  # 완성된 라인까지 처리한 바이트 위치
+        self._carry = b""  # pos 이후의 미완성 라인
+
+    @classmethod
+    def at_end(cls, path: Path) -> "FileTailer":
+        """현재 파일 끝부터 읽는 tailer"""
+        return cls(path, path.stat().st_size)
+
+    def read_lines(self) -> list[str]:
+        """마지막 호출 이후 완성된 라인 (파일이 없으면 FileNotFoundError)"""
+        read_pos = self.pos + len(self._carry)
+        size = os.stat(self.path).st_size
+        if size == read_pos:
+            return []
+        if size < read_pos:
+            self.pos, self._carry = size, b""
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(read_pos)
+            data = self._carry + f.read(size - read_pos)
+
+        end = data.rfind(b"\n") + 1
+        self._carry = data[end:]
+        self.pos += end
+        return [line.decode("utf-8", errors="replace") for line in data[:end].split(b"\n")[:-1]]
+
+
 class WatcherService:
     def __init__(self):
         self.claude_dir = config.CLAUDE_DIR
         self.projects_dir = config.PROJECTS_DIR
         self.parser = MessageParser()
+        self.locator = session_locator
+        # 채널(usage 또는 세션)별 구독 콜백과 공유 감시 태스크
+        self._channels: dict[str, list] = {}
+        self._channel_tasks: dict[str, asyncio.Task] = {}
         logger.debug(f"WatcherService initialized. Projects dir: {self.projects_dir}")
 
     async def watch_session(self, session_id: str, callback):
@@ -21,28 +104,26 @@ class WatcherService:
         if not file_path:
             return
 
-        pos = file_path.stat().st_size  # 현재 끝부터 시작
+        tailer = FileTailer.at_end(file_path)  # 현재 끝부터 시작
+        waiter = ChangeWaiter(self.locator, file_path.parent)
 
-        while True:
-            try:
-                current_size = file_path.stat().st_size
-                if current_size > pos:
-                    with open(file_path, "r") as f:
-                        f.seek(pos)
-                        new_lines = f.readlines()
-                        for line in new_lines:
-                            parsed = self.parser.parse_line(line)
-                            if parsed:
-                                await callback(parsed)
-                        pos = f.tell()
-
-                await asyncio.sleep(config.WATCH_INTERVAL)
-            except FileNotFoundError:
-                # 파일이 삭제된 경우
-                break
-            except Exception as e:
-                logger.error(f"Watch error: {e}")
-                await asyncio.sleep(1)
+        try:
+            while True:
+                try:
+                    for line in tailer.read_lines():
+                        parsed = self.parser.parse_line(line)
+                        if parsed:
+                            await callback(parsed)
+
+                    await waiter.wait()
+                except FileNotFoundError:
+                    # 파일이 삭제된 경우
+                    break
+                except Exception as e:
+                    logger.error(f"Watch error: {e}")
+                    await asyncio.sleep(1)
+        finally:
+            waiter.close()
 
     async def watch_agents(self, session_id: str, callback):
         """세션에 연결된 에이전트 파일들을 감시"""
@@ -50,63 +131,166 @@ class WatcherService:
         if not session_file:
             return
 
-        project_dir = session_file.parent
-        agent_positions = {}  # agent_id -> file position
-
-        while True:
+        # 이미 있던 에이전트는 현재 끝부터 (이전 내용은 에이전트 히스토리 API로 조회)
+        agent_tailers: dict[str, FileTailer] = {}
+        for agent_id, agent_file in self.locator.agents(session_id).items():
             try:
-                # 이 세션에 연결된 에이전트 파일들 찾기
-                for agent_file in project_dir.glob("agent-*.jsonl"):
-                    try:
-                        with open(agent_file, "r") as f:
-                            first_line = f.readline()
-                            if not first_line:
-                                continue
-
-                            import json
-                            first_data = json.loads(first_line)
-                            if first_data.get("sessionId") != session_id:
-                                continue
+                agent_tailers[agent_id] = FileTailer.at_end(agent_file)
+            except OSError:
+                continue
 
-                            agent_id = first_data.get("agentId", agent_file.stem.replace("agent-", ""))
+        waiter = ChangeWaiter(self.locator, session_file.parent)
 
-                            # 새 에이전트인 경우 초기화
-                            if agent_id not in agent_positions:
-                                agent_positions[agent_id] = 0
+        try:
+            while True:
+                try:
+                    # 에이전트 → 세션 매핑은 새 에이전트 파일이 생길 때만 갱신됨
+                    for agent_id, agent_file in self.locator.agents(session_id).items():
+                        try:
+                            # 새 에이전트인 경우 처음부터 전송
+                            if agent_id not in agent_tailers:
+                                agent_tailers[agent_id] = FileTailer(agent_file)
                                 await callback({
                                     "type": "agent_new",
                                     "agent_id": agent_id,
                                 })
 
-                            # 파일 변경 확인
-                            current_size = agent_file.stat().st_size
-                            if current_size > agent_positions[agent_id]:
-                                f.seek(agent_positions[agent_id])
-                                new_lines = f.readlines()
-                                for line in new_lines:
-                                    parsed = self.parser.parse_line(line)
-                                    if parsed:
-                                        await callback({
-                                            "type": "agent_message",
-                                            "agent_id": agent_id,
-                                            "message": parsed,
-                                        })
-                                agent_positions[agent_id] = f.tell()
-
-                    except (json.JSONDecodeError, IOError):
-                        continue
-
-                await asyncio.sleep(config.WATCH_INTERVAL)
-            except Exception as e:
-                logger.error(f"Agent watch error: {e}")
-                await asyncio.sleep(1)
+                            for line in agent_tailers[agent_id].read_lines():
+                                parsed = self.parser.parse_line(line)
+                                if parsed:
+                                    await callback({
+                                        "type": "agent_message",
+                                        "agent_id": agent_id,
+                                        "message": parsed,
+                                    })
+
+                        except IOError:
+                            continue
+
+                    await waiter.wait()
+                except Exception as e:
+                    logger.error(f"Agent watch error: {e}")
+                    await asyncio.sleep(1)
+        finally:
+            waiter.close()
+
+    async def subscribe_session(self, session_id: str, callback):
+        """세션과 에이전트의 새 메시지를 구독
+
+        세션마다 watch_session/watch_agents 감시 태스크 하나만 실행되어 새 라인을
+        한 번만 파싱하고 모든 구독자에게 나눠 보낸다. 첫 구독자가 들어오면 시작하고
+        마지막 구독자가 빠지면 종료된다.
+        """
+        channel = f"session:{session_id}"
+
+        async def tail():
+            fan_out = self._fan_out(channel)
+            await asyncio.gather(
+                self.watch_session(session_id, fan_out),
+                self.watch_agents(session_id, fan_out),
+            )
+
+        await self._subscribe(channel, callback, tail)
+
+    async def watch_usage(self, usage_service, callback):
+        """모든 세션의 usage 증분을 감시
+
+        감시 태스크는 구독자 수와 무관하게 하나만 실행되며, 파싱 결과를
+        모든 구독자에게 나눠 보낸다. 마지막 구독자가 빠지면 태스크도 종료된다.
+        """
+        await self._subscribe("usage", callback, lambda: self._poll_usage(usage_service))
+
+    async def _subscribe(self, channel: str, callback, start):
+        """채널 구독 (취소될 때까지 대기, 채널당 감시 태스크는 start()로 하나만 생성)"""
+        callbacks = self._channels.setdefault(channel, [])
+        callbacks.append(callback)
+        task = self._channel_tasks.get(channel)
+        if task is None or task.done():
+            self._channel_tasks[channel] = asyncio.create_task(start())
+
+        try:
+            await asyncio.Event().wait()
+        finally:
+            callbacks.remove(callback)
+            if not callbacks:
+                del self._channels[channel]
+                task = self._channel_tasks.pop(channel, None)
+                if task is not None:
+                    task.cancel()
+
+    def _fan_out(self, channel: str):
+        """채널의 모든 구독자에게 이벤트를 보내는 콜백"""
+        async def send(event):
+            for callback in list(self._channels.get(channel, [])):
+                try:
+                    await callback(event)
+                except Exception as e:
+                    logger.debug(f"Watch callback error ({channel}): {e}")
+        return send
+
+    async def _poll_usage(self, usage_service):
+        """변경된 usage 로그를 반영하고 새 usage 이벤트를 구독자에게 전달
+
+        locator의 변경 피드가 동작 중이면 생성/추가/삭제 이벤트가 온 파일만 ledger에
+        반영하고, 전체 재스캔은 RESYNC 이벤트나 config.USAGE_FEED_RESCAN_INTERVAL마다만
+        한다. 피드가 없으면 config.USAGE_WATCH_INTERVAL마다 전체를 확인한다.
+        첫 구독자가 들어와 태스크가 시작될 때 수집을 시작하고, 태스크가 끝나면
+        (마지막 구독자가 빠지면) 수집을 멈춘다.
+        """
+        fan_out = self._fan_out("usage")
+        feed = self.locator.feed
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+        changed: set[Path] = set()
+        rescan = False
+
+        def queue_changes(events):
+            nonlocal rescan
+            for event in events:
+                if event.kind == RESYNC:
+                    rescan = True
+                else:
+                    changed.add(event.path)
+            wake.set()
+
+        def on_changes(events):
+            # 감시 스레드에서 호출되므로 이벤트 루프로 넘겨서 반영
+            loop.call_soon_threadsafe(queue_changes, events)
+
+        if feed is not None:
+            feed.subscribe(on_changes)
+        try:
+            # 파일 파싱은 이벤트 루프를 막지 않도록 스레드에서 실행
+            await asyncio.to_thread(self.locator.start)
+            await asyncio.to_thread(usage_service.start_usage_feed)
+            while True:
+                try:
+                    active = feed is not None and feed.active
+                    try:
+                        await asyncio.wait_for(
+                            wake.wait(),
+                            config.USAGE_FEED_RESCAN_INTERVAL if active else config.USAGE_WATCH_INTERVAL,
+                        )
+                    except asyncio.TimeoutError:
+                        rescan = True
+                    wake.clear()
+
+                    paths = None if rescan or not active else sorted(changed)
+                    changed.clear()
+                    rescan = False
+                    event = await asyncio.to_thread(usage_service.poll_usage_delta, paths)
+                    if event:
+                        await fan_out(event)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Usage watch error: {e}")
+                    await asyncio.sleep(1)
+        finally:
+            if feed is not None:
+                feed.unsubscribe(on_changes)
+            usage_service.stop_usage_feed()
 
     def _find_session_file(self, session_id: str) -> Path | None:
-        """세션 ID로 파일 경로 찾기"""
-        for project_dir in self.projects_dir.iterdir():
-            if not project_dir.is_dir():
-                continue
-            for session_file in project_dir.glob("*.jsonl"):
-                if session_id in session_file.name:
-                    return session_file
-        return None
+        """세션 ID로 파일 경로 찾기 (전역 색인)"""
+        return self.locator.find(session_id)
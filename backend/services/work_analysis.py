@@ -7,7 +7,6 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
-from config import config
 from models.work_analysis import WorkAnalysis, WorkAnalysisListItem, WorkAnalysisRequest
 from services.common import (
     CHUNK_SIZE_BYTES,
@@ -20,6 +19,7 @@ from services.common import (
     parse_stream_event,
 )
 from services.common.utils import clean_content
+from services.catalog import session_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -136,36 +136,21 @@ class WorkAnalysisService:
         from_dt = self._parse_date(date_from)
         to_dt = self._parse_date(date_to).replace(hour=23, minute=59, second=59)
 
-        sessions = []
-
-        for project_dir in config.PROJECTS_DIR.iterdir():
-            if not project_dir.is_dir():
-                continue
-
-            project_id = project_dir.name
-
-            # 프로젝트 필터
-            if project_ids and project_id not in project_ids:
-                continue
-
-            for session_file in project_dir.glob("*.jsonl"):
-                try:
-                    mtime = datetime.fromtimestamp(session_file.stat().st_mtime)
-                    if from_dt <= mtime <= to_dt:
-                        sessions.append({
-                            "project_id": project_id,
-                            "project_name": get_project_name(project_id),
-                            "session_id": session_file.stem,
-                            "session_file": session_file,
-                            "updated_at": mtime,
-                        })
-                except (OSError, IOError) as e:
-                    logger.error(f"Failed to check session file {session_file}: {e}")
-                    continue
-
-        # 시간순 정렬
-        sessions.sort(key=lambda x: x["updated_at"])
-        return sessions
+        # 카탈로그 mtime 인덱스로 조회 (수정 시각 오름차순)
+        rows = session_catalog.sessions_in_range(
+            from_dt.timestamp(), to_dt.timestamp(), project_ids
+        )
+        return [
+            {
+                "project_id": row["project_id"],
+                "project_name": get_project_name(row["project_id"]),
+                "session_id": row["session_id"],
+                "session_file": Path(row["path"]),
+                "size": row["size"],
+                "updated_at": datetime.fromtimestamp(row["mtime"]),
+            }
+            for row in rows
+        ]
 
     def get_sessions_by_date_range(
         self, date_from: str, date_to: str, project_ids: list[str] | None = None
@@ -187,8 +172,8 @@ class WorkAnalysisService:
                 "id": session["session_id"],
                 "project_id": pid,
                 "filename": f"{session['session_id']}.jsonl",
-                "size": session["session_file"].stat().st_size,
-                "size_human": format_size(session["session_file"].stat().st_size),
+                "size": session["size"],
+                "size_human": format_size(session["size"]),
                 "updated_at": session["updated_at"].isoformat(),
                 "is_agent": False,
             })
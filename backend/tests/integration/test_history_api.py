@@ -0,0 +1,90 @@
+"""세션 히스토리 API 통합 테스트"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from config import config
+from main import app
+from api.routes import session_service
+from services.catalog import SessionCatalog
+from services.locator import SessionLocator
+from services.offset_index import OffsetIndexStore
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """임시 세션 파일을 읽는 테스트 클라이언트"""
+    project = tmp_path / "projects" / "-work-app"
+    project.mkdir(parents=True)
+    (project / "s1.jsonl").write_text("".join(
+        json.dumps({"type": "user", "message": {"content": f"message {i}"}}) + "\n"
+        for i in range(5)
+    ))
+    (project / "agent-a1.jsonl").write_text("".join(
+        json.dumps({"type": "user", "sessionId": "s1", "agentId": "a1",
+                    "message": {"content": f"agent step {i}"}}) + "\n"
+        for i in range(3)
+    ) + json.dumps({"type": "assistant", "message": {"content": [
+        {"type": "tool_use", "name": "Read", "id": "toolu_1", "input": {}},
+    ]}}) + "\n")
+    monkeypatch.setattr(config, "CATALOG_RECONCILE_INTERVAL", 0)
+    catalog = SessionCatalog(tmp_path / "catalog.db", tmp_path / "projects")
+    monkeypatch.setattr(session_service, "catalog", catalog)
+    monkeypatch.setattr(session_service, "locator", SessionLocator(tmp_path / "projects", watch=False))
+    monkeypatch.setattr(session_service, "offset_indexes", OffsetIndexStore(catalog))
+    yield TestClient(app)
+    catalog.close()
+
+
+class TestHistoryAPI:
+    """히스토리 커서 API 테스트"""
+
+    def test_cursor_headers(self, client):
+        response = client.get("/api/sessions/s1/history?limit=2")
+        assert response.status_code == 200
+        assert [m["content"] for m in response.json()] == ["message 3", "message 4"]
+
+        before = response.headers["X-Prev-Cursor"]
+        older = client.get(f"/api/sessions/s1/history?limit=2&before={before}")
+        assert [m["content"] for m in older.json()] == ["message 1", "message 2"]
+
+    def test_start_with_total_count(self, client):
+        response = client.get("/api/sessions/s1/history?limit=2&start=1")
+        assert [m["content"] for m in response.json()] == ["message 1", "message 2"]
+        assert response.headers["X-Total-Count"] == "5"
+
+    def test_invalid_cursor_rejected(self, client):
+        response = client.get("/api/sessions/s1/history?before=bogus")
+        assert response.status_code == 400
+
+
+class TestAgentAPI:
+    """에이전트 요약/히스토리 API 테스트"""
+
+    def test_agents_return_summaries(self, client):
+        agents = client.get("/api/sessions/s1/agents").json()
+        assert len(agents) == 1
+        agent = agents[0]
+        assert agent["agent_id"] == "a1"
+        assert agent["message_count"] == 4
+        assert agent["tool_calls"] == {"Read": 1}
+        assert "messages" not in agent
+
+    def test_agent_history_pages(self, client):
+        response = client.get("/api/sessions/s1/agents/a1/history?limit=2&start=0")
+        assert [m["content"] for m in response.json()] == ["agent step 0", "agent step 1"]
+        assert response.headers["X-Total-Count"] == "4"
+
+        after = response.headers["X-Next-Cursor"]
+        newer = client.get(f"/api/sessions/s1/agents/a1/history?limit=1&after={after}")
+        assert [m["content"] for m in newer.json()] == ["agent step 2"]
+
+    def test_unknown_agent_not_found(self, client):
+        assert client.get("/api/sessions/s1/agents/zz/history").status_code == 404
@@ -0,0 +1,63 @@
+"""세션 검색 API 통합 테스트"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from config import config
+from main import app
+from api.routes import session_service
+from services.catalog import SessionCatalog
+from services.locator import SessionLocator
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """임시 카탈로그로 검색하는 테스트 클라이언트"""
+    monkeypatch.setattr(config, "CATALOG_RECONCILE_INTERVAL", 0)
+    project = tmp_path / "projects" / "-work-app"
+    project.mkdir(parents=True)
+    (project / "s1.jsonl").write_text("".join(
+        json.dumps({"type": "user", "message": {"content": text}}) + "\n"
+        for text in ["hello", "where is the flaky test", "fixed the flaky test"]
+    ))
+    catalog = SessionCatalog(tmp_path / "catalog.db", tmp_path / "projects")
+    catalog.reconcile()
+    monkeypatch.setattr(session_service, "catalog", catalog)
+    monkeypatch.setattr(session_service, "locator", SessionLocator(tmp_path / "projects", watch=False))
+    yield TestClient(app)
+    catalog.close()
+
+
+class TestSearchAPI:
+    """검색 결과 스니펫/스트리밍 테스트"""
+
+    def test_hits_link_to_history(self, client):
+        results = client.get("/api/sessions/search?q=flaky").json()
+        assert [r["session_id"] for r in results] == ["s1"]
+
+        hits = results[0]["hits"]
+        assert len(hits) == 2
+        assert {hit["snippet"] for hit in hits} == {"where is the flaky test", "fixed the flaky test"}
+        for hit in hits:
+            start, end = hit["highlights"][0]
+            assert hit["snippet"][start:end] == "flaky"
+
+            # 커서로 일치한 메시지부터 히스토리 조회
+            history = client.get(f"/api/sessions/s1/history?limit=1&after={hit['cursor']}").json()
+            assert history[0]["content"] == hit["snippet"]
+
+    def test_stream_ndjson(self, client):
+        response = client.get("/api/sessions/search?q=flaky&stream=true")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["session_id"] for line in lines] == ["s1"]
+        assert lines[0]["hits"]
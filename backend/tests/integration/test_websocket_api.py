@@ -0,0 +1,77 @@
+"""세션 WebSocket 통합 테스트"""
+
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from config import config
+from main import app
+from api.websocket import watcher_service
+from services.locator import SessionLocator
+
+
+def user_lines(count, start=0):
+    return "".join(
+        json.dumps({"type": "user", "message": {"content": f"message {i}"}}) + "\n"
+        for i in range(start, start + count)
+    )
+
+
+@pytest.fixture
+def session_file(tmp_path, monkeypatch):
+    project = tmp_path / "projects" / "-work-app"
+    project.mkdir(parents=True)
+    path = project / "s1.jsonl"
+    path.write_text(user_lines(1))
+    monkeypatch.setattr(config, "WATCH_INTERVAL", 0.01)
+    monkeypatch.setattr(watcher_service, "locator", SessionLocator(tmp_path / "projects", watch=False))
+    return path
+
+
+def append_after_tailer_started(websocket, path, text):
+    """ping/pong으로 엔드포인트가 동작 중인지 확인하고 tailer가 끝 위치를 잡은 뒤 추가"""
+    websocket.send_text("ping")
+    assert websocket.receive_text() == "pong"
+    time.sleep(0.2)
+    with open(path, "a") as f:
+        f.write(text)
+
+
+class TestSessionWebSocket:
+    """세션 WebSocket 프레임 테스트"""
+
+    def test_one_frame_per_message_by_default(self, session_file):
+        with TestClient(app).websocket_connect("/ws/s1") as websocket:
+            append_after_tailer_started(websocket, session_file, user_lines(3, start=1))
+            frames = [websocket.receive_json() for _ in range(3)]
+
+        assert [frame["content"] for frame in frames] == ["message 1", "message 2", "message 3"]
+
+    def test_batched_frames(self, session_file):
+        """배치 모드에서는 한 번에 추가된 메시지를 최대 batch_max개씩 배열 프레임으로 전송"""
+        with TestClient(app).websocket_connect("/ws/s1?batch=true&batch_ms=50&batch_max=100") as websocket:
+            append_after_tailer_started(websocket, session_file, user_lines(150, start=1))
+            frames = [websocket.receive_json() for _ in range(2)]
+
+        assert [len(frame) for frame in frames] == [100, 50]
+        contents = [message["content"] for frame in frames for message in frame]
+        assert contents == [f"message {i}" for i in range(1, 151)]
+
+    def test_stats_expose_queue_counters(self, session_file):
+        client = TestClient(app)
+        with client.websocket_connect("/ws/s1") as websocket:
+            append_after_tailer_started(websocket, session_file, user_lines(1, start=1))
+            websocket.receive_json()
+
+            stats = client.get("/api/ws/stats").json()
+            connection = next(c for c in stats["connections"] if c["channel"] == "s1")
+            assert connection["sent"] == 1
+            assert connection["queue_depth"] == 0
+            assert {"total_dropped", "total_collapsed", "total_evicted"} <= stats.keys()
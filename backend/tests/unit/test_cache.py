@@ -145,6 +145,31 @@ class TestCacheManager:
         assert stats[0].hits == 0
         assert stats[0].misses == 0
 
+    def test_delete_prefix(self):
+        """접두사가 같은 키만 삭제"""
+        self.manager.create_cache("test", maxsize=10, ttl=60)
+        self.manager.set("test", "meta:/a.jsonl:1:10", 1)
+        self.manager.set("test", "meta:/a.jsonl:1:20", 2)
+        self.manager.set("test", "meta:/ab.jsonl:1:10", 3)
+
+        assert self.manager.delete_prefix("test", "meta:/a.jsonl:") == 2
+        assert self.manager.get("test", "meta:/ab.jsonl:1:10") == 3
+        assert self.manager.delete_prefix("nonexistent", "meta:") == 0
+
+    def test_set_ttl(self):
+        """TTL 변경 후 None으로 생성 시 TTL 복원"""
+        self.manager.create_cache("test", maxsize=10, ttl=60)
+        self.manager.set("test", "key1", "value1")
+
+        self.manager.set_ttl("test", 600)
+        assert self.manager.get_stats("test")[0].ttl == 600
+        assert self.manager.get_cache("test").ttl == 600
+        assert self.manager.get("test", "key1") is None
+
+        self.manager.set_ttl("test")
+        assert self.manager.get_stats("test")[0].ttl == 60
+        assert self.manager.get_cache("test").maxsize == 10
+
 
 class TestCacheStats:
     """CacheStats 데이터클래스 테스트"""
@@ -0,0 +1,518 @@
+"""세션 카탈로그 단위 테스트"""
+
+import json
+import os
+import time
+
+import pytest
+
+import services.catalog as catalog_module
+from config import config
+from services.cache import cache_manager, CACHE_SESSIONS, CACHE_METADATA
+from services.change_feed import ChangeEvent, SESSION_APPENDED, SESSION_CREATED, SESSION_DELETED
+from services.catalog import (
+    SessionCatalog, build_match_query, parse_query, highlight_spans, make_snippet,
+)
+from services.locator import SessionLocator
+from services.session import SessionService, invalidate_sessions
+
+
+def write_session(path, lines, mtime=None):
+    """JSONL 세션 파일 작성 (mtime 지정 가능)"""
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def user_line(text, timestamp="2025-01-01T00:00:00.000Z", session_id="s1"):
+    return {"type": "user", "sessionId": session_id, "timestamp": timestamp,
+            "message": {"role": "user", "content": text}}
+
+
+def assistant_line(text, timestamp="2025-01-01T00:00:30.000Z"):
+    return {"type": "assistant", "timestamp": timestamp,
+            "message": {"content": [{"type": "text", "text": text}]}}
+
+
+def append_lines(path, lines):
+    with open(path, "a") as f:
+        f.write("".join(json.dumps(line) + "\n" for line in lines))
+
+
+def message_hits(catalog, query, project_id=None):
+    return [
+        (os.path.basename(row["path"]), row["offset"])
+        for row in catalog.search_messages(build_match_query(query), project_id)
+    ]
+
+
+def tool_line(name, tool_id="toolu_abcdefg123", timestamp="2025-01-01T00:01:00.000Z"):
+    return {"type": "assistant", "timestamp": timestamp,
+            "message": {"content": [{"type": "tool_use", "name": name, "id": tool_id, "input": {}}]}}
+
+
+@pytest.fixture(autouse=True)
+def no_background_reconcile(monkeypatch):
+    monkeypatch.setattr(config, "CATALOG_RECONCILE_INTERVAL", 0)
+
+
+@pytest.fixture
+def projects_dir(tmp_path):
+    """프로젝트 두 개가 있는 임시 projects 디렉토리"""
+    projects = tmp_path / "projects"
+    (projects / "-work-app").mkdir(parents=True)
+    (projects / "-work-lib").mkdir(parents=True)
+    return projects
+
+
+@pytest.fixture
+def catalog(tmp_path, projects_dir):
+    catalog = SessionCatalog(tmp_path / "catalog.db", projects_dir)
+    yield catalog
+    catalog.close()
+
+
+class TestSessionCatalog:
+    """카탈로그 동기화 및 조회 테스트"""
+
+    def test_rows_match_file_contents(self, catalog, projects_dir):
+        """메타데이터/타임스탬프/에이전트 연결 정보 저장"""
+        app = projects_dir / "-work-app"
+        write_session(app / "s1.jsonl", [
+            {"type": "summary", "summary": "Fix login", "leafUuid": "leaf-1"},
+            user_line("hello world"),
+            tool_line("Task"),
+            tool_line("Read", timestamp="2025-01-01T00:05:00.000Z"),
+        ])
+        write_session(app / "agent-a1.jsonl", [
+            {"type": "user", "sessionId": "s1", "agentId": "a1", "timestamp": "2025-01-01T00:02:00.000Z"},
+        ])
+
+        assert catalog.reconcile() == 2
+        rows = {row["session_id"]: row for row in catalog.list_sessions("-work-app")}
+
+        session = rows["s1"]
+        assert session["summary"] == "Fix login"
+        assert session["first_message"] == "hello world"
+        assert session["message_count"] == 3
+        assert json.loads(session["tool_calls"]) == {"Task": 1, "Read": 1}
+        assert session["agent_count"] == 1
+        assert session["first_timestamp"] == "2025-01-01T00:00:00.000Z"
+        assert session["last_timestamp"] == "2025-01-01T00:05:00.000Z"
+
+        agent = rows["agent-a1"]
+        assert agent["is_agent"] == 1
+        assert agent["parent_session_id"] == "s1"
+        assert agent["agent_id"] == "a1"
+
+    def test_reconcile_rescans_only_changed_files(self, catalog, projects_dir):
+        """크기/mtime이 바뀐 파일만 다시 파싱하고 삭제된 파일은 제거"""
+        app = projects_dir / "-work-app"
+        write_session(app / "s1.jsonl", [user_line("one")])
+        write_session(app / "s2.jsonl", [user_line("two")])
+        catalog.reconcile()
+
+        assert catalog.reconcile() == 0
+
+        write_session(app / "s1.jsonl", [user_line("one"), user_line("again")])
+        (app / "s2.jsonl").unlink()
+        assert catalog.reconcile() == 2
+
+        rows = catalog.list_sessions("-work-app")
+        assert [row["session_id"] for row in rows] == ["s1"]
+        assert rows[0]["message_count"] == 2
+
+    def test_apply_changes_updates_only_changed_files(self, catalog, projects_dir, monkeypatch):
+        """변경 피드 이벤트의 파일만 이어 읽거나 삭제"""
+        app = projects_dir / "-work-app"
+        write_session(app / "s1.jsonl", [user_line("one")])
+        write_session(app / "s2.jsonl", [user_line("two")])
+        catalog.reconcile()
+
+        scanned = []
+        scan = catalog_module.scan_session_file
+        monkeypatch.setattr(catalog_module, "scan_session_file",
+                            lambda path, *args: scanned.append(path.name) or scan(path, *args))
+        append_lines(app / "s1.jsonl", [assistant_line("needle")])
+        write_session(app / "s3.jsonl", [user_line("three")])
+        (app / "s2.jsonl").unlink()
+        catalog.apply_changes([
+            ChangeEvent(SESSION_APPENDED, app / "s1.jsonl", "-work-app"),
+            ChangeEvent(SESSION_CREATED, app / "s3.jsonl", "-work-app"),
+            ChangeEvent(SESSION_DELETED, app / "s2.jsonl", "-work-app"),
+            ChangeEvent(SESSION_CREATED, projects_dir.parent / "other" / "-x" / "s4.jsonl", "-x"),
+        ])
+
+        assert scanned == ["s1.jsonl", "s3.jsonl"]
+        rows = {row["session_id"]: row["message_count"] for row in catalog.list_sessions("-work-app")}
+        assert rows == {"s1": 2, "s3": 1}
+        assert [name for name, _ in message_hits(catalog, "needle")] == ["s1.jsonl"]
+
+    def test_list_sessions_sorted_by_mtime(self, catalog, projects_dir):
+        app = projects_dir / "-work-app"
+        write_session(app / "old.jsonl", [user_line("a")], mtime=1_700_000_000)
+        write_session(app / "new.jsonl", [user_line("b")], mtime=1_700_001_000)
+        write_session(projects_dir / "-work-lib" / "other.jsonl", [user_line("c")])
+
+        assert [row["session_id"] for row in catalog.list_sessions("-work-app")] == ["new", "old"]
+
+    def test_listing_before_first_reconcile_uses_directory_scan(self, catalog, projects_dir, monkeypatch):
+        """첫 동기화가 끝나기 전에는 요청 중에 파일을 파싱하지 않고 디렉토리 목록으로 응답"""
+        app = projects_dir / "-work-app"
+        write_session(app / "old.jsonl", [user_line("a")], mtime=1_700_000_000)
+        write_session(app / "agent-x.jsonl", [user_line("b")], mtime=1_700_001_000)
+        monkeypatch.setattr(catalog, "start", lambda: None)
+
+        rows = catalog.list_sessions("-work-app")
+        assert [(row["session_id"], row["is_agent"]) for row in rows] == [("agent-x", 1), ("old", 0)]
+        assert rows[1]["size"] == (app / "old.jsonl").stat().st_size
+        assert catalog.list_sessions("-missing") == []
+        with catalog._lock:
+            assert catalog._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 0
+
+    def test_start_reconciles_in_background(self, catalog, projects_dir):
+        """start()가 백그라운드 스레드에서 첫 동기화 수행"""
+        write_session(projects_dir / "-work-app" / "s1.jsonl", [user_line("background sync")])
+        catalog.start()
+        catalog._reconciler.join(timeout=5)
+
+        assert [row["session_id"] for row in catalog.search("background")] == ["s1"]
+        assert catalog.list_sessions("-work-app")[0]["message_count"] == 1
+
+    def test_search_case_insensitive_excludes_agents(self, catalog, projects_dir):
+        write_session(projects_dir / "-work-app" / "s1.jsonl", [user_line("Refactor Parser")])
+        write_session(projects_dir / "-work-lib" / "s2.jsonl", [user_line("parser bug")])
+        write_session(projects_dir / "-work-app" / "agent-x.jsonl", [user_line("parser agent")])
+        catalog.reconcile()
+
+        assert {row["session_id"] for row in catalog.search("PARSER")} == {"s1", "s2"}
+        assert [row["session_id"] for row in catalog.search("parser", "-work-lib")] == ["s2"]
+        # 프로젝트 ID도 검색 대상
+        assert [row["session_id"] for row in catalog.search("work-lib")] == ["s2"]
+
+    def test_search_index_follows_updates(self, catalog, projects_dir):
+        """파일 갱신/삭제 후 검색 색인도 갱신 (3자 미만 검색어는 스캔)"""
+        path = projects_dir / "-work-app" / "s1.jsonl"
+        write_session(path, [user_line("alpha task")])
+        catalog.reconcile()
+        assert [row["session_id"] for row in catalog.search("alpha")] == ["s1"]
+
+        write_session(path, [user_line("bravo task!")])
+        catalog.reconcile()
+        assert catalog.search("alpha") == []
+        assert [row["session_id"] for row in catalog.search("bravo")] == ["s1"]
+        assert [row["session_id"] for row in catalog.search("k!")] == ["s1"]
+
+        path.unlink()
+        catalog.reconcile()
+        assert catalog.search("bravo") == []
+
+    def test_sessions_in_range(self, catalog, projects_dir):
+        app = projects_dir / "-work-app"
+        write_session(app / "a.jsonl", [user_line("a")], mtime=1_000)
+        write_session(app / "b.jsonl", [user_line("b")], mtime=2_000)
+        write_session(projects_dir / "-work-lib" / "c.jsonl", [user_line("c")], mtime=3_000)
+        catalog.reconcile()
+
+        assert [row["session_id"] for row in catalog.sessions_in_range(1_500, 3_000)] == ["b", "c"]
+        assert [row["session_id"] for row in catalog.sessions_in_range(0, 5_000, ["-work-app"])] == ["a", "b"]
+
+    def test_sessions_in_range_before_first_reconcile(self, catalog, projects_dir, monkeypatch):
+        """첫 동기화 전에도 빈 결과 대신 디렉토리 스캔으로 기간 내 세션을 반환"""
+        app = projects_dir / "-work-app"
+        write_session(app / "a.jsonl", [user_line("a")], mtime=1_000)
+        write_session(app / "b.jsonl", [user_line("b")], mtime=2_000)
+        write_session(projects_dir / "-work-lib" / "c.jsonl", [user_line("c")], mtime=3_000)
+        monkeypatch.setattr(catalog, "start", lambda: None)
+
+        assert [row["session_id"] for row in catalog.sessions_in_range(1_500, 3_000)] == ["b", "c"]
+        assert [row["session_id"] for row in catalog.sessions_in_range(0, 5_000, ["-work-app"])] == ["a", "b"]
+
+    def test_search_waits_for_first_reconcile(self, catalog, projects_dir, monkeypatch):
+        """검색은 첫 동기화 도중 일부 세션만 보지 않고 끝날 때까지 대기"""
+        write_session(projects_dir / "-work-app" / "s1.jsonl", [user_line("late index")])
+        reconcile = catalog.reconcile
+
+        def slow_reconcile():
+            time.sleep(0.1)
+            return reconcile()
+
+        monkeypatch.setattr(catalog, "reconcile", slow_reconcile)
+        assert [row["session_id"] for row in catalog.search("late")] == ["s1"]
+        assert message_hits(catalog, "index") == [("s1.jsonl", 0)]
+
+    def test_metadata_refreshes_stale_row(self, catalog, projects_dir):
+        path = projects_dir / "-work-app" / "s1.jsonl"
+        write_session(path, [user_line("first")])
+        assert catalog.metadata(path).message_count == 1
+
+        write_session(path, [user_line("first"), user_line("second")])
+        assert catalog.metadata(path).message_count == 2
+
+    def test_metadata_survives_restart_and_merges_appended_tail(self, tmp_path, catalog, projects_dir, monkeypatch):
+        """재시작 후 같은 파일은 다시 파싱하지 않고, 뒤로 늘어난 파일은 추가분만 합침"""
+        path = projects_dir / "-work-app" / "s1.jsonl"
+        write_session(path, [user_line("first"), tool_line("Task", tool_id="toolu_aaaaaaa1")])
+        catalog.metadata(path)
+        catalog.close()
+
+        scans = []
+        scan = catalog_module.scan_session_file
+
+        def spy(path, project_id, stat, previous=None):
+            scans.append(previous["scanned"] if previous is not None else None)
+            return scan(path, project_id, stat, previous)
+
+        monkeypatch.setattr(catalog_module, "scan_session_file", spy)
+        reopened = SessionCatalog(tmp_path / "catalog.db", projects_dir)
+        assert reopened.metadata(path).message_count == 2
+        assert scans == []
+
+        size = path.stat().st_size
+        append_lines(path, [user_line("second"), tool_line("Task", tool_id="toolu_bbbbbbb2"),
+                            tool_line("Task", tool_id="toolu_aaaaaaa1")])
+        metadata = reopened.metadata(path)
+        reopened.close()
+
+        assert scans == [size]
+        assert metadata.message_count == 5
+        assert metadata.tool_calls == {"Task": 3}
+        assert metadata.agent_count == 2
+
+    def test_replaced_file_with_same_size_and_mtime_rescanned(self, catalog, projects_dir, tmp_path):
+        """inode가 바뀐 파일은 크기/mtime이 같아도 다시 파싱"""
+        path = projects_dir / "-work-app" / "s1.jsonl"
+        write_session(path, [user_line("alpha")], mtime=1_700_000_000)
+        assert catalog.metadata(path).first_message == "alpha"
+
+        replacement = tmp_path / "replacement.jsonl"
+        write_session(replacement, [user_line("bravo")], mtime=1_700_000_000)
+        os.replace(replacement, path)
+        assert catalog.metadata(path).first_message == "bravo"
+
+    def test_persisted_across_instances(self, tmp_path, catalog, projects_dir):
+        write_session(projects_dir / "-work-app" / "s1.jsonl", [user_line("hello")])
+        catalog.reconcile()
+        catalog.close()
+
+        reopened = SessionCatalog(tmp_path / "catalog.db", projects_dir)
+        assert reopened.reconcile() == 0
+        assert [row["session_id"] for row in reopened.list_sessions("-work-app")] == ["s1"]
+        reopened.close()
+
+
+class TestMessageSearch:
+    """메시지 본문 전문 색인 테스트"""
+
+    def test_build_match_query(self):
+        assert build_match_query('fix "login page" pars*') == '"fix" "login page" "pars"*'
+        # 구두점으로 나뉘는 단어는 구문, 연산자는 일반 단어로 취급
+        assert build_match_query('a"b OR') == '"a b" "or"'
+        assert build_match_query("  * ") is None
+
+    def test_highlight_spans(self):
+        text = "Fixed the Login page; login-page tests and logins pass"
+        assert highlight_spans(text, parse_query('"login page"')) == [(10, 20), (22, 32)]
+        assert highlight_spans(text, parse_query("login*")) == [(10, 15), (22, 27), (43, 49)]
+        assert highlight_spans("Café crème", parse_query("cafe")) == [(0, 4)]
+
+    def test_make_snippet_shifts_spans(self):
+        text = "x" * 100 + " needle " + "y" * 100
+        snippet, spans = make_snippet(text, highlight_spans(text, parse_query("needle")), width=40)
+        assert snippet.startswith("…") and snippet.endswith("…")
+        assert [snippet[s:e] for s, e in spans] == ["needle"]
+        assert make_snippet("short\ntext", []) == ("short text", [])
+
+    def test_indexes_user_and_assistant_text(self, catalog, projects_dir):
+        """사용자 프롬프트/어시스턴트 텍스트만 색인 (시스템 메시지, 도구 호출, 에이전트 제외)"""
+        app = projects_dir / "-work-app"
+        write_session(app / "s1.jsonl", [
+            user_line("please rename the widget"),
+            assistant_line("Renamed the gadget module"),
+            user_line("<command-name>/clear</command-name> widget"),
+            tool_line("Read"),
+        ])
+        write_session(app / "agent-a1.jsonl", [user_line("widget agent")])
+        catalog.reconcile()
+
+        assert message_hits(catalog, "widget") == [("s1.jsonl", 0)]
+        assert [name for name, _ in message_hits(catalog, "gadget")] == ["s1.jsonl"]
+        assert message_hits(catalog, "Read") == []
+
+    def test_phrase_prefix_and_project_filter(self, catalog, projects_dir):
+        write_session(projects_dir / "-work-app" / "s1.jsonl", [user_line("the quick brown fox")])
+        write_session(projects_dir / "-work-lib" / "s2.jsonl", [user_line("brown quick fox")])
+        catalog.reconcile()
+
+        assert {name for name, _ in message_hits(catalog, "quick fox")} == {"s1.jsonl", "s2.jsonl"}
+        assert message_hits(catalog, '"quick brown"') == [("s1.jsonl", 0)]
+        assert {name for name, _ in message_hits(catalog, "qui*")} == {"s1.jsonl", "s2.jsonl"}
+        assert message_hits(catalog, "fox", "-work-lib") == [("s2.jsonl", 0)]
+
+    def test_appended_lines_indexed_incrementally(self, catalog, projects_dir):
+        """뒤로 늘어난 파일은 추가분만 색인 (중복 없음, 미완성 라인은 보류)"""
+        path = projects_dir / "-work-app" / "s1.jsonl"
+        write_session(path, [user_line("alpha")])
+        catalog.reconcile()
+        size = path.stat().st_size
+
+        append_lines(path, [user_line("bravo")])
+        with open(path, "a") as f:
+            f.write('{"type": "user", "message": {"content": "char')
+        catalog.reconcile()
+
+        assert message_hits(catalog, "alpha") == [("s1.jsonl", 0)]
+        assert message_hits(catalog, "bravo") == [("s1.jsonl", size)]
+        assert message_hits(catalog, "charlie") == []
+        assert catalog.list_sessions("-work-app")[0]["message_count"] == 2
+
+        with open(path, "a") as f:
+            f.write('lie"}}\n')
+        catalog.reconcile()
+        assert len(message_hits(catalog, "charlie")) == 1
+        assert len(message_hits(catalog, "alpha")) == 1
+        assert catalog.list_sessions("-work-app")[0]["message_count"] == 3
+
+    def test_rewritten_file_reindexed(self, catalog, projects_dir):
+        """앞부분이 바뀐 파일은 처음부터 다시 색인하고 삭제된 파일은 색인에서 제거"""
+        path = projects_dir / "-work-app" / "s1.jsonl"
+        write_session(path, [user_line("alpha"), user_line("bravo")])
+        catalog.reconcile()
+
+        write_session(path, [user_line("delta force"), user_line("bravo"), user_line("echo")])
+        catalog.reconcile()
+        assert message_hits(catalog, "alpha") == []
+        assert len(message_hits(catalog, "bravo")) == 1
+
+        path.unlink()
+        catalog.reconcile()
+        assert message_hits(catalog, "delta") == []
+
+    def test_ranked_by_relevance(self, catalog, projects_dir):
+        app = projects_dir / "-work-app"
+        write_session(app / "weak.jsonl", [user_line("cache " + "filler words " * 50)])
+        write_session(app / "strong.jsonl", [user_line("cache cache cache invalidation")])
+        catalog.reconcile()
+
+        assert [name for name, _ in message_hits(catalog, "cache")] == ["strong.jsonl", "weak.jsonl"]
+
+    def test_hits_split_into_newest_first_windows(self, catalog, projects_dir):
+        """일치 메시지를 최신순 구간으로 나눠 구간마다 점수 순으로 반환"""
+        write_session(projects_dir / "-work-app" / "s1.jsonl", [user_line(f"needle {i}") for i in range(5)])
+        catalog.reconcile()
+
+        windows = list(catalog.iter_message_hits(build_match_query("needle"), window=2))
+        assert [len(w) for w in windows] == [2, 2, 1]
+        ids = [sorted(row["id"] for row in w) for w in windows]
+        assert ids[0][0] > ids[1][1] and ids[1][0] > ids[2][0]
+
+
+class TestSessionServiceCatalog:
+    """SessionService가 카탈로그로 조회하는지 테스트"""
+
+    def test_search_and_list(self, catalog, projects_dir):
+        write_session(projects_dir / "-work-app" / "s1.jsonl", [
+            {"type": "summary", "summary": "Catalog work"},
+            user_line("add sqlite"),
+        ])
+        catalog.reconcile()
+        service = SessionService()
+        service.projects_dir = projects_dir
+        service.catalog = catalog
+        service.locator = SessionLocator(projects_dir, watch=False)
+
+        results = service.search("sqlite")
+        assert [r.session_id for r in results] == ["s1"]
+        assert results[0].summary == "Catalog work"
+        assert results[0].project_path == "/work/app"
+
+        cache_manager.clear(CACHE_SESSIONS)
+        sessions = service.list_sessions("-work-app")
+        assert [(s.id, s.filename, s.is_agent) for s in sessions] == [("s1", "s1.jsonl", False)]
+
+    def test_search_ranks_body_hits_before_metadata_hits(self, catalog, projects_dir):
+        """본문 일치 세션을 관련도 순으로 먼저, 요약 일치 세션을 그 뒤에 반환"""
+        app = projects_dir / "-work-app"
+        write_session(app / "meta.jsonl", [{"type": "summary", "summary": "deadlock notes"},
+                                           user_line("unrelated")], mtime=3_000)
+        write_session(app / "body.jsonl", [user_line("intro"), assistant_line("found the deadlock")],
+                      mtime=1_000)
+        catalog.reconcile()
+        service = SessionService()
+        service.catalog = catalog
+
+        results = service.search("deadlock")
+        assert [r.session_id for r in results] == ["body", "meta"]
+        assert results[0].score is not None
+        assert results[1].score is None
+
+        hit = results[0].hits[0]
+        assert hit.role == "assistant"
+        assert hit.snippet == "found the deadlock"
+        assert hit.highlights == [(10, 18)]
+        assert hit.offset == len(json.dumps(user_line("intro"))) + 1
+        assert results[1].hits == []
+
+    def test_iter_search_covers_older_windows(self, catalog, projects_dir, monkeypatch):
+        """스트리밍 검색은 첫 구간 이후의 오래된 일치 세션도 반환"""
+        monkeypatch.setattr("services.catalog.RANK_CANDIDATES", 1)
+        app = projects_dir / "-work-app"
+        write_session(app / "old.jsonl", [user_line("intro"), user_line("needle")])
+        catalog.reconcile()
+        write_session(app / "new.jsonl", [user_line("intro"), user_line("needle")])
+        catalog.reconcile()
+        service = SessionService()
+        service.catalog = catalog
+
+        assert [r.session_id for r in service.search("needle")] == ["new", "old"]
+        assert [r.session_id for r in service.iter_search("needle")] == ["new", "old"]
+
+    def test_search_reads_windows_until_enough_sessions(self, catalog, projects_dir, monkeypatch):
+        """비스트리밍 검색도 흔한 단어에서 오래된 일치 세션을 버리지 않고 구간 간 점수 순으로 정렬"""
+        monkeypatch.setattr("services.catalog.RANK_CANDIDATES", 1)
+        app = projects_dir / "-work-app"
+        write_session(app / "old.jsonl", [user_line("needle needle needle")], mtime=1_000)
+        write_session(app / "mid.jsonl", [user_line("needle in a long haystack of other words")],
+                      mtime=2_000)
+        write_session(app / "new.jsonl", [user_line("needle among several other unrelated words")],
+                      mtime=3_000)
+        catalog.reconcile()
+        service = SessionService()
+        service.catalog = catalog
+
+        assert [r.session_id for r in service.search("needle")][0] == "old"
+        assert {r.session_id for r in service.search("needle")} == {"old", "mid", "new"}
+
+        monkeypatch.setattr("services.session.SEARCH_MIN_SESSIONS", 1)
+        results = service.search("needle")
+        assert results[0].score is not None
+        assert [r.score is None for r in results].count(False) == 1
+
+    def test_change_events_invalidate_only_changed_entries(self, catalog, projects_dir):
+        """변경된 프로젝트의 목록과 변경된 파일의 메타데이터 캐시만 무효화"""
+        app = projects_dir / "-work-app"
+        write_session(app / "s1.jsonl", [user_line("one")])
+        write_session(app / "s2.jsonl", [user_line("two")])
+        write_session(projects_dir / "-work-lib" / "s3.jsonl", [user_line("three")])
+        service = SessionService()
+        service.catalog = catalog
+        service.locator = SessionLocator(projects_dir, watch=False)
+        cache_manager.clear(CACHE_SESSIONS)
+        cache_manager.clear(CACHE_METADATA)
+        service.list_sessions("-work-app")
+        service.list_sessions("-work-lib")
+        service._extract_metadata(app / "s1.jsonl")
+        service._extract_metadata(app / "s2.jsonl")
+
+        append_lines(app / "s1.jsonl", [user_line("four")])
+        event = ChangeEvent(SESSION_APPENDED, app / "s1.jsonl", "-work-app")
+        catalog.apply_changes([event])
+        invalidate_sessions([event])
+
+        sessions = cache_manager.get_cache(CACHE_SESSIONS)
+        assert "sessions:-work-app" not in sessions
+        assert "sessions:-work-lib" in sessions
+        metadata_keys = list(cache_manager.get_cache(CACHE_METADATA).keys())
+        assert [key.split(":")[1] for key in metadata_keys] == [str(app / "s2.jsonl")]
+        sizes = {s.id: s.size for s in service.list_sessions("-work-app")}
+        assert sizes["s1"] == (app / "s1.jsonl").stat().st_size
@@ -13,6 +13,7 @@ from services.common import (
     get_project_name,
     save_prompts_to_file,
     parse_stream_event,
+    iter_lines_reversed,
 )
 from services.common.utils import clean_content
 
@@ -231,3 +232,27 @@ class TestCleanContent:
         """변경 필요 없는 경우"""
         content = "Normal text\n\nNew paragraph"
         assert clean_content(content) == content
+
+
+class TestIterLinesReversed:
+    """iter_lines_reversed 함수 테스트"""
+
+    @pytest.mark.parametrize("block_size", [1, 3, 16, 64 * 1024])
+    def test_matches_forward_split(self, tmp_path, block_size):
+        """블록 크기와 무관하게 정방향 분할의 역순과 같음"""
+        data = b'{"a": 1}\n\n' + b"x" * 100 + b'\n{"b": 2}\npartial'
+        path = tmp_path / "lines.jsonl"
+        path.write_bytes(data)
+
+        expected = []
+        offset = 0
+        for line in data.split(b"\n"):
+            expected.append((offset, line))
+            offset += len(line) + 1
+
+        assert list(iter_lines_reversed(path, block_size)) == expected[::-1]
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.jsonl"
+        path.write_bytes(b"")
+        assert list(iter_lines_reversed(path)) == []
@@ -0,0 +1,226 @@
+"""세션 locator 단위 테스트"""
+
+import json
+import time
+
+import pytest
+
+import services.locator as locator_module
+from config import config
+from services.change_feed import (
+    ChangeFeed, SESSION_CREATED, SESSION_APPENDED, SESSION_DELETED, AGENT_CREATED, NESTED_CHANGED, RESYNC,
+)
+from services.catalog import SessionCatalog
+from services.locator import SessionLocator
+
+
+def write_agent(path, session_id, agent_id=None):
+    header = {"type": "user", "sessionId": session_id}
+    if agent_id:
+        header["agentId"] = agent_id
+    path.write_text(json.dumps(header) + "\n")
+
+
+@pytest.fixture
+def projects_dir(tmp_path):
+    projects = tmp_path / "projects"
+    (projects / "-work-app").mkdir(parents=True)
+    (projects / "-work-lib").mkdir(parents=True)
+    return projects
+
+
+class TestSessionLocator:
+    """세션 ID → 파일 경로 색인 테스트"""
+
+    def test_exact_stem_match(self, projects_dir):
+        """부분 문자열이 아닌 파일 이름 stem과 정확히 일치"""
+        (projects_dir / "-work-app" / "abc-123.jsonl").write_text("")
+        (projects_dir / "-work-lib" / "agent-abc.jsonl").write_text("")
+        locator = SessionLocator(projects_dir, watch=False)
+
+        assert locator.find("abc-123") == projects_dir / "-work-app" / "abc-123.jsonl"
+        assert locator.find("agent-abc") == projects_dir / "-work-lib" / "agent-abc.jsonl"
+        assert locator.find("abc") is None
+
+    def test_miss_rescans_at_most_once_per_interval(self, projects_dir, monkeypatch):
+        monkeypatch.setattr(config, "LOCATOR_RESCAN_INTERVAL", 3600)
+        locator = SessionLocator(projects_dir, watch=False)
+        assert locator.find("new") is None
+
+        (projects_dir / "-work-app" / "new.jsonl").write_text("")
+        assert locator.find("new") is None
+
+        monkeypatch.setattr(config, "LOCATOR_RESCAN_INTERVAL", 0)
+        assert locator.find("new") == projects_dir / "-work-app" / "new.jsonl"
+
+    def test_deleted_file_dropped(self, projects_dir, monkeypatch):
+        monkeypatch.setattr(config, "LOCATOR_RESCAN_INTERVAL", 3600)
+        path = projects_dir / "-work-app" / "gone.jsonl"
+        path.write_text("")
+        locator = SessionLocator(projects_dir, watch=False)
+        assert locator.find("gone") == path
+
+        path.unlink()
+        assert locator.find("gone") is None
+        assert "gone" not in locator._index
+
+    def test_filesystem_events_update_index(self, projects_dir, monkeypatch):
+        """감시 중에는 재스캔 없이 새 파일/삭제가 반영"""
+        monkeypatch.setattr(config, "LOCATOR_RESCAN_INTERVAL", 3600)
+        locator = SessionLocator(projects_dir)
+        try:
+            assert locator.find("later") is None
+            path = projects_dir / "-work-lib" / "later.jsonl"
+            # 감시 스레드가 시작될 때까지 파일 생성을 반복
+            deadline = time.monotonic() + 10
+            while locator.find("later") is None and time.monotonic() < deadline:
+                path.write_text("")
+                time.sleep(0.1)
+            assert locator.find("later") == path
+
+            path.unlink()
+            while "later" in locator._index and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert "later" not in locator._index
+        finally:
+            locator.close()
+
+
+class TestAgentMap:
+    """에이전트 파일 → 부모 세션 매핑 테스트"""
+
+    @pytest.fixture
+    def header_reads(self, monkeypatch):
+        reads = []
+        read = locator_module.read_agent_header
+
+        def spy(path):
+            reads.append(path.name)
+            return read(path)
+
+        monkeypatch.setattr(locator_module, "read_agent_header", spy)
+        return reads
+
+    def test_agents_grouped_by_parent_session(self, projects_dir, header_reads):
+        app = projects_dir / "-work-app"
+        write_agent(app / "agent-a1.jsonl", "s1", "a1")
+        write_agent(app / "agent-b2.jsonl", "s1")
+        write_agent(app / "agent-c3.jsonl", "s2", "c3")
+        locator = SessionLocator(projects_dir, watch=False)
+
+        assert locator.agents("s1") == {"a1": app / "agent-a1.jsonl", "b2": app / "agent-b2.jsonl"}
+        assert locator.agents("s2") == {"c3": app / "agent-c3.jsonl"}
+        assert locator.agents("s3") == {}
+        # 첫 줄은 파일당 한 번만 읽음
+        assert sorted(header_reads) == ["agent-a1.jsonl", "agent-b2.jsonl", "agent-c3.jsonl"]
+
+    def test_new_and_pending_agent_files(self, projects_dir, header_reads, monkeypatch):
+        """새 에이전트 파일만 읽고, 첫 줄이 쓰이기 전의 파일은 나중에 다시 읽음"""
+        monkeypatch.setattr(config, "LOCATOR_RESCAN_INTERVAL", 0)
+        app = projects_dir / "-work-app"
+        write_agent(app / "agent-a1.jsonl", "s1", "a1")
+        locator = SessionLocator(projects_dir, watch=False)
+        assert list(locator.agents("s1")) == ["a1"]
+
+        pending = app / "agent-b2.jsonl"
+        pending.write_text('{"type": "user", "sessi')
+        assert list(locator.agents("s1")) == ["a1"]
+
+        write_agent(pending, "s1", "b2")
+        assert sorted(locator.agents("s1")) == ["a1", "b2"]
+        assert header_reads == ["agent-a1.jsonl", "agent-b2.jsonl", "agent-b2.jsonl"]
+
+        pending.unlink()
+        assert list(locator.agents("s1")) == ["a1"]
+
+    def test_agent_headers_from_catalog(self, tmp_path, projects_dir, header_reads):
+        """카탈로그가 읽은 파일은 inode가 같으면 첫 줄을 다시 읽지 않음"""
+        app = projects_dir / "-work-app"
+        write_agent(app / "agent-a1.jsonl", "s1", "a1")
+        write_agent(app / "agent-b2.jsonl", "s1", "b2")
+        catalog = SessionCatalog(tmp_path / "catalog.db", projects_dir)
+        catalog.reconcile()
+
+        replaced = tmp_path / "agent-b2.jsonl"
+        write_agent(replaced, "s2", "b2")
+        replaced.replace(app / "agent-b2.jsonl")
+
+        locator = SessionLocator(projects_dir, watch=False, catalog=catalog)
+        assert list(locator.agents("s1")) == ["a1"]
+        assert list(locator.agents("s2")) == ["b2"]
+        assert header_reads == ["agent-b2.jsonl"]
+        catalog.close()
+
+
+class TestChangeEvents:
+    """감시 이벤트 → 변경 피드 이벤트 변환 테스트"""
+
+    @pytest.fixture
+    def feed(self):
+        feed = ChangeFeed()
+        feed.events = []
+        feed.subscribe(feed.events.extend)
+        return feed
+
+    def test_typed_events(self, projects_dir, feed):
+        app = projects_dir / "-work-app"
+        existing = app / "old.jsonl"
+        existing.write_text("")
+        locator = SessionLocator(projects_dir, watch=False, feed=feed)
+        locator.start()
+        notified = []
+        locator._listeners[app] = [lambda: notified.append(app)]
+
+        new = app / "new.jsonl"
+        new.write_text("")
+        agent = app / "agent-a1.jsonl"
+        write_agent(agent, "new", "a1")
+        locator._handle_changes([str(existing), str(new), str(agent), str(app / "notes.txt")])
+        existing.unlink()
+        locator._handle_changes([str(existing), str(new)])
+
+        assert [(e.kind, e.session_id, e.project_id, e.is_agent) for e in feed.events] == [
+            (AGENT_CREATED, "agent-a1", "-work-app", True),
+            (SESSION_CREATED, "new", "-work-app", False),
+            (SESSION_APPENDED, "old", "-work-app", False),
+            (SESSION_APPENDED, "new", "-work-app", False),
+            (SESSION_DELETED, "old", "-work-app", False),
+        ]
+        assert locator.find("new") == new
+        assert locator.find("old") is None
+        assert notified == [app, app]
+
+    def test_nested_files_published_for_usage(self, projects_dir, feed):
+        """프로젝트 하위 디렉토리의 .jsonl은 색인하지 않고 NESTED_CHANGED로만 발행"""
+        nested = projects_dir / "-work-app" / "s1" / "subagents" / "agent-a1.jsonl"
+        nested.parent.mkdir(parents=True)
+        nested.write_text("")
+        locator = SessionLocator(projects_dir, watch=False, feed=feed)
+        locator.start()
+
+        locator._handle_changes([str(nested), str(projects_dir / "top.jsonl")])
+        assert [(e.kind, e.path, e.project_id) for e in feed.events] == [
+            (NESTED_CHANGED, nested, "-work-app"),
+        ]
+        assert locator.find("agent-a1") is None
+
+    def test_watch_publishes_events(self, projects_dir, feed):
+        """감시 스레드가 시작/생성 이벤트를 발행하고 종료 시 비활성화"""
+        locator = SessionLocator(projects_dir, feed=feed)
+        locator.start()
+        deadline = time.monotonic() + 5
+        while not feed.active and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert feed.active
+        time.sleep(0.2)  # watchfiles가 감시를 등록할 시간
+
+        (projects_dir / "-work-lib" / "s9.jsonl").write_text("{}\n")
+        while SESSION_CREATED not in [e.kind for e in feed.events] and time.monotonic() < deadline:
+            time.sleep(0.02)
+        locator.close()
+
+        kinds = [e.kind for e in feed.events]
+        assert kinds[0] == RESYNC
+        assert SESSION_CREATED in kinds
+        assert kinds[-1] == RESYNC
+        assert not feed.active
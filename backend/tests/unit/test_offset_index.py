@@ -0,0 +1,107 @@
+"""세션 오프셋 색인 단위 테스트"""
+
+import json
+
+from services.catalog import SessionCatalog
+from services.offset_index import OffsetIndexStore, SessionOffsetIndex
+
+
+def write_lines(path, lines, mode="w"):
+    with open(path, mode) as f:
+        for line in lines:
+            f.write(line + "\n")
+
+
+def messages(start, count):
+    """user 메시지 사이에 표시되지 않는 라인을 섞은 JSONL 라인"""
+    lines = []
+    for i in range(start, start + count):
+        lines.append(json.dumps({"type": "user", "message": {"content": f"m{i}"}}))
+        lines.append(json.dumps({"type": "system"}))
+    return lines
+
+
+def message_offsets(path):
+    """표시 가능한 메시지 라인의 시작 오프셋 (정답)"""
+    offsets = []
+    pos = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if json.loads(line).get("type") == "user":
+                offsets.append(pos)
+            pos += len(line)
+    return offsets
+
+
+def message_offsets_without_tail(path):
+    """마지막 미완성 라인을 제외한 메시지 오프셋"""
+    data = path.read_bytes()
+    trimmed = path.with_name("trimmed.jsonl")
+    trimmed.write_bytes(data[:data.rfind(b"\n") + 1])
+    return message_offsets(trimmed)
+
+
+class TestSessionOffsetIndex:
+    """희소 오프셋 색인 테스트"""
+
+    def test_checkpoint_every_stride(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        write_lines(path, messages(0, 10))
+        index = SessionOffsetIndex(stride=4)
+        index.refresh(path)
+
+        offsets = message_offsets(path)
+        assert index.count == 10
+        assert list(index.checkpoints) == offsets[::4]
+        assert index.locate(6) == (offsets[4], 2)
+        assert index.locate(100) == (offsets[8], 92)
+
+    def test_incremental_extend(self, tmp_path):
+        """늘어난 부분만 스캔하고 미완성 라인은 남겨둠"""
+        path = tmp_path / "s.jsonl"
+        write_lines(path, messages(0, 5))
+        index = SessionOffsetIndex(stride=4)
+        index.refresh(path)
+        scanned = index.scanned
+
+        write_lines(path, messages(5, 5), mode="a")
+        with open(path, "a") as f:
+            f.write('{"type": "user"')
+        assert index.refresh(path)
+
+        assert index.count == 10
+        assert list(index.checkpoints) == message_offsets_without_tail(path)[::4]
+        assert index.scanned > scanned
+        assert index.scanned == path.stat().st_size - len('{"type": "user"')
+
+    def test_rewritten_file_rescanned(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        write_lines(path, messages(0, 10))
+        index = SessionOffsetIndex(stride=4)
+        index.refresh(path)
+
+        write_lines(path, messages(0, 3))
+        index.refresh(path)
+        assert index.count == 3
+        assert list(index.checkpoints) == message_offsets(path)[:1]
+
+
+class TestOffsetIndexStore:
+    """색인 저장/로드 테스트"""
+
+    def test_persisted_and_resumed(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        write_lines(path, messages(0, 300))
+        catalog = SessionCatalog(tmp_path / "catalog.db", tmp_path)
+        first = OffsetIndexStore(catalog).get(path)
+        assert first.count == 300
+        catalog.close()
+
+        # 재시작 후에는 저장된 위치부터 추가분만 스캔
+        catalog = SessionCatalog(tmp_path / "catalog.db", tmp_path)
+        assert catalog.load_offset_index(path)["scanned"] == path.stat().st_size
+        write_lines(path, messages(300, 10), mode="a")
+        second = OffsetIndexStore(catalog).get(path)
+        assert second.count == 310
+        assert list(second.checkpoints) == message_offsets(path)[::256]
+        catalog.close()
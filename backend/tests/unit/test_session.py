@@ -0,0 +1,132 @@
+"""세션 서비스 단위 테스트"""
+
+import json
+
+import pytest
+
+from services.locator import SessionLocator
+from services.offset_index import OffsetIndexStore
+from services.session import SessionService
+
+
+def message_lines(count: int) -> list[str]:
+    """사용자/어시스턴트 메시지와 표시되지 않는 라인이 섞인 JSONL"""
+    lines = [json.dumps({"type": "summary", "summary": "history test"})]
+    for i in range(count):
+        lines.append(json.dumps({"type": "user", "message": {"content": f"question {i}"}}))
+        lines.append(json.dumps({"type": "system", "content": "ignored"}))
+        lines.append(json.dumps({
+            "type": "assistant",
+            "message": {"content": [{"type": "text", "text": f"answer {i} " + "x" * 5000}]},
+        }))
+    return lines
+
+
+@pytest.fixture
+def session_service(tmp_path):
+    projects = tmp_path / "projects"
+    (projects / "-work-app").mkdir(parents=True)
+    service = SessionService()
+    service.projects_dir = projects
+    service.locator = SessionLocator(projects, watch=False)
+    service.offset_indexes = OffsetIndexStore()
+    return service
+
+
+def forward_history(service, path, limit):
+    """전체를 정방향으로 파싱한 결과 (기존 구현)"""
+    messages = []
+    with open(path) as f:
+        for line in f:
+            parsed = service.parser.parse_line(line)
+            if parsed:
+                messages.append(parsed)
+    return messages[-limit:] if limit else messages
+
+
+def without_timestamp(messages):
+    return [{k: v for k, v in m.items() if k != "timestamp"} for m in messages]
+
+
+class TestGetHistory:
+    """세션 히스토리 tail 읽기 테스트"""
+
+    @pytest.mark.parametrize("limit", [0, 1, 5, 100, 1000])
+    def test_matches_full_parse(self, session_service, limit):
+        path = session_service.projects_dir / "-work-app" / "s1.jsonl"
+        path.write_text("\n".join(message_lines(60)) + "\n")
+
+        assert without_timestamp(session_service.get_history("s1", limit)) == \
+            without_timestamp(forward_history(session_service, path, limit))
+
+    def test_partial_last_line_skipped(self, session_service):
+        path = session_service.projects_dir / "-work-app" / "s1.jsonl"
+        path.write_text("\n".join(message_lines(3)) + '\n{"type": "user", "mess')
+
+        history = session_service.get_history("s1", 2)
+        assert [m["type"] for m in history] == ["user", "assistant"]
+        assert history[0]["content"] == "question 2"
+
+    def test_unknown_session(self, session_service):
+        assert session_service.get_history("missing") == []
+
+
+class TestHistoryCursor:
+    """커서 기반 히스토리 페이지네이션 테스트"""
+
+    @pytest.fixture
+    def session_path(self, session_service):
+        path = session_service.projects_dir / "-work-app" / "s1.jsonl"
+        path.write_text("\n".join(message_lines(50)) + "\n")
+        return path
+
+    def test_backward_pages_cover_history(self, session_service, session_path):
+        """before 커서로 끝에서 처음까지 넘기면 전체 히스토리와 같음"""
+        pages = []
+        page = session_service.get_history_page("s1", 7)
+        pages.append(page.messages)
+        while page.prev_cursor:
+            page = session_service.get_history_page("s1", 7, before=page.prev_cursor)
+            pages.append(page.messages)
+
+        combined = [m for messages in reversed(pages) for m in messages]
+        assert without_timestamp(combined) == \
+            without_timestamp(forward_history(session_service, session_path, 0))
+
+    def test_forward_page_after_backward_page(self, session_service, session_path):
+        """이전 페이지의 next 커서로 바로 다음 메시지부터 조회"""
+        tail = session_service.get_history_page("s1", 10)
+        older = session_service.get_history_page("s1", 10, before=tail.prev_cursor)
+
+        newer = session_service.get_history_page("s1", 10, after=older.next_cursor)
+        assert without_timestamp(newer.messages) == without_timestamp(tail.messages)
+
+    def test_after_returns_appended_messages(self, session_service, session_path):
+        tail = session_service.get_history_page("s1", 5)
+        assert session_service.get_history_page("s1", 5, after=tail.next_cursor).messages == []
+
+        with open(session_path, "a") as f:
+            f.write(json.dumps({"type": "user", "message": {"content": "new"}}) + "\n")
+            f.write('{"type": "user", "message": {"con')
+
+        page = session_service.get_history_page("s1", 5, after=tail.next_cursor)
+        assert [m["content"] for m in page.messages] == ["new"]
+
+        # 미완성 라인은 완성된 뒤 다음 조회에서 반환
+        with open(session_path, "a") as f:
+            f.write('tent": "later"}}\n')
+        page = session_service.get_history_page("s1", 5, after=page.next_cursor)
+        assert [m["content"] for m in page.messages] == ["later"]
+
+    @pytest.mark.parametrize("start", [0, 1, 99, 149, 151, 500])
+    def test_start_by_message_number(self, session_service, session_path, start):
+        """메시지 번호로 조회하면 전체 파싱 결과의 같은 구간"""
+        expected = forward_history(session_service, session_path, 0)
+        page = session_service.get_history_page("s1", 7, start=start)
+
+        assert page.total == len(expected)
+        assert without_timestamp(page.messages) == without_timestamp(expected[start:start + 7])
+
+    def test_invalid_cursor(self, session_service, session_path):
+        with pytest.raises(ValueError):
+            session_service.get_history_page("s1", 5, before="not-a-cursor")
@@ -0,0 +1,805 @@
+"""Usage 서비스 단위 테스트"""
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import services.usage as usage_module
+from config import config
+from services.usage import (
+    UsageLedger,
+    UsageRollup,
+    UsageService,
+    UsageTable,
+    UsageRows,
+    UsageEntry,
+    UsageBlockTracker,
+    UsageDeltaFeed,
+    LedgerRecord,
+    NO_TIMESTAMP,
+    calculate_cost,
+    format_timestamp_ms,
+    parse_timestamp_ms,
+    get_all_usage_entries,
+    parse_usage_tail,
+)
+
+
+def usage_line(msg_id: str, req_id: str, timestamp: str, output_tokens: int = 10,
+               model: str = "claude-sonnet-4-20250514", cwd: str = "/work/app") -> str:
+    """assistant usage 라인 생성"""
+    return json.dumps({
+        "type": "assistant",
+        "timestamp": timestamp,
+        "requestId": req_id,
+        "sessionId": "session-1",
+        "cwd": cwd,
+        "message": {
+            "id": msg_id,
+            "model": model,
+            "usage": {
+                "input_tokens": 100,
+                "output_tokens": output_tokens,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 0,
+            },
+        },
+    }) + "\n"
+
+
+def legacy_usage_entries(projects_dir):
+    """파일별 가장 이른 타임스탬프를 먼저 구해 정렬한 뒤 파싱하던 기존 2-pass 방식"""
+    def earliest(path):
+        result = None
+        for line in path.read_text().splitlines():
+            if not line.strip():
+                continue
+            try:
+                ts = json.loads(line).get("timestamp")
+            except json.JSONDecodeError:
+                continue
+            if ts and (result is None or ts < result):
+                result = ts
+        return result
+
+    files = []
+    for project_dir in projects_dir.iterdir():
+        for path in project_dir.rglob("*.jsonl"):
+            files.append((path, project_dir.name))
+    files.sort(key=lambda x: earliest(x[0]) or "")
+
+    entries = []
+    processed_hashes = set()
+    for path, project_name in files:
+        cwd = None
+        for line in path.read_text().splitlines():
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if cwd is None and "cwd" in data:
+                cwd = data["cwd"]
+            message = data.get("message")
+            if not message or not message.get("usage"):
+                continue
+            usage = message["usage"]
+            msg_id, req_id = message.get("id", ""), data.get("requestId", "")
+            if msg_id and req_id:
+                if f"{msg_id}:{req_id}" in processed_hashes:
+                    continue
+                processed_hashes.add(f"{msg_id}:{req_id}")
+            tokens = [usage.get(k, 0) or 0 for k in (
+                "input_tokens", "output_tokens",
+                "cache_creation_input_tokens", "cache_read_input_tokens",
+            )]
+            if not any(tokens):
+                continue
+            model = message.get("model", "unknown")
+            cost = data.get("costUSD")
+            if cost is None:
+                cost = calculate_cost(model, *tokens)
+            entries.append((data.get("timestamp", ""), model, *tokens, cost, cwd or project_name))
+    entries.sort(key=lambda x: x[0])
+    return entries
+
+
+def write_synthetic_corpus(projects_dir, seed: int = 7):
+    """중복/재개 세션/토큰 없는 엔트리/깨진 라인이 섞인 합성 코퍼스 생성"""
+    rng = random.Random(seed)
+    models = ["claude-opus-4-20250514", "claude-sonnet-4-20250514", "claude-3-haiku"]
+    written = []
+
+    for p in range(3):
+        project = projects_dir / f"-work-project{p}"
+        project.mkdir(parents=True, exist_ok=True)
+        for s in range(6):
+            lines = [json.dumps({"type": "summary", "summary": f"s{s}"})]
+            day = rng.randint(1, 28)
+            for i in range(rng.randint(5, 30)):
+                # 이전 파일의 메시지를 복사한 재개 세션
+                if written and rng.random() < 0.25:
+                    lines.append(rng.choice(written))
+                    continue
+                ts = f"2025-03-{day:02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00.000Z"
+                if rng.random() < 0.3:
+                    # usage가 없는 user 라인 (prefilter 대상)
+                    lines.append(json.dumps({
+                        "type": "user",
+                        "timestamp": ts,
+                        "cwd": f"/work/project{p}/user",
+                        "message": {"role": "user", "content": "hello"},
+                    }))
+                line = json.dumps({
+                    "type": "assistant",
+                    "timestamp": ts,
+                    "requestId": f"req-{p}-{s}-{i}",
+                    "cwd": f"/work/project{p}/{rng.choice(['a', 'b'])}",
+                    "costUSD": rng.choice([None, 0.5]),
+                    "message": {
+                        "id": f"msg-{p}-{s}-{i}",
+                        "model": rng.choice(models),
+                        "usage": {
+                            "input_tokens": rng.choice([0, rng.randint(1, 5000)]),
+                            "output_tokens": rng.choice([0, rng.randint(1, 5000)]),
+                            "cache_read_input_tokens": rng.randint(0, 100),
+                        },
+                    },
+                })
+                lines.append(line)
+                written.append(line)
+            if rng.random() < 0.3:
+                lines.append("{broken")
+            (project / f"session-{s}.jsonl").write_text("\n".join(lines) + "\n")
+
+
+def entry_stats(service, entries):
+    """엔트리 목록을 테이블로 만들어 통계 계산"""
+    table = UsageTable()
+    table.rebuild(entries)
+    return service._calculate_stats(table.buckets())
+
+
+def rounded(value):
+    """통계 dict의 float 합산 순서 차이를 무시하기 위해 반올림"""
+    if isinstance(value, float):
+        return round(value, 9)
+    if isinstance(value, dict):
+        return {k: rounded(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [rounded(v) for v in value]
+    return value
+
+
+@pytest.fixture
+def usage_service(tmp_path):
+    """임시 디렉토리를 읽는 UsageService"""
+    service = UsageService()
+    service.claude_path = tmp_path
+    service.ledger = UsageLedger()
+    service.table = service.ledger.table
+    service.rollup = UsageRollup()
+    service.feed = UsageDeltaFeed()
+    service.ledger.add_listener(service.rollup)
+    service.ledger.add_listener(service.feed)
+    return service
+
+
+@pytest.fixture
+def projects_dir(tmp_path):
+    """임시 projects 디렉토리"""
+    project = tmp_path / "projects" / "-work-app"
+    project.mkdir(parents=True)
+    return tmp_path / "projects"
+
+
+class TestParseUsageTail:
+    """parse_usage_tail 함수 테스트"""
+
+    def test_parse_complete_lines(self, tmp_path):
+        """완성된 라인 파싱"""
+        path = tmp_path / "s.jsonl"
+        path.write_text(usage_line("m1", "r1", "2025-01-01T00:00:00.000Z"))
+        record = LedgerRecord(project_name="-work-app")
+
+        assert parse_usage_tail(path, record) == 1
+        assert record.offset == path.stat().st_size
+        assert record.project_path == "/work/app"
+        assert record.earliest_timestamp == "2025-01-01T00:00:00.000Z"
+
+    def test_partial_line_not_consumed(self, tmp_path):
+        """쓰는 중인 마지막 라인은 다음 호출에서 다시 읽음"""
+        path = tmp_path / "s.jsonl"
+        first = usage_line("m1", "r1", "2025-01-01T00:00:00.000Z")
+        second = usage_line("m2", "r2", "2025-01-01T00:01:00.000Z")
+        path.write_text(first + second[:20])
+        record = LedgerRecord(project_name="-work-app")
+
+        assert parse_usage_tail(path, record) == 1
+        assert record.offset == len(first.encode())
+
+        path.write_text(first + second)
+        assert parse_usage_tail(path, record) == 1
+        assert record.offset == path.stat().st_size
+
+
+class TestGetAllUsageEntries:
+    """get_all_usage_entries 회귀 테스트"""
+
+    def test_matches_legacy_two_pass(self, tmp_path):
+        """단일 패스 결과가 기존 2-pass 결과와 동일"""
+        projects_dir = tmp_path / "projects"
+        write_synthetic_corpus(projects_dir)
+
+        entries = get_all_usage_entries(tmp_path)
+        legacy = legacy_usage_entries(projects_dir)
+
+        actual = [
+            (e.timestamp, e.model, e.input_tokens, e.output_tokens,
+             e.cache_creation_tokens, e.cache_read_tokens, e.cost, e.project_path)
+            for e in entries
+        ]
+        assert sorted(actual) == sorted(legacy)
+
+        stats = entry_stats(UsageService(), entries)
+        assert stats["total_tokens"] == sum(sum(e[2:6]) for e in legacy)
+        assert stats["total_cost"] == pytest.approx(sum(e[6] for e in legacy))
+        assert stats["total_sessions"] == len(legacy)
+
+
+class TestUsageTable:
+    """UsageTable 클래스 테스트"""
+
+    def test_columns_sorted_and_encoded(self, tmp_path):
+        """컬럼이 타임스탬프 순으로 정렬되고 문자열은 사전 인코딩"""
+        write_synthetic_corpus(tmp_path / "projects")
+        entries = get_all_usage_entries(tmp_path)
+        table = UsageTable()
+        table.rebuild(entries[: len(entries) // 2])
+        table.extend(list(reversed(entries[len(entries) // 2:])))
+
+        assert len(table) == len(entries)
+        assert list(table.timestamps) == sorted(table.timestamps)
+        assert len(table.models.values) == len({e.model for e in entries})
+        assert sum(table.output_tokens) == sum(e.output_tokens for e in entries)
+
+    def test_row_range(self):
+        """이진 탐색으로 구간 행 범위 계산"""
+        table = UsageTable()
+        table.rebuild([
+            UsageEntry(ts, "m", 1, 1, 0, 0, 0.0, "s", "/p", parse_timestamp_ms(ts))
+            for ts in ["2025-01-01T00:00:00.000Z", "2025-01-02T00:00:00.000Z",
+                       "2025-01-02T12:00:00.000Z", "2025-01-03T00:00:00.000Z"]
+        ])
+
+        rows = table.row_range(parse_timestamp_ms("2025-01-02"), parse_timestamp_ms("2025-01-03"))
+        assert rows == range(1, 4)
+        assert table.row_range(parse_timestamp_ms("2025-02-01"), parse_timestamp_ms("2025-03-01")) == range(4, 4)
+
+    def test_timestamp_round_trip(self):
+        """epoch 밀리초 변환이 원본 형식을 유지"""
+        ts = "2025-03-04T05:06:07.089Z"
+        assert format_timestamp_ms(parse_timestamp_ms(ts)) == ts
+        assert parse_timestamp_ms("2025-03-04T14:06:07.089+09:00") == parse_timestamp_ms(ts)
+        assert parse_timestamp_ms("") == NO_TIMESTAMP
+
+
+class TestUsageRollup:
+    """rollup 기반 통계 테스트"""
+
+    @pytest.mark.parametrize("start,end", [
+        ("2025-03-01", "2025-03-31"),
+        ("2025-03-05T13:30:00Z", "2025-03-20T08:15:00Z"),
+        ("2025-03-10T00:00:00", "2025-03-10T23:59:59"),
+        ("2025-04-01", "2025-04-30"),
+        ("2025-03-05T22:30:00+09:00", "2025-03-20T08:15:00-05:00"),
+    ])
+    def test_range_matches_entry_scan(self, usage_service, tmp_path, start, end):
+        """버킷 합산 결과가 엔트리 전체 스캔 결과와 동일"""
+        write_synthetic_corpus(tmp_path / "projects")
+        entries = usage_service.ledger.refresh(tmp_path / "projects")
+
+        lo = parse_timestamp_ms(start)
+        hi = parse_timestamp_ms(end)
+        filtered = [e for e in entries if lo <= e.timestamp_ms <= hi]
+
+        expected = entry_stats(usage_service, filtered)
+        assert rounded(usage_service.get_usage_by_date_range(start, end)) == rounded(expected)
+
+    def test_all_time_matches_entry_scan(self, usage_service, tmp_path):
+        """전체 기간 통계가 엔트리 전체 스캔 결과와 동일"""
+        write_synthetic_corpus(tmp_path / "projects")
+        entries = usage_service.ledger.refresh(tmp_path / "projects")
+
+        expected = entry_stats(usage_service, entries)
+        assert rounded(usage_service.get_usage_stats()) == rounded(expected)
+
+    def test_recent_days_uses_utc_window(self, usage_service, projects_dir):
+        """days 필터는 현재 UTC 시각 기준 최근 N일"""
+        now = datetime.now(timezone.utc)
+        path = projects_dir / "-work-app" / "s.jsonl"
+        path.write_text("".join(
+            usage_line(f"m{h}", f"r{h}", (now - timedelta(hours=h)).strftime("%Y-%m-%dT%H:%M:%S.000Z"))
+            for h in (1, 23, 25, 47, 49, 24 * 10)
+        ))
+
+        assert usage_service.get_usage_stats(days=1)["total_sessions"] == 2
+        assert usage_service.get_usage_stats(days=2)["total_sessions"] == 4
+        assert usage_service.get_usage_stats()["total_sessions"] == 6
+
+    def test_incremental_append(self, usage_service, projects_dir):
+        """추가된 엔트리만 버킷에 누적"""
+        path = projects_dir / "-work-app" / "s.jsonl"
+        path.write_text(usage_line("m1", "r1", "2025-01-01T00:00:00.000Z"))
+        assert usage_service.get_usage_stats()["total_sessions"] == 1
+
+        buckets = usage_service.rollup.buckets
+        with open(path, "a") as f:
+            f.write(usage_line("m2", "r2", "2025-01-01T00:01:00.000Z"))
+            f.write(usage_line("m3", "r3", "2025-01-02T00:00:00.000Z"))
+
+        stats = usage_service.get_usage_stats()
+        assert usage_service.rollup.buckets is buckets
+        assert stats["total_sessions"] == 3
+        assert [d["date"] for d in stats["by_date"]] == ["2025-01-02", "2025-01-01"]
+
+    def test_append_that_changes_dedupe_winner(self, usage_service, projects_dir):
+        """앞 순서 파일에 중복 엔트리가 추가되면 재병합"""
+        project = projects_dir / "-work-app"
+        early = project / "early.jsonl"
+        late = project / "late.jsonl"
+        early.write_text(usage_line("m0", "r0", "2025-01-01T00:00:00.000Z", cwd="/early"))
+        late.write_text(usage_line("m1", "r1", "2025-01-05T00:00:00.000Z", cwd="/late"))
+        usage_service.get_usage_stats()
+
+        with open(early, "a") as f:
+            f.write(usage_line("m1", "r1", "2025-01-05T00:00:00.000Z", cwd="/early"))
+
+        stats = usage_service.get_usage_stats()
+        assert stats["total_sessions"] == 2
+        assert [p["project_path"] for p in stats["by_project"]] == ["/early"]
+
+
+def block_entry(timestamp: str, tokens: int = 1000, cost: float = 1.0) -> UsageEntry:
+    return UsageEntry(timestamp, "claude-opus-4", tokens, 0, 0, 0, cost, "s", "/p",
+                      parse_timestamp_ms(timestamp))
+
+
+def block_table(*entries: UsageEntry) -> UsageTable:
+    table = UsageTable()
+    table.extend(list(entries))
+    return table
+
+
+class TestUsageBlockTracker:
+    """UsageBlockTracker 클래스 테스트"""
+
+    def test_blocks_split_on_end_and_gap(self):
+        """블록 종료 시각 또는 5시간 공백 이후 새 블록 시작"""
+        tracker = UsageBlockTracker(block_hours=5)
+        tracker.rebuild(block_table(
+            block_entry("2025-01-01T00:30:00.000Z"),
+            block_entry("2025-01-01T04:59:00.000Z"),
+            block_entry("2025-01-01T05:10:00.000Z"),
+            block_entry("2025-01-01T12:00:00.000Z"),
+        ))
+
+        assert [(b.start_ms, b.entry_count) for b in tracker.blocks] == [
+            (parse_timestamp_ms("2025-01-01T00:00:00Z"), 2),
+            (parse_timestamp_ms("2025-01-01T05:00:00Z"), 1),
+            (parse_timestamp_ms("2025-01-01T12:00:00Z"), 1),
+        ]
+
+    def test_current_block_burn_rate(self):
+        """현재 블록의 소진 속도와 예상 소진 시각"""
+        tracker = UsageBlockTracker(block_hours=5)
+        tracker.rebuild(block_table(block_entry("2025-01-01T10:00:00.000Z", tokens=6000, cost=3.0)))
+        tracker.extend([block_entry("2025-01-01T10:30:00.000Z", tokens=6000, cost=3.0)])
+
+        snapshot = tracker.snapshot(parse_timestamp_ms("2025-01-01T11:00:00Z"), token_limit=24000)
+        current = snapshot["current"]
+
+        assert current["total_tokens"] == 12000
+        assert current["remaining_minutes"] == 240
+        assert current["burn_rate"]["tokens_per_minute"] == 200
+        assert current["burn_rate"]["cost_per_hour"] == pytest.approx(6.0)
+        assert current["projection"]["total_tokens"] == 12000 + 200 * 240
+        assert current["exhausts_at"] == "2025-01-01T12:00:00.000Z"
+
+    def test_no_current_block_after_expiry(self):
+        """블록이 끝나면 current 없음"""
+        tracker = UsageBlockTracker(block_hours=5)
+        tracker.rebuild(block_table(block_entry("2025-01-01T10:00:00.000Z")))
+
+        snapshot = tracker.snapshot(parse_timestamp_ms("2025-01-01T16:00:00Z"))
+        assert snapshot["current"] is None
+        assert len(snapshot["recent"]) == 1
+
+    def test_untimestamped_entry_does_not_rebuild(self, monkeypatch):
+        """타임스탬프 없는 엔트리는 과거 엔트리로 보지 않고 건너뜀"""
+        tracker = UsageBlockTracker(block_hours=5)
+        tracker.rebuild(block_table(block_entry("2025-01-01T10:00:00.000Z")))
+        monkeypatch.setattr(tracker, "rebuild", lambda table: pytest.fail("rebuild called"))
+
+        untimestamped = block_entry("2025-01-01T10:10:00.000Z")
+        untimestamped.timestamp_ms = NO_TIMESTAMP
+        tracker.extend([untimestamped, block_entry("2025-01-01T10:30:00.000Z")])
+
+        assert [b.entry_count for b in tracker.blocks] == [2]
+
+    def test_out_of_order_extend_rebuilds(self):
+        """과거 엔트리가 들어오면 ledger 테이블로 재계산"""
+        table = block_table(block_entry("2025-01-01T10:00:00.000Z"))
+        tracker = UsageBlockTracker(block_hours=5)
+        tracker.rebuild(table)
+
+        older = block_entry("2025-01-01T04:00:00.000Z")
+        table.extend([older])
+        tracker.extend([older])
+
+        assert [b.start_ms for b in tracker.blocks] == [
+            parse_timestamp_ms("2025-01-01T04:00:00Z"),
+            parse_timestamp_ms("2025-01-01T10:00:00Z"),
+        ]
+
+
+class TestUsageDeltaFeed:
+    """usage 증분 이벤트 테스트"""
+
+    def test_appended_entries_emitted_once(self, usage_service, projects_dir):
+        """구독 시작 시점이 기준선, 이후 추가분만 한 번씩 이벤트로 반환"""
+        path = projects_dir / "-work-app" / "s.jsonl"
+        path.write_text(usage_line("m1", "r1", "2025-01-01T00:00:00.000Z"))
+        usage_service.start_usage_feed()
+        assert usage_service.poll_usage_delta() is None
+
+        with open(path, "a") as f:
+            f.write(usage_line("m2", "r2", "2025-01-01T00:01:00.000Z", output_tokens=20))
+            f.write(usage_line("m1", "r1", "2025-01-01T00:02:00.000Z"))
+
+        event = usage_service.poll_usage_delta()
+        assert event["type"] == "usage_delta"
+        assert [e["timestamp"] for e in event["entries"]] == ["2025-01-01T00:01:00.000Z"]
+        assert event["totals"]["count"] == 1
+        assert event["totals"]["output_tokens"] == 20
+        assert usage_service.poll_usage_delta() is None
+
+    def test_entries_merged_by_other_refresh_not_lost(self, usage_service, projects_dir):
+        """HTTP 요청이 먼저 refresh해도 증분은 다음 poll에서 전달"""
+        path = projects_dir / "-work-app" / "s.jsonl"
+        path.write_text(usage_line("m1", "r1", "2025-01-01T00:00:00.000Z"))
+        usage_service.start_usage_feed()
+
+        with open(path, "a") as f:
+            f.write(usage_line("m2", "r2", "2025-01-01T00:01:00.000Z"))
+        usage_service.get_usage_stats()
+
+        assert usage_service.poll_usage_delta()["totals"]["count"] == 1
+
+    def test_rebuild_emits_reset(self, usage_service, projects_dir):
+        """전체 재병합 후에는 usage_reset 이벤트"""
+        path = projects_dir / "-work-app" / "s.jsonl"
+        path.write_text(usage_line("m1", "r1", "2025-01-01T00:00:00.000Z"))
+        usage_service.start_usage_feed()
+
+        # 기존 파일보다 이른 파일은 파일 순서를 바꾸므로 재병합
+        (projects_dir / "-work-app" / "t.jsonl").write_text(
+            usage_line("m2", "r2", "2024-12-31T00:00:00.000Z"))
+
+        assert usage_service.poll_usage_delta() == {"type": "usage_reset"}
+        assert usage_service.poll_usage_delta() is None
+
+    def test_new_later_file_emits_delta(self, usage_service, projects_dir):
+        """새 세션 파일이 기존 파일보다 뒤 순서이면 재병합 없이 증분 이벤트"""
+        path = projects_dir / "-work-app" / "s.jsonl"
+        path.write_text(usage_line("m1", "r1", "2025-01-01T00:00:00.000Z"))
+        usage_service.start_usage_feed()
+
+        (projects_dir / "-work-app" / "t.jsonl").write_text(
+            usage_line("m2", "r2", "2025-01-02T00:00:00.000Z", output_tokens=20))
+
+        event = usage_service.poll_usage_delta()
+        assert event["type"] == "usage_delta"
+        assert event["totals"]["output_tokens"] == 20
+
+    def test_stats_then_subscribe_not_resent(self, usage_service, projects_dir):
+        """구독 전에 통계로 받은 엔트리는 구독 후 증분으로 다시 보내지 않음"""
+        path = projects_dir / "-work-app" / "s.jsonl"
+        path.write_text(usage_line("m1", "r1", "2025-01-01T00:00:00.000Z"))
+        usage_service.get_usage_stats()
+        with open(path, "a") as f:
+            f.write(usage_line("m2", "r2", "2025-01-01T00:01:00.000Z"))
+        assert usage_service.get_usage_stats()["total_sessions"] == 2
+
+        usage_service.start_usage_feed()
+        assert usage_service.poll_usage_delta() is None
+
+        with open(path, "a") as f:
+            f.write(usage_line("m3", "r3", "2025-01-01T00:02:00.000Z"))
+        assert usage_service.poll_usage_delta()["totals"]["count"] == 1
+
+    def test_not_collected_without_subscriber(self, usage_service, projects_dir):
+        """구독자가 없는 동안에는 변경을 쌓아 두지 않음"""
+        path = projects_dir / "-work-app" / "s.jsonl"
+        path.write_text(usage_line("m1", "r1", "2025-01-01T00:00:00.000Z"))
+        usage_service.start_usage_feed()
+        usage_service.stop_usage_feed()
+
+        for i in range(3):
+            with open(path, "a") as f:
+                f.write(usage_line(f"m{i + 2}", f"r{i + 2}", "2025-01-01T00:01:00.000Z"))
+            usage_service.get_usage_stats()
+
+        assert usage_service.feed._pending == []
+
+
+class TestPrefilter:
+    """바이트 단위 usage prefilter 테스트"""
+
+    def test_same_result_as_full_decode(self, tmp_path):
+        """prefilter 사용 여부와 관계없이 같은 결과"""
+        path = tmp_path / "s.jsonl"
+        path.write_text(
+            json.dumps({"type": "user", "timestamp": "2025-01-01T00:00:00.000Z",
+                        "cwd": "C:\\work\\\"app\"", "message": {"content": "hi"}}) + "\n"
+            + usage_line("m1", "r1", "2025-01-02T00:00:00.000Z", cwd="/other")
+        )
+
+        fast = LedgerRecord(project_name="-work-app")
+        slow = LedgerRecord(project_name="-work-app")
+        parse_usage_tail(path, fast)
+        parse_usage_tail(path, slow, prefilter=False)
+
+        assert fast == slow
+        assert fast.project_path == 'C:\\work\\"app"'
+        assert fast.earliest_timestamp == "2025-01-01T00:00:00.000Z"
+
+    def test_partial_line_without_marker_not_skipped(self, tmp_path):
+        """usage 키 앞에서 잘린 마지막 라인은 소비하지 않음"""
+        path = tmp_path / "s.jsonl"
+        line = usage_line("m1", "r1", "2025-01-01T00:00:00.000Z")
+        path.write_text(line[:line.index('"usage"')])
+        record = LedgerRecord(project_name="-work-app")
+
+        assert parse_usage_tail(path, record) == 0
+        assert record.offset == 0
+
+        path.write_text(line)
+        assert parse_usage_tail(path, record) == 1
+
+
+class TestUsageLedger:
+    """UsageLedger 클래스 테스트"""
+
+    def test_refresh_parses_appended_tail_only(self, projects_dir):
+        """추가된 바이트만 파싱"""
+        path = projects_dir / "-work-app" / "s.jsonl"
+        path.write_text(usage_line("m1", "r1", "2025-01-01T00:00:00.000Z"))
+        ledger = UsageLedger()
+
+        assert len(ledger.refresh(projects_dir)) == 1
+        record = ledger._records[str(path)]
+        consumed = record.offset
+
+        with open(path, "a") as f:
+            f.write(usage_line("m2", "r2", "2025-01-01T00:01:00.000Z"))
+
+        entries = ledger.refresh(projects_dir)
+        assert len(entries) == 2
+        assert ledger._records[str(path)] is record
+        assert record.offset > consumed
+
+    def test_truncated_file_rescanned(self, projects_dir):
+        """잘린 파일은 처음부터 다시 파싱"""
+        path = projects_dir / "-work-app" / "s.jsonl"
+        path.write_text(
+            usage_line("m1", "r1", "2025-01-01T00:00:00.000Z")
+            + usage_line("m2", "r2", "2025-01-01T00:01:00.000Z")
+        )
+        ledger = UsageLedger()
+        assert len(ledger.refresh(projects_dir)) == 2
+
+        path.write_text(usage_line("m3", "r3", "2025-01-02T00:00:00.000Z"))
+        entries = ledger.refresh(projects_dir)
+        assert [e.timestamp for e in entries] == ["2025-01-02T00:00:00.000Z"]
+
+    def test_replaced_file_rescanned(self, projects_dir):
+        """내용이 교체되며 커진 파일은 처음부터 다시 파싱"""
+        path = projects_dir / "-work-app" / "s.jsonl"
+        path.write_text(usage_line("m1", "r1", "2025-01-01T00:00:00.000Z"))
+        ledger = UsageLedger()
+        ledger.refresh(projects_dir)
+
+        path.write_text(
+            json.dumps({"type": "summary", "summary": "replaced"}) + "\n"
+            + usage_line("m8", "r8", "2025-02-01T00:00:00.000Z", output_tokens=99)
+            + usage_line("m9", "r9", "2025-02-01T00:01:00.000Z")
+        )
+        entries = ledger.refresh(projects_dir)
+        assert [e.output_tokens for e in entries] == [99, 10]
+
+    def test_removed_file_dropped(self, projects_dir):
+        """삭제된 파일의 엔트리 제거"""
+        path = projects_dir / "-work-app" / "s.jsonl"
+        path.write_text(usage_line("m1", "r1", "2025-01-01T00:00:00.000Z"))
+        ledger = UsageLedger()
+        assert len(ledger.refresh(projects_dir)) == 1
+
+        path.unlink()
+        assert len(ledger.refresh(projects_dir)) == 0
+
+    def test_refresh_paths_checks_only_given_files(self, projects_dir):
+        """지정한 파일만 확인 (추가/생성/삭제 반영, 다른 파일의 변경은 다음 전체 스캔까지 보류)"""
+        project = projects_dir / "-work-app"
+        path = project / "s.jsonl"
+        other = project / "o.jsonl"
+        path.write_text(usage_line("m1", "r1", "2025-01-01T00:00:00.000Z"))
+        other.write_text(usage_line("m9", "r9", "2025-01-01T00:00:00.000Z"))
+        ledger = UsageLedger()
+        ledger.refresh(projects_dir)
+
+        with open(path, "a") as f:
+            f.write(usage_line("m2", "r2", "2025-01-01T00:01:00.000Z"))
+        with open(other, "a") as f:
+            f.write(usage_line("m8", "r8", "2025-01-01T00:01:00.000Z"))
+        created = project / "t.jsonl"
+        created.write_text(usage_line("m3", "r3", "2025-01-02T00:00:00.000Z"))
+        assert len(ledger.refresh_paths(projects_dir, [path, created])) == 4
+
+        created.unlink()
+        assert len(ledger.refresh_paths(projects_dir, [created])) == 3
+        assert len(ledger.refresh(projects_dir)) == 4
+
+    def test_new_later_file_appended_without_rebuild(self, projects_dir, monkeypatch):
+        """기존 파일보다 뒤 순서인 새 파일은 전체 재병합 없이 이어 병합"""
+        project = projects_dir / "-work-app"
+        (project / "a.jsonl").write_text(
+            usage_line("m1", "r1", "2025-01-01T00:00:00.000Z")
+            + usage_line("m2", "r2", "2025-01-03T00:00:00.000Z")
+        )
+        ledger = UsageLedger()
+        ledger.refresh(projects_dir)
+        rebuilds = []
+        rebuild = ledger._rebuild
+        monkeypatch.setattr(ledger, "_rebuild", lambda: rebuilds.append(1) or rebuild())
+
+        # 이어 쓰기된 세션(m2 중복)과 새 세션 두 개
+        (project / "b.jsonl").write_text(
+            usage_line("m3", "r3", "2025-01-02T00:00:00.000Z")
+            + usage_line("m2", "r2", "2025-01-03T00:00:00.000Z", cwd="/later")
+        )
+        (project / "c.jsonl").write_text(usage_line("m4", "r4", "2025-01-02T12:00:00.000Z"))
+        table = ledger.refresh(projects_dir)
+        assert rebuilds == []
+        assert list(table) == list(UsageLedger().refresh(projects_dir))
+        assert len(table) == 4
+        assert "/later" not in {e.project_path for e in table}
+
+        # 기존 파일보다 이른 새 파일은 파일 순서가 바뀌므로 재병합
+        (project / "d.jsonl").write_text(usage_line("m2", "r2", "2024-12-31T00:00:00.000Z", cwd="/first"))
+        table = ledger.refresh(projects_dir)
+        assert rebuilds == [1]
+        assert list(table) == list(UsageLedger().refresh(projects_dir))
+        assert "/first" in {e.project_path for e in table}
+
+    def test_refresh_paths_nested_file(self, projects_dir):
+        """변경 피드의 하위 디렉토리 파일(NESTED_CHANGED)도 전체 스캔과 같은 프로젝트로 반영"""
+        path = projects_dir / "-work-app" / "s.jsonl"
+        path.write_text(usage_line("m1", "r1", "2025-01-01T00:00:00.000Z"))
+        ledger = UsageLedger()
+        ledger.refresh(projects_dir)
+
+        nested = projects_dir / "-work-app" / "s" / "subagents" / "agent-a1.jsonl"
+        nested.parent.mkdir(parents=True)
+        nested.write_text(usage_line("m2", "r2", "2025-01-02T00:00:00.000Z"))
+        assert len(ledger.refresh_paths(projects_dir, [nested])) == 2
+        assert ledger._records[str(nested)].project_name == "-work-app"
+        assert list(ledger.table) == list(UsageLedger().refresh(projects_dir))
+
+    def test_duplicates_removed_across_files(self, projects_dir):
+        """파일 간 중복 엔트리 제거 (가장 이른 파일 우선)"""
+        project = projects_dir / "-work-app"
+        (project / "a.jsonl").write_text(
+            usage_line("m1", "r1", "2025-01-02T00:00:00.000Z", cwd="/later")
+        )
+        (project / "b.jsonl").write_text(
+            usage_line("m0", "r0", "2025-01-01T00:00:00.000Z", cwd="/earlier")
+            + usage_line("m1", "r1", "2025-01-02T00:00:00.000Z", cwd="/earlier")
+        )
+
+        entries = UsageLedger().refresh(projects_dir)
+        assert len(entries) == 2
+        assert {e.project_path for e in entries} == {"/earlier"}
+
+    def test_rows_stored_columnar(self, projects_dir):
+        """파일별 row와 병합 결과를 UsageEntry 객체 없이 컬럼으로 보관"""
+        path = projects_dir / "-work-app" / "s.jsonl"
+        path.write_text(
+            usage_line("m1", "r1", "2025-01-01T00:00:00.000Z")
+            + usage_line("m2", "r2", "2025-01-01T00:01:00.000Z", output_tokens=0).replace(
+                '"input_tokens": 100', '"input_tokens": 0')
+            + usage_line("m1", "r1", "2025-01-01T00:02:00.000Z")
+        )
+        ledger = UsageLedger()
+
+        table = ledger.refresh(projects_dir)
+        rows = ledger._records[str(path)].rows
+        assert table is ledger.table
+        assert isinstance(rows, UsageRows)
+        assert rows.models == ["claude-sonnet-4-20250514", None, "claude-sonnet-4-20250514"]
+        assert rows.entry(1) is None
+        assert len(table) == 1
+        assert table.entry(0) == rows.entry(0)
+
+    def test_parallel_matches_serial(self, tmp_path, monkeypatch):
+        """프로세스 풀 파싱 결과가 직렬 파싱과 동일"""
+        projects_dir = tmp_path / "projects"
+        write_synthetic_corpus(projects_dir)
+        monkeypatch.setattr(config, "USAGE_PARALLEL_MIN_BYTES", 0)
+
+        serial = UsageLedger(workers=1).refresh(projects_dir)
+        parallel = UsageLedger(workers=2).refresh(projects_dir)
+        assert list(parallel) == list(serial)
+
+    def test_workers_spawned_not_forked(self, tmp_path, monkeypatch):
+        """스레드가 있는 서버 프로세스를 fork하지 않도록 spawn 컨텍스트 사용"""
+        projects_dir = tmp_path / "projects"
+        write_synthetic_corpus(projects_dir)
+        monkeypatch.setattr(config, "USAGE_PARALLEL_MIN_BYTES", 0)
+        contexts = []
+        pool_class = usage_module.ProcessPoolExecutor
+
+        def spy(*args, **kwargs):
+            contexts.append(kwargs.get("mp_context"))
+            return pool_class(*args, **kwargs)
+
+        monkeypatch.setattr(usage_module, "ProcessPoolExecutor", spy)
+        UsageLedger(workers=2).refresh(projects_dir)
+        assert [ctx.get_start_method() for ctx in contexts] == ["spawn"]
+
+    def test_persisted_across_instances(self, projects_dir, tmp_path):
+        """재시작 후에도 ledger 유지"""
+        path = projects_dir / "-work-app" / "s.jsonl"
+        path.write_text(usage_line("m1", "r1", "2025-01-01T00:00:00.000Z"))
+        storage = tmp_path / "ledger.db"
+
+        UsageLedger(storage).refresh(projects_dir)
+        assert storage.exists()
+
+        ledger = UsageLedger(storage)
+        ledger._load()
+        record = ledger._records[str(path)]
+        assert record.offset == path.stat().st_size
+        assert len(ledger.refresh(projects_dir)) == 1
+
+    def test_append_writes_only_new_rows(self, projects_dir, tmp_path):
+        """추가분만 파싱된 refresh는 새 row만 저장하고 다른 파일은 다시 쓰지 않음"""
+        project = projects_dir / "-work-app"
+        path = project / "s.jsonl"
+        path.write_text(usage_line("m1", "r1", "2025-01-01T00:00:00.000Z"))
+        (project / "t.jsonl").write_text(
+            "".join(usage_line(f"m{i}", f"t{i}", "2025-01-02T00:00:00.000Z") for i in range(50))
+        )
+        storage = tmp_path / "ledger.db"
+        ledger = UsageLedger(storage)
+        ledger.refresh(projects_dir)
+        conn = ledger._store._conn
+        before = conn.total_changes
+
+        with open(path, "a") as f:
+            f.write(usage_line("m2", "r2", "2025-01-01T00:01:00.000Z"))
+        ledger.refresh(projects_dir)
+
+        # files 1행 갱신 + rows 1행 추가
+        assert conn.total_changes - before == 2
+
+        ledger.refresh(projects_dir)
+        assert conn.total_changes - before == 2
+
+        restored = UsageLedger(storage)
+        restored._load()
+        assert restored._records == ledger._records
+        assert len(restored.refresh(projects_dir)) == 52
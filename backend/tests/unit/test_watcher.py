@@ -0,0 +1,302 @@
+"""WatcherService 단위 테스트"""
+
+import asyncio
+import json
+import time
+
+from config import config
+from services.change_feed import ChangeEvent, ChangeFeed, SESSION_APPENDED, RESYNC
+from services.locator import SessionLocator
+from services.watcher import FileTailer, WatcherService
+
+
+class FakeUsageService:
+    """poll 횟수를 세는 UsageService 대역"""
+
+    def __init__(self):
+        self.polls = 0
+        self.feeding = False
+        self.refreshed = []
+
+    def start_usage_feed(self):
+        self.feeding = True
+
+    def stop_usage_feed(self):
+        self.feeding = False
+
+    def poll_usage_delta(self, paths=None):
+        self.polls += 1
+        self.refreshed.append(paths)
+        return {"type": "usage_delta", "poll": self.polls}
+
+
+class TestWatchUsage:
+    """usage 감시 태스크 공유 테스트"""
+
+    async def test_single_poller_fans_out(self, monkeypatch, tmp_path):
+        """구독자가 여럿이어도 poll은 한 번씩만 수행"""
+        monkeypatch.setattr(config, "USAGE_WATCH_INTERVAL", 0.01)
+        watcher = WatcherService()
+        watcher.locator = SessionLocator(tmp_path / "projects", watch=False)
+        usage = FakeUsageService()
+        received = {"a": [], "b": []}
+
+        async def collect(name):
+            async def callback(event):
+                received[name].append(event["poll"])
+            return callback
+
+        tasks = [
+            asyncio.create_task(watcher.watch_usage(usage, await collect(name)))
+            for name in received
+        ]
+        await asyncio.sleep(0.1)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # 두 구독자가 같은 poll 결과를 받음 (취소 시점에 진행 중이던 poll은 제외)
+        assert received["a"] == received["b"]
+        assert received["a"] == list(range(1, len(received["a"]) + 1))
+        assert usage.polls - len(received["a"]) <= 1
+        assert watcher._channel_tasks == {}
+
+        polls = usage.polls
+        await asyncio.sleep(0.05)
+        assert usage.polls == polls
+        assert not usage.feeding
+
+    async def test_change_events_drive_refresh(self, monkeypatch, tmp_path):
+        """변경 피드가 동작 중이면 이벤트가 온 파일만 갱신하고 주기적 전체 스캔은 하지 않음"""
+        monkeypatch.setattr(config, "USAGE_WATCH_INTERVAL", 0.01)
+        feed = ChangeFeed()
+        feed.active = True
+        watcher = WatcherService()
+        watcher.locator = SessionLocator(tmp_path / "projects", watch=False, feed=feed)
+        usage = FakeUsageService()
+        received = []
+
+        async def callback(event):
+            received.append(event)
+
+        task = asyncio.create_task(watcher.watch_usage(usage, callback))
+        await asyncio.sleep(0.05)
+        assert usage.feeding
+        assert usage.polls == 0
+
+        path = tmp_path / "projects" / "-work-app" / "s.jsonl"
+        feed.publish([ChangeEvent(SESSION_APPENDED, path, "-work-app")])
+        await asyncio.sleep(0.05)
+        feed.publish([ChangeEvent(RESYNC)])
+        await asyncio.sleep(0.05)
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0.05)
+        assert usage.refreshed == [[path], None]
+        assert len(received) == 2
+        assert feed._subscribers == []
+
+
+def agent_line(session_id, agent_id, text):
+    return json.dumps({"type": "user", "sessionId": session_id, "agentId": agent_id,
+                       "message": {"content": text}}) + "\n"
+
+
+def user_line(text):
+    return json.dumps({"type": "user", "message": {"content": text}}, ensure_ascii=False) + "\n"
+
+
+class TestFileTailer:
+    """미완성 라인 버퍼링 tailer 테스트"""
+
+    def test_partial_lines_carried_over(self, tmp_path):
+        """줄 중간(멀티바이트 문자 중간 포함)에서 flush되어도 완성된 라인만 한 번씩 반환"""
+        path = tmp_path / "s1.jsonl"
+        path.write_bytes(b"")
+        tailer = FileTailer.at_end(path)
+        data = (user_line("first") + user_line("한글 메시지")).encode()
+        cut = data.index("글".encode()) + 1
+
+        chunks = [(data[:10], []), (data[10:cut], ["first"]), (data[cut:-1], []), (data[-1:], ["한글 메시지"])]
+        with open(path, "ab") as f:
+            for chunk, expected in chunks:
+                f.write(chunk)
+                f.flush()
+                assert [json.loads(line)["message"]["content"] for line in tailer.read_lines()] == expected
+
+        assert tailer.pos == len(data)
+        assert tailer.read_lines() == []
+
+    def test_truncated_file_restarts_at_new_end(self, tmp_path):
+        path = tmp_path / "s1.jsonl"
+        path.write_text(user_line("one") + user_line("two"))
+        tailer = FileTailer(path)
+        assert len(tailer.read_lines()) == 2
+
+        path.write_text(user_line("new"))
+        assert tailer.read_lines() == []
+        with open(path, "a") as f:
+            f.write(user_line("three"))
+        assert [json.loads(line)["message"]["content"] for line in tailer.read_lines()] == ["three"]
+
+
+class TestWatchAgents:
+    """에이전트 감시 테스트"""
+
+    async def test_streams_new_lines_of_session_agents(self, tmp_path, monkeypatch):
+        """기존 에이전트는 추가된 라인만, 새 에이전트는 처음부터 전송"""
+        monkeypatch.setattr(config, "WATCH_INTERVAL", 0.01)
+        monkeypatch.setattr(config, "LOCATOR_RESCAN_INTERVAL", 0)
+        project = tmp_path / "projects" / "-work-app"
+        project.mkdir(parents=True)
+        (project / "s1.jsonl").write_text("")
+        (project / "agent-a1.jsonl").write_text(agent_line("s1", "a1", "old task"))
+        (project / "agent-b2.jsonl").write_text(agent_line("other", "b2", "other task"))
+
+        watcher = WatcherService()
+        watcher.locator = SessionLocator(tmp_path / "projects", watch=False)
+        events = []
+
+        async def callback(event):
+            events.append(event)
+
+        task = asyncio.create_task(watcher.watch_agents("s1", callback))
+        await asyncio.sleep(0.05)
+        with open(project / "agent-a1.jsonl", "a") as f:
+            f.write(agent_line("s1", "a1", "more"))
+        (project / "agent-c3.jsonl").write_text(agent_line("s1", "c3", "new task"))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        summary = [(e["type"], e["agent_id"], e.get("message", {}).get("content")) for e in events]
+        assert sorted(summary, key=str) == sorted([
+            ("agent_message", "a1", "more"),
+            ("agent_new", "c3", None),
+            ("agent_message", "c3", "new task"),
+        ], key=str)
+
+
+class TestSubscribeSession:
+    """세션 감시 태스크 공유 테스트"""
+
+    async def test_one_tailer_per_session(self, tmp_path, monkeypatch):
+        """구독자가 여럿이어도 새 라인은 한 번만 파싱하고 각 구독자에게 한 번씩 전달"""
+        monkeypatch.setattr(config, "WATCH_INTERVAL", 0.01)
+        project = tmp_path / "projects" / "-work-app"
+        project.mkdir(parents=True)
+        session_file = project / "s1.jsonl"
+        session_file.write_text("")
+
+        watcher = WatcherService()
+        watcher.locator = SessionLocator(tmp_path / "projects", watch=False)
+        parsed = []
+        parse_line = watcher.parser.parse_line
+
+        def spy(line):
+            parsed.append(line)
+            return parse_line(line)
+
+        monkeypatch.setattr(watcher.parser, "parse_line", spy)
+        received = {"a": [], "b": []}
+
+        def collect(name):
+            async def callback(event):
+                received[name].append(event["content"])
+            return callback
+
+        tasks = [
+            asyncio.create_task(watcher.subscribe_session("s1", collect(name)))
+            for name in received
+        ]
+        await asyncio.sleep(0.05)
+        assert len(watcher._channel_tasks) == 1
+
+        with open(session_file, "a") as f:
+            f.write(json.dumps({"type": "user", "message": {"content": "hello"}}) + "\n")
+        await asyncio.sleep(0.1)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert received == {"a": ["hello"], "b": ["hello"]}
+        assert len(parsed) == 1
+        assert watcher._channel_tasks == {}
+        assert watcher._channels == {}
+
+
+class TestPartialLineWatch:
+    """쓰기 도중 감시해도 메시지가 사라지지 않는지 테스트"""
+
+    async def test_line_flushed_mid_write_delivered_once(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "WATCH_INTERVAL", 0.01)
+        project = tmp_path / "projects" / "-work-app"
+        project.mkdir(parents=True)
+        session_file = project / "s1.jsonl"
+        session_file.write_text("")
+
+        watcher = WatcherService()
+        watcher.locator = SessionLocator(tmp_path / "projects", watch=False)
+        received = []
+
+        async def callback(event):
+            received.append(event["content"])
+
+        task = asyncio.create_task(watcher.watch_session("s1", callback))
+        await asyncio.sleep(0.05)
+
+        line = user_line("긴 도구 결과 " * 50)
+        with open(session_file, "a") as f:
+            for i in range(0, len(line), 97):
+                f.write(line[i:i + 97])
+                f.flush()
+                await asyncio.sleep(0.02)
+            f.write(user_line("next"))
+        await asyncio.sleep(0.1)
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert received == [json.loads(line)["message"]["content"], "next"]
+
+
+class TestEventDrivenWatch:
+    """파일시스템 이벤트 기반 감시 테스트"""
+
+    async def test_events_wake_tailer_without_polling(self, tmp_path, monkeypatch):
+        """폴링 주기/안전 확인 간격이 길어도 파일 변경 이벤트로 바로 전달"""
+        monkeypatch.setattr(config, "WATCH_MODE", "events")
+        monkeypatch.setattr(config, "WATCH_INTERVAL", 60)
+        monkeypatch.setattr(config, "WATCH_EVENT_TIMEOUT", 60)
+        project = tmp_path / "projects" / "-work-app"
+        project.mkdir(parents=True)
+        session_file = project / "s1.jsonl"
+        session_file.write_text("")
+
+        watcher = WatcherService()
+        watcher.locator = SessionLocator(tmp_path / "projects")
+        received = []
+
+        async def callback(event):
+            received.append(event["content"])
+
+        task = asyncio.create_task(watcher.subscribe_session("s1", callback))
+        try:
+            # 감시 스레드가 시작될 때까지 라인 추가를 반복
+            deadline = time.monotonic() + 10
+            while not received and time.monotonic() < deadline:
+                with open(session_file, "a") as f:
+                    f.write(json.dumps({"type": "user", "message": {"content": "ping"}}) + "\n")
+                await asyncio.sleep(0.2)
+            assert received and set(received) == {"ping"}
+            assert watcher.locator.watching()
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            watcher.locator.close()
+
+        # 취소된 감시 태스크가 정리될 때까지 양보
+        await asyncio.sleep(0.05)
+        assert watcher.locator._listeners == {}
@@ -0,0 +1,138 @@
+"""WebSocket 송신 큐 단위 테스트"""
+
+import asyncio
+
+import pytest
+
+from api.websocket import ClientSender, ConnectionManager
+
+RESYNC = {"type": "resync"}
+
+
+class FakeWebSocket:
+    """gate가 열릴 때까지 전송이 막히는 느린 클라이언트 대역"""
+
+    def __init__(self, blocked=False):
+        self.frames = []
+        self.gate = asyncio.Event()
+        if not blocked:
+            self.gate.set()
+        self.close_code = None
+        self.close_calls = 0
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        await self.gate.wait()
+        self.frames.append(data)
+
+    async def send_text(self, text):
+        await self.send_json(text)
+
+    async def close(self, code=1000):
+        self.close_calls += 1
+        self.close_code = code
+
+
+async def fill_while_blocked(policy, count=7, maxsize=3):
+    """첫 메시지 전송이 막힌 동안 count개를 넣은 sender"""
+    websocket = FakeWebSocket(blocked=True)
+    sender = ClientSender(websocket, RESYNC, maxsize=maxsize, policy=policy)
+    sender.start()
+    sender.put(1)
+    await asyncio.sleep(0)  # writer가 1을 꺼내 전송 중 대기
+    for i in range(2, count + 1):
+        sender.put(i)
+    return websocket, sender
+
+
+class TestClientSender:
+    """송신 큐 overflow 정책 테스트"""
+
+    async def test_drop_oldest(self):
+        websocket, sender = await fill_while_blocked("drop_oldest")
+        assert sender.stats()["queue_depth"] == 3
+
+        websocket.gate.set()
+        await asyncio.sleep(0.01)
+        assert websocket.frames == [1, 5, 6, 7]
+        assert sender.stats() == {"queue_depth": 0, "max_depth": 3, "sent": 4, "dropped": 3,
+                                  "collapsed": 0, "evicted": False}
+        sender.close()
+
+    async def test_collapse_replaces_backlog_with_resync(self):
+        websocket, sender = await fill_while_blocked("collapse")
+        websocket.gate.set()
+        await asyncio.sleep(0.01)
+        assert websocket.frames == [1, RESYNC]
+        assert sender.collapsed == 1
+        assert sender.dropped == 6
+
+        # resync를 보낸 뒤에는 다시 정상 전송
+        sender.put(8)
+        await asyncio.sleep(0.01)
+        assert websocket.frames == [1, RESYNC, 8]
+        sender.close()
+
+    async def test_disconnect_evicts_slow_client(self):
+        websocket, sender = await fill_while_blocked("disconnect", count=5)
+        await asyncio.sleep(0.01)
+        assert sender.evicted
+        assert sender.closed
+        assert websocket.close_code == 1013
+
+        sender.put(6)
+        assert sender.stats()["queue_depth"] == 0
+
+    async def test_disconnect_evicts_once(self):
+        """overflow 뒤에 계속 put해도 eviction은 한 번만 수행"""
+        websocket, sender = await fill_while_blocked("disconnect", count=9)
+        await asyncio.sleep(0.01)
+        assert websocket.close_calls == 1
+        assert sender.dropped == 3
+
+        manager = ConnectionManager()
+        manager.active_connections["s1"] = [sender]
+        manager.disconnect(sender, "s1")
+        assert manager.get_stats()["total_evicted"] == 1
+
+    async def test_batches_within_window(self):
+        websocket = FakeWebSocket()
+        sender = ClientSender(websocket, RESYNC, batch_window=0.05, batch_max=3)
+        sender.start()
+        for i in range(1, 6):
+            sender.put(i)
+        await asyncio.sleep(0.1)
+        assert websocket.frames == [[1, 2, 3], [4, 5]]
+        sender.close()
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            ClientSender(FakeWebSocket(), RESYNC, policy="block")
+
+
+class TestConnectionManager:
+    """느린 연결이 다른 연결을 막지 않는지 테스트"""
+
+    async def test_slow_client_does_not_stall_others(self):
+        manager = ConnectionManager()
+        slow, fast = FakeWebSocket(blocked=True), FakeWebSocket()
+        slow_sender = await manager.connect(slow, "s1", resync_message=RESYNC, maxsize=2, policy="drop_oldest")
+        fast_sender = await manager.connect(fast, "s1", resync_message=RESYNC, maxsize=2, policy="drop_oldest")
+
+        for i in range(10):
+            await manager.broadcast("s1", i)
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+
+        assert fast.frames == list(range(10))
+        assert slow.frames == []
+        stats = manager.get_stats()
+        assert stats["total_connections"] == 2
+        assert stats["total_queued"] == 2
+
+        manager.disconnect(slow_sender, "s1")
+        manager.disconnect(fast_sender, "s1")
+        assert manager.get_stats()["total_dropped"] == 7
+        assert manager.active_connections == {}
@@ -16,17 +16,29 @@ import { ToolCall } from './ToolCall';
 
 interface BackgroundAgentPanelProps {
   agents: AgentLog[];
+  onLoadAgent: (agentId: string) => void;
+  onLoadOlder: (agentId: string, before: string) => Promise<void>;
   isCollapsed: boolean;
   onToggleCollapse: () => void;
 }
 
 export function BackgroundAgentPanel({
   agents,
+  onLoadAgent,
+  onLoadOlder,
   isCollapsed,
   onToggleCollapse,
 }: BackgroundAgentPanelProps) {
   const [expandedAgents, setExpandedAgents] = useState<Set<string>>(new Set());
-  const [fullScreenAgent, setFullScreenAgent] = useState<AgentLog | null>(null);
+  const [fullScreenAgentId, setFullScreenAgentId] = useState<string | null>(null);
+  const fullScreenAgent = agents.find((agent) => agent.agent_id === fullScreenAgentId) ?? null;
+
+  // 요약만 받은 에이전트는 처음 펼칠 때 메시지를 로드
+  const ensureLoaded = (agent: AgentLog) => {
+    if (!agent.loaded) {
+      onLoadAgent(agent.agent_id);
+    }
+  };
 
   const toggleAgent = (agentId: string) => {
     setExpandedAgents((prev) => {
@@ -87,8 +99,15 @@ export function BackgroundAgentPanel({
                   key={agent.agent_id}
                   agent={agent}
                   isExpanded={expandedAgents.has(agent.agent_id)}
-                  onToggle={() => toggleAgent(agent.agent_id)}
-                  onFullScreen={() => setFullScreenAgent(agent)}
+                  onToggle={() => {
+                    ensureLoaded(agent);
+                    toggleAgent(agent.agent_id);
+                  }}
+                  onFullScreen={() => {
+                    ensureLoaded(agent);
+                    setFullScreenAgentId(agent.agent_id);
+                  }}
+                  onLoadOlder={onLoadOlder}
                 />
               ))}
             </div>
@@ -96,19 +115,25 @@ export function BackgroundAgentPanel({
         )}
       </div>
 
-      <Dialog open={!!fullScreenAgent} onOpenChange={(open) => !open && setFullScreenAgent(null)}>
+      <Dialog open={!!fullScreenAgent} onOpenChange={(open) => !open && setFullScreenAgentId(null)}>
         <DialogContent fullScreen className="rounded-lg">
           <DialogHeader className="border-b pb-4" style={{ borderColor: 'var(--color-border)' }}>
             <DialogTitle className="flex items-center gap-2">
               <Bot className="w-5 h-5" style={{ color: 'var(--color-accent)' }} />
               <span className="font-mono">{fullScreenAgent?.agent_id}</span>
               <Badge variant="secondary" className="ml-2">
-                {fullScreenAgent?.messages.length} messages
+                {fullScreenAgent?.message_count} messages
               </Badge>
             </DialogTitle>
           </DialogHeader>
           <ScrollArea className="flex-1 mt-4">
             <div className="space-y-4 pr-4">
+              {fullScreenAgent?.prevCursor && (
+                <LoadOlderButton
+                  key={fullScreenAgent.prevCursor}
+                  onLoad={() => onLoadOlder(fullScreenAgent.agent_id, fullScreenAgent.prevCursor!)}
+                />
+              )}
               {fullScreenAgent?.messages.map((msg, idx) => (
                 <AgentMessage key={idx} message={msg} fullScreen />
               ))}
@@ -125,9 +150,10 @@ interface AgentItemProps {
   isExpanded: boolean;
   onToggle: () => void;
   onFullScreen: () => void;
+  onLoadOlder: (agentId: string, before: string) => Promise<void>;
 }
 
-function AgentItem({ agent, isExpanded, onToggle, onFullScreen }: AgentItemProps) {
+function AgentItem({ agent, isExpanded, onToggle, onFullScreen, onLoadOlder }: AgentItemProps) {
   return (
     <div
       className="rounded-lg border overflow-hidden"
@@ -160,7 +186,7 @@ function AgentItem({ agent, isExpanded, onToggle, onFullScreen }: AgentItemProps
             <Maximize2 className="w-3.5 h-3.5" style={{ color: 'var(--color-muted-foreground)' }} />
           </button>
           <Badge variant="outline" className="text-xs">
-            {agent.messages.length} msgs
+            {agent.message_count} msgs
           </Badge>
         </div>
       </div>
@@ -175,6 +201,12 @@ function AgentItem({ agent, isExpanded, onToggle, onFullScreen }: AgentItemProps
             className="overflow-hidden"
           >
             <div className="p-3 space-y-4 max-h-[500px] overflow-y-auto">
+              {agent.prevCursor && (
+                <LoadOlderButton
+                  key={agent.prevCursor}
+                  onLoad={() => onLoadOlder(agent.agent_id, agent.prevCursor!)}
+                />
+              )}
               {agent.messages.map((msg, idx) => (
                 <AgentMessage key={idx} message={msg} />
               ))}
@@ -186,6 +218,29 @@ function AgentItem({ agent, isExpanded, onToggle, onFullScreen }: AgentItemProps
   );
 }
 
+// 이전 메시지 페이지 로드 버튼 (로드 중에는 중복 요청 방지)
+function LoadOlderButton({ onLoad }: { onLoad: () => Promise<void> }) {
+  const [loading, setLoading] = useState(false);
+
+  return (
+    <button
+      onClick={async () => {
+        setLoading(true);
+        try {
+          await onLoad();
+        } finally {
+          setLoading(false);
+        }
+      }}
+      disabled={loading}
+      className="w-full py-1.5 text-xs rounded border hover:bg-black/5 dark:hover:bg-white/5 transition-colors disabled:opacity-50"
+      style={{ borderColor: 'var(--color-border)', color: 'var(--color-muted-foreground)' }}
+    >
+      {loading ? 'Loading...' : 'Load older messages'}
+    </button>
+  );
+}
+
 interface AgentMessageProps {
   message: Message;
   fullScreen?: boolean;
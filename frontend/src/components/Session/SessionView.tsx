@@ -1,4 +1,4 @@
-import { useEffect, useState, useCallback } from 'react';
+import { useEffect, useState, useCallback, useRef } from 'react';
 import { motion } from 'framer-motion';
 import { ArrowLeft, RefreshCw } from 'lucide-react';
 import { Button } from '@/components/ui/button';
@@ -22,21 +22,21 @@ export function SessionView({ sessionId, onBack }: SessionViewProps) {
   const [agentPanelCollapsed, setAgentPanelCollapsed] = useState(false);
   const { messages, setMessages } = useSessionStore();
   const sessionMessages = messages[sessionId] || [];
+  // 히스토리를 로드하는 중인 에이전트의 실시간 메시지 (로드가 끝나면 뒤에 합침)
+  const pendingAgentMessages = useRef<Map<string, Message[]>>(new Map());
 
   // 에이전트 메시지 실시간 처리
   const handleAgentMessage = useCallback((data: { type: string; agent_id: string; message?: Message }) => {
+    if (data.type === 'agent_message' && data.message) {
+      pendingAgentMessages.current.get(data.agent_id)?.push(data.message);
+    }
     setAgents((prev) => {
       const agentIndex = prev.findIndex((a) => a.agent_id === data.agent_id);
 
       if (data.type === 'agent_new') {
-        // 새 에이전트 추가
+        // 새 에이전트 추가 (새 에이전트는 처음부터 실시간으로 전송됨)
         if (agentIndex === -1) {
-          return [...prev, {
-            agent_id: data.agent_id,
-            messages: [],
-            size_human: '0B',
-            updated_at: new Date().toISOString(),
-          }];
+          return [...prev, newAgent(data.agent_id)];
         }
         return prev;
       }
@@ -44,18 +44,16 @@ export function SessionView({ sessionId, onBack }: SessionViewProps) {
       if (data.type === 'agent_message' && data.message) {
         if (agentIndex === -1) {
           // 에이전트가 없으면 추가
-          return [...prev, {
-            agent_id: data.agent_id,
-            messages: [data.message],
-            size_human: '0B',
-            updated_at: new Date().toISOString(),
-          }];
+          const agent = newAgent(data.agent_id);
+          return [...prev, { ...agent, messages: [data.message], message_count: 1 }];
         }
-        // 기존 에이전트에 메시지 추가
+        // 기존 에이전트에 메시지 추가 (아직 로드하지 않은 에이전트는 개수만 갱신, 로드 중이면 위에서 버퍼링)
         const updated = [...prev];
+        const agent = updated[agentIndex];
         updated[agentIndex] = {
-          ...updated[agentIndex],
-          messages: [...updated[agentIndex].messages, data.message],
+          ...agent,
+          messages: agent.loaded ? [...agent.messages, data.message] : agent.messages,
+          message_count: agent.message_count + 1,
           updated_at: new Date().toISOString(),
         };
         return updated;
@@ -65,9 +63,6 @@ export function SessionView({ sessionId, onBack }: SessionViewProps) {
     });
   }, []);
 
-  // WebSocket 연결 (에이전트 콜백 포함)
-  useWebSocket(sessionId, { onAgentMessage: handleAgentMessage });
-
   const loadHistory = useCallback(async () => {
     setLoading(true);
     try {
@@ -77,7 +72,7 @@ export function SessionView({ sessionId, onBack }: SessionViewProps) {
       ]);
       console.log('Loaded agents:', agentLogs);
       setMessages(sessionId, history as Message[]);
-      setAgents(agentLogs);
+      setAgents(agentLogs.map((agent) => ({ ...agent, messages: [], loaded: false })));
     } catch (error) {
       console.error('Failed to load history:', error);
     } finally {
@@ -89,6 +84,51 @@ export function SessionView({ sessionId, onBack }: SessionViewProps) {
     loadHistory();
   }, [loadHistory]);
 
+  // WebSocket 연결 (에이전트 콜백, 메시지가 생략되면 히스토리 재조회)
+  useWebSocket(sessionId, { onAgentMessage: handleAgentMessage, onResync: loadHistory });
+
+  // 에이전트를 펼칠 때 최신 메시지 페이지 로드
+  const loadAgent = useCallback(async (agentId: string) => {
+    if (pendingAgentMessages.current.has(agentId)) return;
+    pendingAgentMessages.current.set(agentId, []);
+    try {
+      const page = await api.getAgentHistory(sessionId, agentId, AGENT_PAGE_SIZE);
+      const buffered = pendingAgentMessages.current.get(agentId) ?? [];
+      setAgents((prev) =>
+        prev.map((agent) =>
+          agent.agent_id === agentId
+            ? {
+                ...agent,
+                messages: mergeAgentMessages(page.messages, buffered),
+                prevCursor: page.prevCursor,
+                loaded: true,
+              }
+            : agent
+        )
+      );
+    } catch (error) {
+      console.error('Failed to load agent history:', error);
+    } finally {
+      pendingAgentMessages.current.delete(agentId);
+    }
+  }, [sessionId]);
+
+  // 이전 페이지 로드 (before 커서)
+  const loadOlderAgent = useCallback(async (agentId: string, before: string) => {
+    try {
+      const page = await api.getAgentHistory(sessionId, agentId, AGENT_PAGE_SIZE, before);
+      setAgents((prev) =>
+        prev.map((agent) =>
+          agent.agent_id === agentId
+            ? { ...agent, messages: [...page.messages, ...agent.messages], prevCursor: page.prevCursor }
+            : agent
+        )
+      );
+    } catch (error) {
+      console.error('Failed to load older agent history:', error);
+    }
+  }, [sessionId]);
+
   return (
     <motion.div
       initial={{ opacity: 0 }}
@@ -135,6 +175,8 @@ export function SessionView({ sessionId, onBack }: SessionViewProps) {
             {agents.length > 0 && (
               <BackgroundAgentPanel
                 agents={agents}
+                onLoadAgent={loadAgent}
+                onLoadOlder={loadOlderAgent}
                 isCollapsed={agentPanelCollapsed}
                 onToggleCollapse={() => setAgentPanelCollapsed(!agentPanelCollapsed)}
               />
@@ -145,3 +187,24 @@ export function SessionView({ sessionId, onBack }: SessionViewProps) {
     </motion.div>
   );
 }
+
+const AGENT_PAGE_SIZE = 100;
+
+// 로드 중에 받은 실시간 메시지 중 히스토리 응답에 이미 포함된 것은 제외
+function mergeAgentMessages(history: Message[], buffered: Message[]): Message[] {
+  const loaded = new Set(history.map((message) => JSON.stringify(message)));
+  return [...history, ...buffered.filter((message) => !loaded.has(JSON.stringify(message)))];
+}
+
+function newAgent(agentId: string): AgentLog {
+  return {
+    agent_id: agentId,
+    size: 0,
+    size_human: '0B',
+    message_count: 0,
+    updated_at: new Date().toISOString(),
+    tool_calls: {},
+    messages: [],
+    loaded: true,
+  };
+}
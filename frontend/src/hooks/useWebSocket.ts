@@ -10,6 +10,8 @@ interface AgentMessage {
 
 interface WebSocketCallbacks {
   onAgentMessage?: (data: AgentMessage) => void;
+  // 서버 송신 큐가 넘쳐 메시지가 생략되었을 때 (히스토리를 다시 조회해야 함)
+  onResync?: () => void;
 }
 
 export function useWebSocket(sessionId: string | null, callbacks?: WebSocketCallbacks) {
@@ -42,7 +44,8 @@ export function useWebSocket(sessionId: string | null, callbacks?: WebSocketCall
 
       const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
       const host = window.location.host;
-      const socket = new WebSocket(`${protocol}//${host}/ws/${sessionId}`);
+      // batch=true: 짧은 시간에 쏟아지는 메시지를 배열 프레임 하나로 수신
+      const socket = new WebSocket(`${protocol}//${host}/ws/${sessionId}?batch=true`);
 
       socket.onopen = () => {
         console.log('WebSocket connected');
@@ -57,14 +60,19 @@ export function useWebSocket(sessionId: string | null, callbacks?: WebSocketCall
         }
 
         try {
-          const data = JSON.parse(event.data);
-
-          // 에이전트 메시지 처리
-          if (data.type === 'agent_new' || data.type === 'agent_message') {
-            callbacksRef.current?.onAgentMessage?.(data as AgentMessage);
-          } else {
-            // 일반 세션 메시지
-            addMessage(sessionId, data as Message);
+          const frame = JSON.parse(event.data);
+          const items = Array.isArray(frame) ? frame : [frame];
+
+          for (const data of items) {
+            if (data.type === 'resync') {
+              callbacksRef.current?.onResync?.();
+            } else if (data.type === 'agent_new' || data.type === 'agent_message') {
+              // 에이전트 메시지 처리
+              callbacksRef.current?.onAgentMessage?.(data as AgentMessage);
+            } else {
+              // 일반 세션 메시지
+              addMessage(sessionId, data as Message);
+            }
           }
         } catch (e) {
           console.error('Failed to parse WebSocket message:', e);
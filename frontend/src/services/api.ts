@@ -1,4 +1,4 @@
-import type { Project, Session, SessionMetadata, SearchResult, Message, AgentLog, UsageStats, Analysis, AnalysisListItem, AnalysisRequest, WorkAnalysis, WorkAnalysisListItem, WorkAnalysisRequest } from '@/types';
+import type { Project, Session, SessionMetadata, SearchResult, Message, AgentSummary, HistoryPage, UsageStats, Analysis, AnalysisListItem, AnalysisRequest, WorkAnalysis, WorkAnalysisListItem, WorkAnalysisRequest } from '@/types';
 
 const API_BASE = '/api';
 
@@ -35,12 +35,20 @@ export const api = {
     return res.json();
   },
 
-  getSessionAgents: async (sessionId: string): Promise<AgentLog[]> => {
+  getSessionAgents: async (sessionId: string): Promise<AgentSummary[]> => {
     const res = await fetch(`${API_BASE}/sessions/${sessionId}/agents`);
     if (!res.ok) throw new Error('Failed to fetch agent logs');
     return res.json();
   },
 
+  getAgentHistory: async (sessionId: string, agentId: string, limit = 100, before?: string): Promise<HistoryPage> => {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (before) params.append('before', before);
+    const res = await fetch(`${API_BASE}/sessions/${sessionId}/agents/${agentId}/history?${params}`);
+    if (!res.ok) throw new Error('Failed to fetch agent history');
+    return { messages: await res.json(), prevCursor: res.headers.get('X-Prev-Cursor') };
+  },
+
   // Search
   searchSessions: async (query: string, projectId?: string): Promise<SearchResult[]> => {
     const params = new URLSearchParams({ q: query });
@@ -79,11 +79,26 @@ export interface Message {
   timestamp: string;
 }
 
-export interface AgentLog {
+export interface AgentSummary {
   agent_id: string;
-  messages: Message[];
+  size: number;
   size_human: string;
+  message_count: number;
   updated_at: string;
+  tool_calls: Record<string, number>;
+}
+
+export interface AgentLog extends AgentSummary {
+  messages: Message[];
+  // 메시지는 에이전트를 펼칠 때 히스토리 API로 로드
+  loaded: boolean;
+  // 더 오래된 메시지 페이지의 커서 (X-Prev-Cursor, 없으면 처음까지 로드됨)
+  prevCursor?: string | null;
+}
+
+export interface HistoryPage {
+  messages: Message[];
+  prevCursor: string | null;
 }
 
 // Usage Types